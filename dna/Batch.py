@@ -0,0 +1,118 @@
+import csv
+import json
+import math
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dna.RotTable import RotTable
+from dna.Traj3D import Traj3D, product
+from dna.Corpus import Corpus
+from dna.Sequence import read_fasta, list_files, encode, CORPUS_EXTENSION, FASTA_EXTENSIONS
+from dna.SharedSequences import SequenceRegistry, attach
+
+# Séquences lues par défaut par le mode batch (--sequences)
+DEFAULT_SEQUENCES = ["data"]
+
+# Séquences encodées, lues en mémoire partagée par chaque processus (cf init_worker)
+_worker_seqs = None
+
+
+def init_worker(handles):
+    """Initialise un processus de calcul : s'attache aux séquences d'un SequenceRegistry
+
+    Args:
+        handles (list): SequenceRegistry.handles() du processus principal
+    """
+    global _worker_seqs
+    _worker_seqs = [entry["encoded"] for entry in attach(handles)]
+
+
+def score_steps(table_index, steps, seq_index):
+    """Calcule la distance de fermeture d'une paire (table, séquence) dans un processus
+
+    Args:
+        table_index (int): Indice de la table
+        steps (np.ndarray): Matrices de pas de la table (cf Traj3D.stepMatrices)
+        seq_index (int): Indice de la séquence encodée
+    """
+    x, y, z = product(steps[_worker_seqs[seq_index]])[:3, 3]
+    return table_index, seq_index, math.sqrt(x*x + y*y + z*z), x, y, z
+
+
+def load_corpus(paths):
+    """Charge et encode une fois pour toutes les séquences de fichiers ou dossiers FASTA
+
+    Args:
+        paths (list): Fichiers FASTA, corpus .dnac (cf. Corpus) ou dossiers en contenant
+
+    Returns:
+        tuple -- (noms "fichier:enregistrement", séquences encodées)
+    """
+    names, encoded = [], []
+    for filename in list_files(paths, FASTA_EXTENSIONS + (CORPUS_EXTENSION,)):
+        if filename.endswith(CORPUS_EXTENSION):
+            # Corpus empaqueté : décodé directement en indices de dinucléotides
+            with Corpus(filename) as corpus:
+                names.extend(corpus.names())
+                encoded.extend(corpus.encoded(i) for i in range(len(corpus)))
+            continue
+        for record, seq in read_fasta(filename):
+            names.append(f"{filename}:{record}")
+            encoded.append(encode(seq))
+    return names, encoded
+
+
+def batch_main(table_paths, seq_paths, output, workers=None, cache=None):
+    """Calcule la distance de fermeture de chaque table sur chaque séquence, sans affichage
+
+    Les résultats sont écrits au fil de l'eau dans output (CSV, ou JSONL si l'extension est .jsonl)
+
+    Args:
+        table_paths (list): Fichiers JSON de tables ou dossiers en contenant
+        seq_paths (list): Fichiers FASTA, corpus .dnac ou dossiers en contenant
+        output (str): Fichier de sortie
+        workers (int): Nombre de processus (défaut : nombre de coeurs)
+        cache (TrajectoryCache): Cache des points d'arrivée (optionnel)
+    """
+    tables = list_files(table_paths, (".json",))
+    rot_tables = [RotTable(t) for t in tables]
+    steps = [Traj3D().stepMatrices(r) for r in rot_tables]
+    names, encoded = load_corpus(seq_paths)
+    print(f"---- Batch : {len(tables)} table(s) x {len(names)} séquence(s) ----")
+
+    fields = ["table", "sequence", "length", "distance", "x", "y", "z"]
+    jsonl = output.endswith(".jsonl")
+    start = time.time()
+    with open(output, "w", newline='') as file, SequenceRegistry(encoded) as registry, \
+            ProcessPoolExecutor(workers, initializer=init_worker, initargs=(registry.handles(),)) as pool:
+        writer = None if jsonl else csv.writer(file)
+        if writer:
+            writer.writerow(fields)
+
+        def write(t, s, dist, x, y, z):
+            row = [tables[t], names[s], len(encoded[s]) + 1, dist, x, y, z]
+            if jsonl:
+                file.write(json.dumps(dict(zip(fields, row))) + "\n")
+            else:
+                writer.writerow(row)
+            file.flush()
+
+        # Les paires déjà présentes dans le cache ne sont pas recalculées
+        futures, keys = [], {}
+        for t in range(len(tables)):
+            for s in range(len(names)):
+                point = None
+                if cache is not None:
+                    keys[t, s] = cache.key(encoded[s], rot_tables[t])
+                    point = cache.get(keys[t, s], "end")
+                if point is None:
+                    futures.append(pool.submit(score_steps, t, steps[t], s))
+                else:
+                    write(t, s, float(np.linalg.norm(point)), *point)
+        for future in as_completed(futures):
+            t, s, dist, x, y, z = future.result()
+            if cache is not None:
+                cache.put(keys[t, s], "end", np.array([x, y, z]))
+            write(t, s, dist, x, y, z)
+    print(f"{len(tables) * len(names)} scores written to {output} in {time.time() - start:.2f}s"
+          f" ({len(futures)} computed)")
@@ -0,0 +1,88 @@
+import functools
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Sequence import DINUCLEOTIDES
+
+
+def table_vector(table) -> np.ndarray:
+    """48 paramètres (ordre de DINUCLEOTIDES) d'une table sous forme de dictionnaire"""
+    return np.array([table[di][:3] for di in DINUCLEOTIDES], dtype=float).ravel()
+
+
+class Bounds:
+    """Bornes (min, max) des 48 paramètres, précalculées une fois
+
+    Toutes les opérations sont vectorisées : elles acceptent un vecteur (48,) ou une
+    population entière (n, 48) et ne relisent jamais table.json.
+
+    Args:
+        low (np.ndarray): Bornes inférieures
+        high (np.ndarray): Bornes supérieures
+    """
+
+    def __init__(self, low, high):
+        self.low = np.array(low, dtype=float)
+        self.high = np.array(high, dtype=float)
+        self.width = self.high - self.low
+        # Partagées (default_bounds) : en lecture seule
+        for array in (self.low, self.high, self.width):
+            array.setflags(write=False)
+
+    @classmethod
+    def fromTable(cls, rot_table=None):
+        """Bornes d'une table : valeur moins/plus la marge restante (table.json par défaut)"""
+        return cls(*(rot_table or RotTable()).getBounds())
+
+    def contains(self, X) -> np.ndarray:
+        """True pour chaque vecteur dont les 48 paramètres sont dans les bornes"""
+        X = np.asarray(X, dtype=float)
+        return np.all((X >= self.low) & (X <= self.high), axis=-1)
+
+    def violations(self, X) -> np.ndarray:
+        """Dépassement de chaque paramètre (0 dans les bornes), même forme que X"""
+        X = np.asarray(X, dtype=float)
+        return np.maximum(self.low - X, 0) + np.maximum(X - self.high, 0)
+
+    def slack(self, X) -> np.ndarray:
+        """Marges restantes (vers le bas, vers le haut) de chaque paramètre, forme (..., 48, 2)"""
+        X = np.asarray(X, dtype=float)
+        return np.stack((X - self.low, self.high - X), axis=-1)
+
+    def clip(self, X) -> np.ndarray:
+        """Projection sur les bornes : chaque paramètre hors bornes est ramené sur la borne dépassée"""
+        return np.clip(X, self.low, self.high)
+
+    def reflect(self, X) -> np.ndarray:
+        """Réflexion sur les bornes : le dépassement est replié vers l'intérieur (autant de fois
+        que nécessaire), ce qui conserve la diversité là où clip accumule les valeurs sur les bornes"""
+        X = np.asarray(X, dtype=float)
+        period = 2 * self.width
+        free = period > 0
+        Y = np.mod(X - self.low, np.where(free, period, 1))
+        Y = np.where(Y > self.width, period - Y, Y)
+        return np.where(free, self.low + Y, self.low)
+
+    def repair(self, X, method="clip") -> tuple:
+        """Ramène dans les bornes les vecteurs qui en sortent
+
+        Args:
+            X (np.ndarray): Vecteurs (n, 48) ou vecteur (48,)
+            method (str): 'clip' ou 'reflect'
+
+        Returns:
+            tuple -- (vecteurs réparés, masque des vecteurs qui ont été modifiés)
+        """
+        if method not in ("clip", "reflect"):
+            raise ValueError(f"Unknown repair method: {method}")
+        X = np.asarray(X, dtype=float)
+        outside = ~self.contains(X)
+        if not outside.any():
+            return X, outside
+        repaired = self.clip(X) if method == "clip" else self.reflect(X)
+        return np.where(outside[..., None], repaired, X), outside
+
+
+@functools.lru_cache(maxsize=None)
+def default_bounds() -> Bounds:
+    """Bornes de table.json, calculées au premier appel seulement"""
+    return Bounds.fromTable()
@@ -0,0 +1,73 @@
+import time
+
+
+class Budget:
+    """Budget d'un lancement d'optimisation : temps, évaluations de trajectoires et distance cible
+
+    Les optimiseurs appellent charge() une fois par génération ou itération : ce n'est
+    qu'une addition, trois comparaisons et une lecture d'horloge monotone, négligeables
+    devant une évaluation de trajectoire.
+
+    Args:
+        max_time (float): Temps maximal en secondes (None : illimité)
+        max_evals (int): Nombre maximal d'évaluations de trajectoires (None : illimité)
+        target (float): Distance de fermeture à atteindre (None : aucune)
+    """
+
+    def __init__(self, max_time=None, max_evals=None, target=None):
+        self.max_time = max_time
+        self.max_evals = max_evals
+        self.target = target
+        self.evaluations = 0
+        self.best = None
+        self.reason = None
+        self.start = time.monotonic()
+        self.elapsed = 0.0
+
+    def restart(self):
+        """Remet le chronomètre et les compteurs à zéro (au début d'un lancement)"""
+        self.__init__(self.max_time, self.max_evals, self.target)
+
+    def resume(self, evaluations, elapsed):
+        """Reprend un budget déjà entamé (reprise après un point de sauvegarde)"""
+        self.evaluations = evaluations
+        self.start = time.monotonic() - elapsed
+        self.elapsed = elapsed
+
+    def charge(self, evaluations, best=None) -> bool:
+        """Décompte des évaluations et le meilleur score courant
+
+        Args:
+            evaluations (int): Nombre d'évaluations de trajectoires depuis le dernier appel
+            best (float): Meilleure distance de fermeture courante (seul le minimum est conservé)
+
+        Returns:
+            bool -- True si une limite est atteinte (la raison est dans self.reason)
+        """
+        self.evaluations += evaluations
+        if best is not None and (self.best is None or best < self.best):
+            self.best = best
+        self.elapsed = time.monotonic() - self.start
+        if self.target is not None and self.best is not None and self.best <= self.target:
+            self.reason = "target"
+        elif self.max_evals is not None and self.evaluations >= self.max_evals:
+            self.reason = "evaluations"
+        elif self.max_time is not None and self.elapsed >= self.max_time:
+            self.reason = "time"
+        return self.reason is not None
+
+    def exhausted(self) -> bool:
+        return self.reason is not None
+
+    def report(self) -> dict:
+        """Bilan de l'utilisation du budget"""
+        return {
+            "reason": self.reason,
+            "elapsed": self.elapsed,
+            "evaluations": self.evaluations,
+            "evaluations_per_second": self.evaluations / self.elapsed if self.elapsed > 0 else None,
+            "best": self.best,
+            "max_time": self.max_time,
+            "max_evals": self.max_evals,
+            "target": self.target,
+        }
@@ -0,0 +1,218 @@
+import copy
+import math
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from dna.Batch import init_worker, score_steps
+from dna.Bounds import Bounds
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.SharedSequences import SequenceRegistry
+from dna.Store import write_numbered
+from dna.Traj3D import product, step_matrices
+
+
+class CMAES:
+    """Stratégie d'évolution à adaptation de la matrice de covariance (CMA-ES)
+
+    La recherche se fait dans l'espace normalisé [0, 1] des paramètres libres (ceux dont
+    les bornes de table.json ne sont pas nulles). Chaque génération est tirée d'un bloc
+    sous forme de tableau, ramenée dans les bornes, puis évaluée en lot. La taille du pas
+    et la forme de la distribution s'adaptent au paysage, sans réglage manuel.
+
+    Args:
+        seqs (list): Liste des séquences à refermer
+        initial_state (RotTable): Modèle de conformation initial (définit aussi les bornes)
+        sigma (float): Pas initial, en fraction de la largeur des bornes
+        popsize (int): Nombre de candidats par génération (défaut : 4 + 3 ln(n))
+        max_evals (int): Nombre maximal d'évaluations de trajectoires
+        target (float): Distance de fermeture (racine de l'énergie) à atteindre
+        workers (int): Nombre de processus d'évaluation (1 : évaluation dans le processus courant)
+        seed (int): Graine du générateur aléatoire
+    """
+
+    def __init__(self, seqs, initial_state, sigma=0.3, popsize=None, max_evals=20000, target=10,
+                 workers=1, seed=None):
+        self.seqs = seqs
+        self.encoded = [encode(seq) for seq in seqs]
+        self.initial_state = initial_state
+        self.max_evals = max_evals
+        self.target = target
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+
+        self.x0 = initial_state.getVector()
+        self.low, self.high = initial_state.getBounds()
+        self.free = self.high > self.low
+        self.width = (self.high - self.low)[self.free]
+        n = self.n = int(self.free.sum())
+        self.unit = Bounds(np.zeros(n), np.ones(n))  # Bornes dans l'espace normalisé
+
+        # Paramètres par défaut de la CMA-ES (Hansen, "The CMA Evolution Strategy: A Tutorial")
+        self.lam = popsize or 4 + int(3 * math.log(n))
+        self.mu = self.lam // 2
+        weights = math.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / weights.sum()
+        self.mueff = 1 / np.sum(self.weights**2)
+        self.cc = (4 + self.mueff/n) / (n + 4 + 2*self.mueff/n)
+        self.cs = (self.mueff + 2) / (n + self.mueff + 5)
+        self.c1 = 2 / ((n + 1.3)**2 + self.mueff)
+        self.cmu = min(1 - self.c1, 2 * (self.mueff - 2 + 1/self.mueff) / ((n + 2)**2 + self.mueff))
+        self.damps = 1 + 2*max(0, math.sqrt((self.mueff - 1)/(n + 1)) - 1) + self.cs
+        self.chiN = math.sqrt(n) * (1 - 1/(4*n) + 1/(21*n*n))
+
+        # Etat de la distribution
+        self.mean = (self.x0[self.free] - self.low[self.free]) / self.width
+        self.sigma = sigma
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.C = np.eye(n)
+
+        self.evals = 0
+        self.generation = 0
+        self.best_vector = self.x0.copy()
+        self.e = math.inf  # Energie du meilleur candidat (le point de départ est évalué par run)
+
+    # -------------------------------------------------------------------------
+    # Evaluation
+    # -------------------------------------------------------------------------
+    def vectors(self, U):
+        """Convertit des points normalisés (lam, n) en vecteurs de 48 paramètres"""
+        V = np.tile(self.x0, (len(U), 1))
+        V[:, self.free] = self.low[self.free] + U * self.width
+        return V
+
+    def energies(self, U):
+        """Somme des carrés des distances de fermeture de chaque candidat (points déjà dans les bornes)"""
+        steps = step_matrices(self.vectors(U).reshape(len(U), 16, 3))
+        energies = np.zeros(len(U))
+        if self.workers == 1:
+            for b in range(len(U)):
+                for encoded in self.encoded:
+                    x, y, z = product(steps[b][encoded])[:3, 3]
+                    energies[b] += x*x + y*y + z*z
+        else:
+            futures = [self.pool.submit(score_steps, b, steps[b], s)
+                       for b in range(len(U)) for s in range(len(self.encoded))]
+            for future in futures:
+                b, _, dist, _, _, _ = future.result()
+                energies[b] += dist * dist
+        self.evals += len(U) * len(self.encoded)
+        return energies
+
+    # -------------------------------------------------------------------------
+    # Une génération
+    # -------------------------------------------------------------------------
+    def ask(self):
+        """Tire une génération complète de candidats, sous forme de tableau (lam, n)"""
+        Z = self.rng.standard_normal((self.lam, self.n))
+        return self.mean + self.sigma * (Z * self.D) @ self.B.T
+
+    def tell(self, X, fitness):
+        """Met à jour la moyenne, les chemins d'évolution, la covariance et le pas"""
+        n = self.n
+        order = np.argsort(fitness)
+        old_mean = self.mean
+        Y = (X[order[:self.mu]] - old_mean) / self.sigma
+        self.mean = old_mean + self.sigma * self.weights @ Y
+        y_w = self.weights @ Y
+
+        inv_sqrt_C = self.B @ np.diag(1 / self.D) @ self.B.T
+        self.ps = (1 - self.cs) * self.ps + math.sqrt(self.cs * (2 - self.cs) * self.mueff) * inv_sqrt_C @ y_w
+        self.generation += 1
+        hsig = np.linalg.norm(self.ps) / math.sqrt(1 - (1 - self.cs)**(2 * self.generation)) / self.chiN \
+            < 1.4 + 2 / (n + 1)
+        self.pc = (1 - self.cc) * self.pc + hsig * math.sqrt(self.cc * (2 - self.cc) * self.mueff) * y_w
+
+        rank_mu = (Y.T * self.weights) @ Y
+        self.C = (1 - self.c1 - self.cmu) * self.C \
+            + self.c1 * (np.outer(self.pc, self.pc) + (1 - hsig) * self.cc * (2 - self.cc) * self.C) \
+            + self.cmu * rank_mu
+        self.sigma *= math.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chiN - 1))
+        # Pas plus grand que l'espace de recherche : inutile
+        self.sigma = min(self.sigma, 1.0)
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+        D2, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(D2, 1e-20))
+
+    def iterate(self):
+        """Tire, évalue (en lot) et sélectionne une génération"""
+        X = self.ask()
+        # Les candidats hors bornes sont évalués une fois ramenés dans les bornes,
+        # avec une pénalité proportionnelle à leur dépassement
+        U = self.unit.clip(X)
+        e = self.energies(U)
+        fitness = e * (1 + 10 * np.sum(self.unit.violations(X)**2, axis=1))
+        best = int(np.argmin(e))
+        if e[best] < self.e:
+            self.e = e[best]
+            self.best_vector = self.vectors(U[best:best+1])[0]
+        self.tell(X, fitness)
+
+    def run(self, budget=None, progress=None):
+        """Lance la CMA-ES jusqu'à la distance cible ou l'épuisement du budget d'évaluations
+
+        Args:
+            budget (Budget): Budget optionnel supplémentaire (temps, évaluations, distance cible)
+            progress (Progress): Reçoit l'avancement (génération, distance, pas) ; rien n'est affiché
+        """
+        with SequenceRegistry(self.encoded if self.workers != 1 else ()) as registry, \
+                ProcessPoolExecutor(self.workers, initializer=init_worker, initargs=(registry.handles(),)) \
+                if self.workers != 1 else _NoPool() as self.pool:
+            if self.generation == 0:
+                self.e = self.energies(self.unit.clip(self.mean)[None, :])[0]
+            while self.evals < self.max_evals and math.sqrt(self.e) > self.target and self.sigma > 1e-12:
+                evals = self.evals
+                self.iterate()
+                if progress is not None:
+                    progress.emit("cmaes", self.generation, self.evals, math.sqrt(self.e), sigma=self.sigma)
+                if budget is not None and budget.charge(self.evals - evals, math.sqrt(self.e)):
+                    break
+        if progress is not None:
+            progress.emit("cmaes", self.generation, self.evals, math.sqrt(self.e), force=True, done=True,
+                          sigma=self.sigma, budget=None if budget is None else budget.report())
+        return self.getState()
+
+    def getState(self) -> RotTable:
+        """Renvoie la meilleure table trouvée, avec ses marges restantes par rapport aux bornes"""
+        state = copy.deepcopy(self.initial_state)
+        state.setVector(self.best_vector, (self.low, self.high))
+        return state
+
+    def write(self, filename="results/cmaes_result"):
+        """Enregistre la meilleure table dans un fichier JSON et renvoie son nom"""
+        return write_numbered(self.getState().rot_table, filename)
+
+
+class _NoPool:
+    """Remplace le pool de processus quand l'évaluation se fait dans le processus courant"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+def cmaes_main(seqs, JSON_filename, max_evals=20000, target=10, workers=1, budget=None, progress=None,
+               store=None):
+    """Fonction appelée par __main__.py (pour éviter le bouclage des imports)"""
+    start = time.monotonic()
+    cmaes = CMAES(seqs, RotTable(JSON_filename), max_evals=max_evals, target=target, workers=workers)
+    print("---- Lancement de la CMA-ES ----")
+    state = cmaes.run(budget, progress)
+    dist = []
+    for encoded in cmaes.encoded:
+        x, y, z = product(step_matrices(state.getVector().reshape(16, 3))[encoded])[:3, 3]
+        dist.append(math.sqrt(x*x + y*y + z*z))
+        print("Distance:", dist[-1])
+    print("Result saved in", cmaes.write())
+    if store is not None:
+        run = store.insert("cmaes", state, seqs, distances=dist,
+                           params={"popsize": cmaes.lam, "max_evals": max_evals, "target": target,
+                                   "initial_state": JSON_filename},
+                           elapsed=time.monotonic() - start, evaluations=cmaes.evals)
+        print("Run", run, "recorded in", store.path)
@@ -0,0 +1,130 @@
+import hashlib
+import os
+import tempfile
+import numpy as np
+from dna.Sequence import DINUCLEOTIDES
+from dna.Traj3D import Traj3D
+
+# Version du format : à incrémenter si le calcul des trajectoires change
+CACHE_VERSION = b"traj-v1"
+DEFAULT_DIR = os.environ.get("DNA_CACHE_DIR", os.path.join(".cache", "trajectories"))
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class TrajectoryCache:
+    """Cache disque des trajectoires, adressé par le contenu
+
+    La clé est un hash de la séquence encodée et des 48 paramètres (twist, wedge, direction)
+    de la table : les bornes n'interviennent pas dans la trajectoire.
+    On stocke soit le point d'arrivée (quelques octets), soit les coordonnées compressées.
+    La taille totale est plafonnée, les entrées les moins récemment utilisées sont supprimées.
+
+    Args:
+        directory (str): Dossier du cache
+        max_bytes (int): Taille maximale du cache sur disque
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+        self.size = sum(e.stat().st_size for e in self._entries())
+
+    def key(self, encoded_seq, rot_table):
+        """Calcule la clé d'une paire (séquence encodée, table)"""
+        table = rot_table.getTable()
+        params = np.array([table[di][:3] for di in DINUCLEOTIDES], dtype=np.float64)
+        h = hashlib.sha256(CACHE_VERSION)
+        h.update(np.ascontiguousarray(encoded_seq, dtype=np.uint8).tobytes())
+        h.update(params.tobytes())
+        return h.hexdigest()
+
+    # -------------------------------------------------------------------------
+    # Accès bas niveau
+    # -------------------------------------------------------------------------
+    def _entries(self):
+        return [e for e in os.scandir(self.directory) if e.name.endswith(".npz")]
+
+    def _path(self, key, kind):
+        return os.path.join(self.directory, f"{key}.{kind}.npz")
+
+    def get(self, key, kind):
+        """Renvoie le tableau stocké sous (key, kind), ou None. Un accès rafraîchit l'entrée (LRU)"""
+        path = self._path(key, kind)
+        try:
+            with np.load(path) as data:
+                array = data["a"]
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array
+
+    def put(self, key, kind, array):
+        """Enregistre un tableau de façon atomique (fichier temporaire puis renommage)"""
+        path = self._path(key, kind)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as file:
+            if kind == "end":
+                np.savez(file, a=array)
+            else:
+                np.savez_compressed(file, a=array)
+        try:
+            self.size -= os.path.getsize(path)
+        except OSError:
+            pass
+        os.replace(tmp, path)
+        self.size += os.path.getsize(path)
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Supprime les entrées les plus anciennement utilisées jusqu'à 90% de la taille maximale"""
+        entries = sorted(self._entries(), key=lambda e: e.stat().st_mtime)
+        self.size = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if self.size <= 0.9 * self.max_bytes:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self.size -= size
+            except OSError:
+                pass
+
+    # -------------------------------------------------------------------------
+    # Accès haut niveau
+    # -------------------------------------------------------------------------
+    def endpoint(self, encoded_seq, rot_table):
+        """Renvoie le point d'arrivée (x, y, z) de la trajectoire, calculé seulement si absent"""
+        key = self.key(encoded_seq, rot_table)
+        point = self.get(key, "end")
+        if point is None:
+            traj = Traj3D()
+            traj.computeEndpoint(encoded_seq, rot_table)
+            point = np.array(traj.getTraj()[-1][:3])
+            self.put(key, "end", point)
+        return point
+
+    def trajectory(self, seq, encoded_seq, rot_table):
+        """Renvoie une Traj3D complète (pour le dessin), calculée seulement si absente"""
+        key = self.key(encoded_seq, rot_table)
+        traj = Traj3D()
+        coords = self.get(key, "xyz")
+        if coords is None:
+            traj.compute(seq, rot_table)
+            self.storeTrajectory(encoded_seq, rot_table, traj, key)
+        else:
+            traj.setCoordinates(coords)
+        return traj
+
+    def storeTrajectory(self, encoded_seq, rot_table, traj, key=None):
+        """Enregistre les coordonnées et le point d'arrivée d'une trajectoire déjà calculée"""
+        if key is None:
+            key = self.key(encoded_seq, rot_table)
+        coords = traj.getCoordinates()
+        self.put(key, "xyz", coords)
+        self.put(key, "end", coords[-1])
@@ -0,0 +1,117 @@
+import os
+import random
+import tempfile
+import threading
+import numpy as np
+
+
+def rng_snapshot() -> dict:
+    """Etat des générateurs aléatoires (random et numpy.random) sous forme de tableaux"""
+    version, internal, gauss = random.getstate()
+    _, keys, pos, has_gauss, cached = np.random.get_state()
+    return {
+        "rng_random": np.array((version,) + internal, dtype=np.int64),
+        "rng_random_gauss": np.array([np.nan if gauss is None else gauss]),
+        "rng_numpy": np.array(keys, dtype=np.uint32),
+        "rng_numpy_extra": np.array([pos, has_gauss, cached], dtype=np.float64),
+    }
+
+
+def rng_restore(data):
+    """Restaure les générateurs aléatoires sauvegardés par rng_snapshot"""
+    state = [int(v) for v in data["rng_random"]]
+    gauss = float(data["rng_random_gauss"][0])
+    random.setstate((state[0], tuple(state[1:]), None if np.isnan(gauss) else gauss))
+    pos, has_gauss, cached = data["rng_numpy_extra"]
+    np.random.set_state(("MT19937", data["rng_numpy"], int(pos), int(has_gauss), float(cached)))
+
+
+def save(path, arrays):
+    """Ecrit un point de reprise de façon atomique (fichier temporaire puis renommage)"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **arrays)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def load(path) -> dict:
+    """Lit un point de reprise"""
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+class Checkpointer:
+    """Sauvegarde périodique de l'état d'un optimiseur
+
+    L'état est copié dans la boucle (quelques tableaux), puis écrit sur disque par un
+    thread : la boucle n'attend jamais l'écriture. Si une écriture est encore en cours,
+    seul le point de reprise le plus récent est conservé.
+
+    Args:
+        path (str): Fichier du point de reprise (.npz)
+        every (int): Période, en générations ou itérations
+    """
+
+    def __init__(self, path, every=10):
+        self.path = path
+        self.every = every
+        self.saved = 0
+        self._pending = None
+        self._closed = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def maybe_save(self, step, snapshot):
+        """Sauvegarde snapshot() si step est un multiple de la période
+
+        Args:
+            step (int): Numéro de génération ou d'itération
+            snapshot (callable): Fonction qui renvoie l'état sous forme de dictionnaire de tableaux
+        """
+        if step % self.every == 0:
+            self.save(snapshot())
+
+    def save(self, arrays):
+        if self._error is not None:
+            raise self._error
+        with self._condition:
+            self._pending = arrays
+            self._condition.notify()
+
+    def _writer(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                arrays, self._pending = self._pending, None
+            try:
+                save(self.path, arrays)
+                self.saved += 1
+            except Exception as error:
+                self._error = error
+
+    def close(self):
+        """Attend la fin de la dernière écriture"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
@@ -1,26 +1,74 @@
 import argparse
 import json
+import os
+import sys
 
-parser = argparse.ArgumentParser()
-parser.add_argument("result", help="The result file to clean")
-args = parser.parse_args()
-
-rot_table_1 = json.load(open('dna/table.json'))
-rot_table_2 = json.load(open(args.result))
-
-for key in rot_table_1:
-    for i in range(3):
-        inf = rot_table_1[key][i] - rot_table_1[key][3+i]
-        sup = rot_table_1[key][i] + rot_table_1[key][3+i]
-        if rot_table_2[key][i] < inf or rot_table_2[key][i] > sup:
-            raise ValueError(f"Value {rot_table_2[key][i]} for {key} is out of range [{inf}, {sup}]")
-        if (rot_table_2[key][3+i][0] != rot_table_2[key][i] - inf or rot_table_2[key][3+i][1] != sup - rot_table_2[key][i]):
-            print('Correcting', key)
-        rot_table_2[key][3+i][0] = rot_table_2[key][i] - inf
-        rot_table_2[key][3+i][1] = sup - rot_table_2[key][i]
-
-new_name = args.result.split('/')
-new_name[-1] = 'cleaned_' + new_name[-1]
-new_name = '/'.join(new_name)
-with open(new_name, "w") as file:
-    json.dump(rot_table_2, file, indent=4)
\ No newline at end of file
+if not __package__:
+    # Lancé comme script (python dna/CleanJson.py) : le paquet dna est importé depuis la racine du dépôt
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dna.Bounds import Bounds, table_vector
+from dna.RotTable import RotTable
+from dna.Sequence import DINUCLEOTIDES
+
+
+def clean_table(table, reference=None, repair=None) -> tuple:
+    """Vérifie une table par rapport aux bornes d'une table de référence et recalcule ses marges
+
+    Args:
+        table (dict): Table à nettoyer (format JSON de results/), non modifiée
+        reference (RotTable): Table dont les bornes font foi (table.json par défaut)
+        repair (str): None : ValueError au premier dépassement ; 'clip' ou 'reflect' : les
+                      valeurs hors bornes sont ramenées dans les bornes (cf. Bounds.repair)
+
+    Returns:
+        tuple -- (table nettoyée, liste des dinucléotides corrigés)
+    """
+    bounds = Bounds.fromTable(reference)
+    vector = table_vector(table)
+    if repair is None:
+        outside = bounds.violations(vector) > 0
+        if outside.any():
+            k = int(outside.argmax())
+            raise ValueError(f"Value {vector[k]} for {DINUCLEOTIDES[k // 3]} is out of range "
+                             f"[{bounds.low[k]}, {bounds.high[k]}]")
+    else:
+        vector, _ = bounds.repair(vector, repair)
+    slack = bounds.slack(vector).reshape(16, 3, 2)
+    cleaned, corrected = {}, []
+    for i, di in enumerate(DINUCLEOTIDES):
+        cleaned[di] = vector[3*i:3*i+3].tolist() + slack[i].tolist()
+        if cleaned[di] != list(table[di]):
+            corrected.append(di)
+    return cleaned, corrected
+
+
+def clean_file(filename, reference_filename=None, output=None, repair=None) -> tuple:
+    """Nettoie un fichier de résultat (cf. clean_table) et l'écrit sous le nom cleaned_<fichier>
+
+    Returns:
+        tuple -- (nom du fichier écrit, liste des dinucléotides corrigés)
+    """
+    with open(filename) as file:
+        table = json.load(file)
+    reference = None if reference_filename is None else RotTable(reference_filename)
+    cleaned, corrected = clean_table(table, reference, repair)
+    if output is None:
+        output = filename.split('/')
+        output[-1] = 'cleaned_' + output[-1]
+        output = '/'.join(output)
+    with open(output, "w") as file:
+        json.dump(cleaned, file, indent=4)
+    return output, corrected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("result", help="The result file to clean")
+    parser.add_argument("--reference", default=None, help="Table whose bounds are enforced (default: dna/table.json)")
+    parser.add_argument("--repair", default=None, choices=['clip', 'reflect'],
+                        help="bring out-of-range values back into bounds instead of failing")
+    args = parser.parse_args()
+    _, corrected = clean_file(args.result, args.reference, repair=args.repair)
+    for key in corrected:
+        print('Correcting', key)
@@ -0,0 +1,185 @@
+# =============================================================================
+# Corpus de séquences compact : 2 bits par base, lu par projection en mémoire.
+#
+# Format d'un fichier .dnac :
+#     MAGIC | données | index JSON | position de l'index (uint64) | MAGIC
+# Pour chaque enregistrement, les données contiennent les bases empaquetées
+# (4 par octet, la première dans les bits de poids fort, A=0 C=1 G=2 T=3) puis
+# les plages de bases ambiguës (N, IUPAC...) sous forme de triplets int64
+# (début, longueur, caractère) ; ces bases sont stockées comme des A dans les
+# données empaquetées. L'index donne, par enregistrement, le nom, la longueur et
+# la position des deux blocs : n'importe quel enregistrement ou intervalle se
+# décode directement en indices de dinucléotides sans relire de texte FASTA.
+# La casse (masquage en minuscules) n'est pas conservée.
+# =============================================================================
+
+import json
+import os
+import struct
+import time
+import numpy as np
+from dna.Sequence import BASES, CORPUS_EXTENSION, FASTA_EXTENSIONS, _BASE_CODES, list_files, read_fasta
+
+MAGIC = b"DNA2BIT1"
+# Hors de data/ (dossier lu par défaut par le mode batch) : les séquences ne sont pas comptées deux fois
+DEFAULT_CORPUS = os.path.join("results", "corpus.dnac")
+TRAILER = struct.Struct("<Q8s")
+_SHIFTS = np.array([6, 4, 2, 0], dtype=np.uint8)
+_LETTERS = np.frombuffer(BASES.encode("ascii"), dtype=np.uint8)
+
+
+def pack(seq):
+    """Empaquette une séquence à 2 bits par base
+
+    Args:
+        seq (str): Séquence d'ADN
+
+    Returns:
+        tuple -- (octets empaquetés uint8, plages ambiguës (k, 3) int64 : début, longueur, caractère)
+    """
+    raw = np.frombuffer(seq.encode("ascii"), dtype=np.uint8)
+    codes = _BASE_CODES[raw]
+    ambiguous = codes == 255
+    runs = np.empty((0, 3), dtype=np.int64)
+    if ambiguous.any():
+        # Plages de caractères ambigus identiques consécutifs
+        starts = np.flatnonzero(ambiguous & np.concatenate(([True], (raw[1:] != raw[:-1]) | ~ambiguous[:-1])))
+        ends = np.flatnonzero(ambiguous & np.concatenate(((raw[1:] != raw[:-1]) | ~ambiguous[1:], [True]))) + 1
+        runs = np.column_stack((starts, ends - starts, raw[starts])).astype(np.int64)
+        codes = np.where(ambiguous, 0, codes).astype(np.uint8)
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    packed = (padded[0::4] << 6) | (padded[1::4] << 4) | (padded[2::4] << 2) | padded[3::4]
+    return packed, runs
+
+
+def build(paths, output):
+    """Convertit des fichiers ou dossiers FASTA en un corpus .dnac, enregistrement par enregistrement
+
+    Les noms des enregistrements sont "fichier:enregistrement" (comme Batch.load_corpus).
+
+    Returns:
+        dict -- Index écrit (cf. Corpus.index)
+    """
+    records = []
+    with open(output, "wb") as file:
+        file.write(MAGIC)
+        for filename in list_files(paths, FASTA_EXTENSIONS):
+            for name, seq in read_fasta(filename):
+                packed, runs = pack(seq)
+                record = {"name": f"{filename}:{name}", "length": len(seq), "offset": file.tell(),
+                          "runs": len(runs)}
+                file.write(packed.tobytes())
+                file.write(b"\0" * (-file.tell() % 8))
+                record["runs_offset"] = file.tell()
+                file.write(runs.astype("<i8").tobytes())
+                records.append(record)
+        index = {"version": 1, "records": records}
+        position = file.tell()
+        file.write(json.dumps(index).encode())
+        file.write(TRAILER.pack(position, MAGIC))
+    return index
+
+
+class Corpus:
+    """Lecture d'un corpus .dnac par projection en mémoire (cf. build)
+
+    Args:
+        filename (str): Fichier .dnac
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.data = np.memmap(filename, dtype=np.uint8, mode="r")
+        position, magic = TRAILER.unpack(self.data[-TRAILER.size:].tobytes())
+        if bytes(self.data[:len(MAGIC)]) != MAGIC or magic != MAGIC:
+            raise ValueError(f"{filename} is not a sequence corpus")
+        self.index = json.loads(self.data[position:len(self.data) - TRAILER.size].tobytes())
+        self.records = self.index["records"]
+        self._names = {record["name"]: i for i, record in enumerate(self.records)}
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, name):
+        return name in self._names
+
+    def names(self) -> list:
+        return [record["name"] for record in self.records]
+
+    def record(self, key) -> dict:
+        """Entrée de l'index d'un enregistrement, par nom ou par indice"""
+        if isinstance(key, str):
+            if key not in self._names:
+                raise KeyError(f"No record {key!r} in {self.filename}")
+            key = self._names[key]
+        return self.records[key]
+
+    def runs(self, key) -> np.ndarray:
+        """Plages de bases ambiguës (k, 3) : début, longueur, caractère"""
+        record = self.record(key)
+        start = record["runs_offset"]
+        return self.data[start:start + 24 * record["runs"]].view("<i8").reshape(-1, 3)
+
+    def _overlapping(self, key, start, stop) -> np.ndarray:
+        """Plages ambiguës qui recoupent l'intervalle [start, stop)"""
+        runs = self.runs(key)
+        return runs[(runs[:, 0] < stop) & (runs[:, 0] + runs[:, 1] > start)]
+
+    def _range(self, key, start, stop):
+        record = self.record(key)
+        length = record["length"]
+        stop = length if stop is None else min(stop, length)
+        if not 0 <= start <= stop:
+            raise IndexError(f"Invalid range [{start}, {stop}) for a record of length {length}")
+        return record, start, stop
+
+    def codes(self, key, start=0, stop=None) -> np.ndarray:
+        """Codes des bases (A=0, C=1, G=2, T=3 ; 255 pour une base ambiguë) de l'intervalle [start, stop)"""
+        record, start, stop = self._range(key, start, stop)
+        offset = record["offset"]
+        packed = self.data[offset + start // 4:offset + -(-stop // 4)]
+        codes = ((packed[:, None] >> _SHIFTS) & 3).ravel()[start % 4:start % 4 + stop - start]
+        for begin, length, _ in self._overlapping(key, start, stop):
+            codes[max(begin, start) - start:min(begin + length, stop) - start] = 255
+        return codes
+
+    def sequence(self, key, start=0, stop=None) -> str:
+        """Texte de l'intervalle [start, stop), bases ambiguës comprises"""
+        record, start, stop = self._range(key, start, stop)
+        codes = self.codes(key, start, stop)
+        letters = _LETTERS[np.minimum(codes, 3)]
+        for begin, length, char in self._overlapping(key, start, stop):
+            letters[max(begin, start) - start:min(begin + length, stop) - start] = char
+        return letters.tobytes().decode("ascii")
+
+    def encoded(self, key, start=0, stop=None) -> np.ndarray:
+        """Indices des dinucléotides de l'intervalle [start, stop) (cf. Sequence.encode)"""
+        codes = self.codes(key, start, stop)
+        if (codes == 255).any():
+            position = start + int(np.argmax(codes == 255))
+            raise ValueError(f"Ambiguous base at position {position} of {self.record(key)['name']}")
+        return (codes[:-1] << 2) | codes[1:]
+
+    def close(self):
+        """Libère la projection en mémoire"""
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def corpus_main(paths, output):
+    """Fonction appelée par __main__.py : construit un corpus .dnac à partir de fichiers FASTA"""
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    start = time.time()
+    index = build(paths, output)
+    bases = sum(record["length"] for record in index["records"])
+    runs = sum(record["runs"] for record in index["records"])
+    print(f"{len(index['records'])} records, {bases} bases ({runs} ambiguous runs) written to {output}"
+          f" in {time.time() - start:.2f}s ({os.path.getsize(output)} bytes)")
+    return output
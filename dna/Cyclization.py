@@ -0,0 +1,152 @@
+# =============================================================================
+# Propension à la cyclisation le long d'une séquence : pour chaque fenêtre de L
+# bases, distance entre ses extrémités et angle entre les axes de l'hélice à
+# ses deux bouts (0° pour des extrémités alignées).
+#
+# Avec P_k le produit des k premières matrices de pas, la transformation de la
+# fenêtre commençant en i vaut P_i^-1 @ P_(i+L-1). Les matrices de pas étant
+# des déplacements rigides, l'inverse s'obtient sans inversion générale
+# (rotation transposée). La séquence est découpée en blocs indépendants : dans
+# un bloc, les produits sont cumulés depuis le début du bloc (le produit des
+# blocs précédents se simplifie), ce qui évite de propager les erreurs
+# d'arrondi le long du génome et permet de répartir les blocs sur plusieurs
+# processus. Chaque longueur coûte O(N), au lieu de O(N.L) en recalculant
+# chaque fenêtre.
+# =============================================================================
+
+import collections
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Sequence import encode, load_sequence
+from dna.SharedSequences import SequenceRegistry, attach
+from dna.Traj3D import Traj3D, prefix_products
+
+# Séquence encodée, lue en mémoire partagée par chaque processus (cf _init_worker)
+_worker_encoded = None
+
+
+def rigid_inverse(matrices) -> np.ndarray:
+    """Inverse d'une pile de déplacements rigides (..., 4, 4) : [R t]^-1 = [R^T -R^T t]"""
+    inverse = np.zeros_like(matrices)
+    rotation = np.swapaxes(matrices[..., :3, :3], -1, -2)
+    inverse[..., :3, :3] = rotation
+    inverse[..., :3, 3] = -(rotation @ matrices[..., :3, 3, None])[..., 0]
+    inverse[..., 3, 3] = 1
+    return inverse
+
+
+def closure_chunk(encoded, steps, start, stop, lengths):
+    """Fermeture des fenêtres commençant entre start et stop - 1
+
+    Args:
+        encoded (np.ndarray): Séquence encodée entière (cf. Sequence.encode)
+        steps (np.ndarray): Les 16 matrices de pas de la table
+        start, stop (int): Positions de départ des fenêtres du bloc
+        lengths (list): Longueurs des fenêtres (en bases)
+
+    Returns:
+        list -- Pour chaque longueur, (positions de départ, distances, angles en degrés) ; seules
+                les fenêtres contenues dans la séquence sont calculées
+    """
+    n = len(encoded) + 1  # Nombre de bases
+    # Produits cumulés depuis le début du bloc : prefixes[k] = pas start à start + k - 1
+    end = min(stop + max(lengths) - 1, len(encoded))
+    prefixes = np.concatenate((np.eye(4)[None], prefix_products(steps[encoded[start:end]])))
+    inverses = rigid_inverse(prefixes)
+    results = []
+    for length in lengths:
+        starts = np.arange(start, max(min(stop, n - length + 1), start))
+        local = starts - start
+        windows = inverses[local] @ prefixes[local + length - 1]
+        distances = np.linalg.norm(windows[:, :3, 3], axis=1)
+        angles = np.degrees(np.arccos(np.clip(windows[:, 2, 2], -1, 1)))
+        results.append((starts, distances, angles))
+    return results
+
+
+def _init_worker(handles):
+    global _worker_encoded
+    _worker_encoded = attach(handles)[0]["encoded"]
+
+
+def _closure_shared(steps, start, stop, lengths):
+    """closure_chunk sur la séquence du registre partagé (elle n'est pas transmise à chaque tâche)"""
+    return closure_chunk(_worker_encoded, steps, start, stop, lengths)
+
+
+def scan(seq, rot_table, lengths, chunk=65536, workers=1):
+    """Fermeture de toutes les fenêtres de chaque longueur, par blocs de positions de départ
+
+    Args:
+        seq (str): Séquence d'ADN
+        rot_table (RotTable): Table de rotation
+        lengths (list): Longueurs des fenêtres (en bases, au moins 2)
+        chunk (int): Nombre de positions de départ par bloc
+        workers (int): Nombre de processus (1 : calcul dans le processus courant)
+
+    Yields:
+        tuple -- (longueur, positions de départ, distances, angles en degrés), bloc par bloc, dans
+                 l'ordre des positions
+    """
+    lengths = sorted(set(int(length) for length in lengths))
+    if not lengths or lengths[0] < 2:
+        raise ValueError("Window lengths must be at least 2 bases")
+    encoded = encode(seq)
+    steps = Traj3D().stepMatrices(rot_table)
+    starts = range(0, max(len(seq) - lengths[0] + 1, 0), chunk)
+    if workers == 1:
+        for start in starts:
+            for length, result in zip(lengths, closure_chunk(encoded, steps, start, start + chunk, lengths)):
+                yield (length,) + result
+        return
+    with SequenceRegistry([encoded]) as registry, \
+            ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(registry.handles(),)) as pool:
+        # Au plus deux blocs en attente par processus : la mémoire reste bornée sur un génome entier
+        pending = collections.deque()
+        for start in starts:
+            pending.append(pool.submit(_closure_shared, steps, start, start + chunk, lengths))
+            if len(pending) >= 2 * workers:
+                for length, result in zip(lengths, pending.popleft().result()):
+                    yield (length,) + result
+        while pending:
+            for length, result in zip(lengths, pending.popleft().result()):
+                yield (length,) + result
+
+
+def cyclization_main(seq_filename, JSON_filename, lengths, output=None, workers=None):
+    """Fonction appelée par __main__.py : écrit la fermeture de toutes les fenêtres de chaque longueur
+
+    Le fichier CSV (une ligne par fenêtre) est écrit au fil du calcul, et la fenêtre la plus
+    proche de se refermer est affichée pour chaque longueur.
+
+    Args:
+        seq_filename (str): Fichier FASTA (première séquence) ou corpus
+        JSON_filename (str): Table de rotation
+        lengths (list): Longueurs des fenêtres
+        output (str): Fichier CSV (défaut : results/cyclization.csv)
+        workers (int): Nombre de processus (défaut : nombre de processeurs)
+    """
+    output = output or os.path.join("results", "cyclization.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    seq = load_sequence(seq_filename)
+    best = {}
+    windows = 0
+    start = time.time()
+    with open(output, "w", newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["length", "start", "distance", "angle"])
+        for length, starts, distances, angles in scan(seq, RotTable(JSON_filename), lengths,
+                                                      workers=workers or os.cpu_count()):
+            writer.writerows(zip([length] * len(starts), starts.tolist(), distances.tolist(), angles.tolist()))
+            windows += len(starts)
+            if len(starts) and (length not in best or distances.min() < best[length][1]):
+                i = int(np.argmin(distances))
+                best[length] = (int(starts[i]), float(distances[i]), float(angles[i]))
+    print(f"{windows} windows written to {output} in {time.time() - start:.2f}s")
+    for length, (position, distance, angle) in sorted(best.items()):
+        print(f"Length {length}: best window at {position} (distance {distance:.2f}, angle {angle:.1f}°)")
+    return output
@@ -0,0 +1,328 @@
+# =============================================================================
+# Evaluation distribuée sur plusieurs machines. Un coordinateur (dans le
+# processus de l'optimiseur) distribue des lots de vecteurs de paramètres à des
+# workers connectés en TCP, qui renvoient les points d'arrivée des trajectoires.
+#
+# Chaque message est un en-tête JSON précédé de sa longueur (4 octets), suivi
+# d'une charge utile de float64 (petit-boutiste) dont la taille est dans
+# l'en-tête :
+#   worker -> coordinateur : register {sequences: [hash]}, result {job, count} + (count, 3)
+#   coordinateur -> worker : batch {job, sequence, count} + (count, 48), stop
+# Un lot envoyé à un worker qui se déconnecte (ou ne répond pas à temps) est
+# remis en file et confié à un autre worker. Un appel échoue (ConnectionError)
+# si aucun worker connecté ne possède sa séquence pendant orphan_timeout
+# secondes, ou si le coordinateur est fermé ; result n'attend jamais plus de
+# RESULT_TIMEOUT secondes par défaut.
+# =============================================================================
+
+import collections
+import itertools
+import json
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from dna.Sequence import FASTA_EXTENSIONS, encode, list_files, read_fasta
+from dna.Store import sequence_hash
+from dna.Traj3D import product, step_matrices
+
+HEADER = struct.Struct("!I")
+MAX_HEADER = 1 << 24                        # Taille maximale d'un en-tête JSON (octets)
+PAYLOAD_WIDTHS = {"batch": 48, "result": 3}  # Nombre de float64 par ligne de la charge utile
+RESULT_TIMEOUT = 3600.0                     # Attente maximale d'un résultat par défaut (secondes)
+
+
+def send_message(sock, header, payload=None):
+    """Envoie un en-tête JSON et une charge utile optionnelle de float64"""
+    data = b"" if payload is None else np.ascontiguousarray(payload, dtype="<f8").tobytes()
+    header = json.dumps(dict(header, size=len(data))).encode()
+    sock.sendall(HEADER.pack(len(header)) + header + data)
+
+
+def _receive_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def receive_message(sock, max_count=None):
+    """Reçoit un message : (en-tête, tableau de float64 ou None)
+
+    La taille de la charge utile est vérifiée avant d'être lue : elle doit valoir count lignes
+    (cf. PAYLOAD_WIDTHS), avec au plus max_count lignes ; sinon ValueError.
+    """
+    (length,) = HEADER.unpack(_receive_exactly(sock, HEADER.size))
+    if length > MAX_HEADER:
+        raise ValueError(f"message header of {length} bytes")
+    header = json.loads(_receive_exactly(sock, length))
+    size, count = header.get("size", 0), header.get("count", 0)
+    if not isinstance(size, int) or not isinstance(count, int) or count < 0 or \
+            (max_count is not None and count > max_count):
+        raise ValueError(f"invalid message size {size} for {count} rows")
+    if size != count * PAYLOAD_WIDTHS.get(header.get("type"), 0) * 8:
+        raise ValueError(f"payload of {size} bytes does not match {count} rows of a {header.get('type')} message")
+    payload = np.frombuffer(_receive_exactly(sock, size), dtype="<f8") if size else None
+    return header, payload
+
+
+def endpoints(vectors, encoded):
+    """Points d'arrivée (n, 3) d'une séquence encodée pour n vecteurs de paramètres (n, 48)"""
+    steps = step_matrices(np.asarray(vectors).reshape(-1, 16, 3))
+    return np.array([product(s[encoded])[:3, 3] for s in steps])
+
+
+class _Pending:
+    """Résultat attendu d'un appel à Coordinator.submit"""
+
+    def __init__(self, n, jobs):
+        self.points = np.empty((n, 3))
+        self.remaining = jobs
+        self.error = None
+        self.done = threading.Event()
+        if jobs == 0:
+            self.done.set()
+
+    def fail(self, error):
+        """Termine l'appel en erreur : result lève error"""
+        if not self.done.is_set():
+            self.error = error
+            self.done.set()
+
+    def result(self, timeout=RESULT_TIMEOUT) -> np.ndarray:
+        if not self.done.wait(timeout):
+            raise TimeoutError("distributed evaluation timed out")
+        if self.error is not None:
+            raise self.error
+        return self.points
+
+
+class Coordinator:
+    """Coordinateur de l'évaluation distribuée
+
+    Les workers se connectent à l'adresse d'écoute et sont servis chacun par un thread.
+    submit/evaluate découpent les vecteurs en lots, qui sont distribués aux workers
+    possédant la séquence demandée.
+
+    Args:
+        host (str): Adresse d'écoute
+        port (int): Port d'écoute (0 : choisi par le système, cf. address)
+        batch_size (int): Nombre maximal de vecteurs par lot
+        job_timeout (float): Délai au-delà duquel un worker qui n'a pas répondu est considéré perdu
+        orphan_timeout (float): Délai au-delà duquel les lots d'une séquence qu'aucun worker connecté
+                                ne possède échouent
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, batch_size=32, job_timeout=300.0, orphan_timeout=60.0):
+        self.batch_size = batch_size
+        self.job_timeout = job_timeout
+        self.orphan_timeout = orphan_timeout
+        self.server = socket.create_server((host, port))
+        self.address = self.server.getsockname()[:2]
+        self.queue = collections.deque()
+        self.condition = threading.Condition()
+        self.workers = {}       # Identifiant -> hashes des séquences du worker
+        self.lost = 0           # Nombre de workers perdus
+        self.requeued = 0       # Nombre de lots remis en file
+        self.closed = False
+        self._ids = itertools.count()
+        self._hashes = {}
+        self._pending = set()   # Appels non terminés
+        self._orphans = {}      # Hash d'une séquence sans worker -> instant où c'est constaté
+        threading.Thread(target=self._accept, daemon=True).start()
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    # -------------------------------------------------------------------------
+    # Interface des optimiseurs
+    # -------------------------------------------------------------------------
+    def submit(self, vectors, seq) -> _Pending:
+        """Met en file l'évaluation de vecteurs (n, 48) sur une séquence, sans attendre"""
+        vectors = np.asarray(vectors, dtype=float).reshape(-1, 48)
+        if seq not in self._hashes:
+            self._hashes[seq] = sequence_hash(seq)
+        key = self._hashes[seq]
+        starts = range(0, len(vectors), self.batch_size)
+        pending = _Pending(len(vectors), len(starts))
+        with self.condition:
+            if self.closed:
+                raise ConnectionError("coordinator is closed")
+            if len(starts):
+                self._pending.add(pending)
+            for start in starts:
+                self.queue.append((next(self._ids), key, start, vectors[start:start + self.batch_size], pending))
+            self.condition.notify_all()
+        return pending
+
+    def evaluate(self, vectors, seq, timeout=RESULT_TIMEOUT) -> np.ndarray:
+        """Points d'arrivée (n, 3) de vecteurs (n, 48) sur une séquence"""
+        return self.submit(vectors, seq).result(timeout)
+
+    def wait_workers(self, n=1, timeout=None) -> bool:
+        """Attend qu'au moins n workers soient connectés"""
+        with self.condition:
+            return self.condition.wait_for(lambda: len(self.workers) >= n, timeout)
+
+    def close(self):
+        """Arrête les workers connectés, fait échouer les appels en cours et ferme le port d'écoute"""
+        with self.condition:
+            self.closed = True
+            self.queue.clear()
+            for pending in self._pending:
+                pending.fail(ConnectionError("coordinator closed before the evaluation completed"))
+            self._pending.clear()
+            self.condition.notify_all()
+        self.server.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    # -------------------------------------------------------------------------
+    # Service des workers
+    # -------------------------------------------------------------------------
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self.server.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), daemon=True).start()
+
+    def _watch(self):
+        """Fait échouer les lots dont aucun worker connecté ne possède la séquence depuis orphan_timeout"""
+        with self.condition:
+            while not self.closed:
+                now = time.monotonic()
+                held = set().union(*self.workers.values())
+                waiting = {job[1] for job in self.queue} - held
+                self._orphans = {key: self._orphans.get(key, now) for key in waiting}
+                expired = {key for key, since in self._orphans.items() if now - since >= self.orphan_timeout}
+                for job in [job for job in self.queue if job[1] in expired]:
+                    self.queue.remove(job)
+                    job[4].fail(ConnectionError(f"no connected worker holds sequence {job[1]}"))
+                    self._pending.discard(job[4])
+                self.condition.wait(max(min(1.0, self.orphan_timeout), 0.01))
+
+    def _next_job(self, sequences):
+        """Retire de la file le premier lot portant sur une séquence du worker (None à la fermeture)"""
+        with self.condition:
+            while not self.closed:
+                for job in self.queue:
+                    if job[1] in sequences:
+                        self.queue.remove(job)
+                        return job
+                self.condition.wait()
+        return None
+
+    def _serve(self, sock):
+        worker = next(self._ids)
+        job = None
+        try:
+            sock.settimeout(self.job_timeout)
+            header, _ = receive_message(sock, max_count=0)
+            if header.get("type") != "register":
+                return
+            sequences = set(header["sequences"])
+            with self.condition:
+                self.workers[worker] = sequences
+                self.condition.notify_all()
+            while True:
+                job = self._next_job(sequences)
+                if job is None:
+                    send_message(sock, {"type": "stop"})
+                    return
+                job_id, key, start, vectors, pending = job
+                send_message(sock, {"type": "batch", "job": job_id, "sequence": key, "count": len(vectors)},
+                             vectors)
+                header, payload = receive_message(sock, max_count=len(vectors))
+                if header.get("type") != "result" or header.get("job") != job_id or \
+                        header.get("count") != len(vectors):
+                    raise ConnectionError(f"unexpected message {header}")
+                job = None
+                with self.condition:
+                    if pending.error is None:
+                        pending.points[start:start + len(vectors)] = payload.reshape(-1, 3)
+                        pending.remaining -= 1
+                        if pending.remaining == 0:
+                            pending.done.set()
+                            self._pending.discard(pending)
+        except Exception:
+            # Worker perdu ou message invalide : son lot en cours est remis en tête de file
+            with self.condition:
+                self.lost += 1
+                if job is not None and not self.closed and job[4].error is None:
+                    self.queue.appendleft(job)
+                    self.requeued += 1
+                    self.condition.notify_all()
+        finally:
+            with self.condition:
+                self.workers.pop(worker, None)
+            sock.close()
+
+
+class Worker:
+    """Worker d'évaluation : calcule les points d'arrivée des lots reçus du coordinateur
+
+    Args:
+        seqs (list): Séquences disponibles sur cette machine
+        fail_after (int): Coupe la connexion sans répondre après ce nombre de lots
+                          (simulation de panne, pour les tests)
+    """
+
+    def __init__(self, seqs, fail_after=None):
+        self.encoded = {sequence_hash(seq): encode(seq) for seq in seqs}
+        self.fail_after = fail_after
+        self.batches = 0
+
+    def run(self, host, port, retry=30.0):
+        """Se connecte au coordinateur (en réessayant pendant retry secondes) et traite les lots jusqu'à l'arrêt"""
+        deadline = time.monotonic() + retry
+        while True:
+            try:
+                sock = socket.create_connection((host, port))
+                break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.5)
+        with sock:
+            send_message(sock, {"type": "register", "sequences": list(self.encoded)})
+            while True:
+                try:
+                    header, payload = receive_message(sock)
+                except ConnectionError:
+                    return
+                if header["type"] == "stop":
+                    return
+                if self.fail_after is not None and self.batches >= self.fail_after:
+                    return
+                points = endpoints(payload.reshape(-1, 48), self.encoded[header["sequence"]])
+                send_message(sock, {"type": "result", "job": header["job"], "count": len(points)}, points)
+                self.batches += 1
+
+
+def parse_address(address, default_host="127.0.0.1"):
+    """'hôte:port' ou 'port' -> (hôte, port)"""
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
+
+
+def worker_main(address, seq_paths):
+    """Fonction appelée par __main__.py : lance un worker connecté au coordinateur address
+
+    Args:
+        address (str): 'hôte:port' du coordinateur
+        seq_paths (list): Fichiers FASTA ou dossiers : toutes leurs séquences sont proposées au coordinateur
+    """
+    seqs = [seq for filename in list_files(seq_paths, FASTA_EXTENSIONS) for _, seq in read_fasta(filename)]
+    host, port = parse_address(address)
+    print(f"Worker connecting to {host}:{port} with {len(seqs)} sequence(s)")
+    Worker(seqs).run(host, port)
@@ -0,0 +1,253 @@
+# =============================================================================
+# Moteurs d'évaluation interchangeables. Tous respectent le même contrat :
+#     score(params, sequences) -> distances de fermeture (n, m)
+# pour n vecteurs de 48 paramètres et m séquences (endpoints donne les points
+# d'arrivée (n, m, 3) correspondants). Les optimiseurs passent par ce contrat
+# (cf. Objective, Genetic.evaluer), le moteur est choisi avec --backend :
+#   - reference : Traj3D.compute, nucléotide par nucléotide (implémentation de référence)
+#   - numpy     : matrices de pas indexées puis produit par paires, candidat par candidat
+#   - batch     : toute la population en une fois, la séquence étant parcourue par blocs
+#   - pool      : processus de calcul, séquences en mémoire partagée
+# ainsi que les moteurs internes grammar (séquences compressées, cf. Grammar) et
+# distributed (workers distants, cf. Distributed). python -m dna.Evaluator
+# compare leurs temps sur les mêmes séquences.
+# =============================================================================
+
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dna.Batch import init_worker, score_steps
+from dna.Distributed import RESULT_TIMEOUT
+from dna.Grammar import Grammar
+from dna.RotTable import RotTable
+from dna.Sequence import encode, load_sequence
+from dna.SharedSequences import SequenceRegistry
+from dna.Traj3D import Traj3D, product, step_matrices
+
+
+class Evaluator:
+    """Interface des moteurs d'évaluation : les sous-classes définissent endpoints"""
+
+    name = None
+
+    def __init__(self):
+        self._encoded = {}  # Séquence -> séquence encodée (encodée une seule fois)
+
+    def encoded(self, seq) -> np.ndarray:
+        if seq not in self._encoded:
+            self._encoded[seq] = encode(seq)
+        return self._encoded[seq]
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        """Points d'arrivée (n, m, 3) de n vecteurs de paramètres (n, 48) sur m séquences"""
+        raise NotImplementedError
+
+    def score(self, params, sequences) -> np.ndarray:
+        """Distances de fermeture (n, m) de n vecteurs de paramètres (n, 48) sur m séquences"""
+        return np.linalg.norm(self.endpoints(params, sequences), axis=-1)
+
+    def close(self):
+        """Libère les ressources du moteur (processus, mémoire partagée)"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ReferenceEvaluator(Evaluator):
+    """Trajectoire complète par Traj3D.compute, une table et une séquence à la fois"""
+
+    name = "reference"
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        params = np.asarray(params, dtype=float).reshape(-1, 48)
+        points = np.empty((len(params), len(sequences), 3))
+        traj, rot_table = Traj3D(), RotTable()
+        for b, vector in enumerate(params):
+            rot_table.setVector(vector)
+            for s, seq in enumerate(sequences):
+                traj.compute(seq, rot_table)
+                points[b, s] = traj.getTraj()[-1][:3]
+        return points
+
+
+class NumpyEvaluator(Evaluator):
+    """Matrices de pas indexées par la séquence encodée et produit par paires, candidat par candidat"""
+
+    name = "numpy"
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        params = np.asarray(params, dtype=float).reshape(-1, 48)
+        points = np.empty((len(params), len(sequences), 3))
+        for b, steps in enumerate(step_matrices(params.reshape(-1, 16, 3))):
+            for s, seq in enumerate(sequences):
+                points[b, s] = product(steps[self.encoded(seq)])[:3, 3]
+        return points
+
+
+class BatchEvaluator(Evaluator):
+    """Toute la population à la fois : chaque bloc de la séquence est réduit pour tous les candidats
+
+    Args:
+        block (int): Nombre de matrices (candidats x pas) par bloc, qui borne la mémoire
+    """
+
+    name = "batch"
+
+    def __init__(self, block=1 << 16):
+        super().__init__()
+        self.block = block
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        params = np.asarray(params, dtype=float).reshape(-1, 48)
+        steps = step_matrices(params.reshape(-1, 16, 3))
+        points = np.empty((len(params), len(sequences), 3))
+        length = max(self.block // max(len(params), 1), 1)
+        for s, seq in enumerate(sequences):
+            encoded = self.encoded(seq)
+            total = np.broadcast_to(np.eye(4), (len(params), 4, 4))
+            for start in range(0, len(encoded), length):
+                total = total @ product(steps[:, encoded[start:start + length]])
+            points[:, s] = total[:, :3, 3]
+        return points
+
+
+class PoolEvaluator(Evaluator):
+    """Une tâche par (candidat, séquence) sur des processus de calcul
+
+    Les séquences encodées sont placées en mémoire partagée (SequenceRegistry) au démarrage des
+    processus ; une séquence nouvelle redémarre les processus avec toutes les séquences connues.
+
+    Args:
+        workers (int): Nombre de processus (défaut : nombre de processeurs)
+    """
+
+    name = "pool"
+
+    def __init__(self, workers=None):
+        super().__init__()
+        self.workers = workers or os.cpu_count()
+        self._index = {}  # Séquence -> indice dans le registre
+        self._registry = None
+        self._pool = None
+
+    def _start(self, sequences):
+        missing = [seq for seq in sequences if seq not in self._index]
+        if missing:
+            self.close()
+            for seq in missing:
+                self._index[seq] = len(self._index)
+        if self._pool is None:
+            self._registry = SequenceRegistry([self.encoded(seq) for seq in self._index])
+            self._pool = ProcessPoolExecutor(self.workers, initializer=init_worker,
+                                             initargs=(self._registry.handles(),))
+        return self._pool
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        params = np.asarray(params, dtype=float).reshape(-1, 48)
+        steps = step_matrices(params.reshape(-1, 16, 3))
+        points = np.empty((len(params), len(sequences), 3))
+        pool = self._start(sequences)
+        futures = [(s, pool.submit(score_steps, b, steps[b], self._index[seq]))
+                   for s, seq in enumerate(sequences) for b in range(len(params))]
+        for s, future in futures:
+            b, _, _, x, y, z = future.result()
+            points[b, s] = x, y, z
+        return points
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._registry.close()
+            self._pool = self._registry = None
+
+
+class GrammarEvaluator(Evaluator):
+    """Séquences compressées en grammaire (cf. Grammar) : chaque règle n'est multipliée qu'une fois
+
+    Args:
+        grammars (dict): Grammaires déjà construites, par séquence (optionnel)
+    """
+
+    name = "grammar"
+
+    def __init__(self, grammars=None):
+        super().__init__()
+        self.grammars = dict(grammars or {})
+
+    def grammar(self, seq) -> Grammar:
+        if seq not in self.grammars:
+            self.grammars[seq] = Grammar(self.encoded(seq))
+        return self.grammars[seq]
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        params = np.asarray(params, dtype=float).reshape(-1, 48)
+        steps = step_matrices(params.reshape(-1, 16, 3))
+        points = np.empty((len(params), len(sequences), 3))
+        for s, seq in enumerate(sequences):
+            points[:, s] = self.grammar(seq).transform(steps)[:, :3, 3]
+        return points
+
+
+class DistributedEvaluator(Evaluator):
+    """Evaluation sur des workers distants (cf. Distributed.Coordinator, fermé par son propriétaire)
+
+    Args:
+        coordinator (Coordinator): Coordinateur auquel les workers sont connectés
+        timeout (float): Attente maximale des points d'arrivée d'une séquence (TimeoutError au-delà)
+    """
+
+    name = "distributed"
+
+    def __init__(self, coordinator, timeout=RESULT_TIMEOUT):
+        super().__init__()
+        self.coordinator = coordinator
+        self.timeout = timeout
+
+    def endpoints(self, params, sequences) -> np.ndarray:
+        params = np.asarray(params, dtype=float).reshape(-1, 48)
+        points = np.empty((len(params), len(sequences), 3))
+        # Toutes les séquences sont envoyées aux workers avant d'attendre le premier résultat
+        pending = [(s, self.coordinator.submit(params, seq)) for s, seq in enumerate(sequences)]
+        for s, p in pending:
+            points[:, s] = p.result(self.timeout)
+        return points
+
+
+# Moteurs proposés par --backend
+BACKENDS = {evaluator.name: evaluator for evaluator in (ReferenceEvaluator, NumpyEvaluator, BatchEvaluator,
+                                                        PoolEvaluator)}
+
+
+def make_evaluator(name, workers=None) -> Evaluator:
+    """Construit le moteur d'évaluation name (cf. BACKENDS) ; workers ne concerne que pool"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown evaluator backend {name!r}, expected one of {', '.join(BACKENDS)}")
+    return PoolEvaluator(workers) if name == "pool" else BACKENDS[name]()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the evaluator backends on the same sequences")
+    parser.add_argument("files", nargs='+', help="FASTA files (first record of each)")
+    parser.add_argument("-n", "--tables", type=int, default=10, help="number of random tables per call")
+    parser.add_argument("-b", "--backends", nargs='+', default=list(BACKENDS) + ["grammar"],
+                        choices=list(BACKENDS) + ["grammar"])
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    options = parser.parse_args()
+    sequences = [load_sequence(filename) for filename in options.files]
+    params = RotTable().getVector() + np.random.default_rng(0).normal(0, 0.3, (options.tables, 48))
+    reference = None
+    for name in options.backends:
+        with (GrammarEvaluator() if name == "grammar" else make_evaluator(name, options.workers)) as evaluator:
+            evaluator.score(params[:1], sequences)  # Préparation (encodage, processus, grammaire)
+            start = time.perf_counter()
+            distances = evaluator.score(params, sequences)
+            elapsed = time.perf_counter() - start
+        reference = distances if reference is None else reference
+        print(f"{name:>10}: {elapsed:8.3f}s for {len(params)} tables x {len(sequences)} sequences"
+              f" (max deviation {np.max(np.abs(distances - reference)):.2e})")
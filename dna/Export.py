@@ -0,0 +1,120 @@
+# =============================================================================
+# Export des coordonnées d'une trajectoire pour d'autres outils, sans passer par
+# une figure matplotlib :
+#   - npz : tableau "coordinates" (n, 3) en float64 dans une archive compressée
+#   - xyz : une ligne "base x y z" par nucléotide
+#   - pdb : modèle gros grain, un atome P par nucléotide (résidus DA, DC, DG, DT)
+#
+# Les points sont calculés par blocs (cf. Traj3D.trajectory_chunks) et écrits au
+# fil du calcul : le temps est linéaire et la mémoire bornée par la taille d'un
+# bloc, même pour des séquences de plusieurs mégabases.
+# =============================================================================
+
+import os
+import time
+import zipfile
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Traj3D import Traj3D, trajectory_chunks
+
+FORMATS = ("npz", "xyz", "pdb")
+# Identifiants de chaîne du PDB : une chaîne par tranche de 9999 résidus, réutilisés circulairement
+CHAINS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def write_npz(filename, n, chunks):
+    """Ecrit les n points dans l'archive compressée filename, tableau "coordinates" (n, 3)
+
+    L'en-tête .npy est écrit d'abord (la forme est connue), puis chaque bloc est compressé à la
+    suite dans l'archive : np.load(filename)["coordinates"] relit le tableau.
+    """
+    header = {"descr": np.lib.format.dtype_to_descr(np.dtype("<f8")), "fortran_order": False, "shape": (n, 3)}
+    with zipfile.ZipFile(filename, "w", zipfile.ZIP_DEFLATED) as archive:
+        with archive.open("coordinates.npy", "w", force_zip64=True) as file:
+            np.lib.format.write_array_header_1_0(file, header)
+            for points in chunks:
+                file.write(points.astype("<f8").tobytes())
+
+
+def write_xyz(filename, seq, chunks):
+    """Ecrit les points au format XYZ : nombre d'atomes, commentaire, puis "base x y z" par ligne"""
+    with open(filename, "w") as file:
+        file.write(f"{len(seq)}\nDNA trajectory\n")
+        start = 0
+        for points in chunks:
+            bases = seq[start:start + len(points)]
+            file.write("".join(f"{b} {x:.4f} {y:.4f} {z:.4f}\n" for b, (x, y, z) in zip(bases, points.tolist())))
+            start += len(points)
+
+
+def pdb_coordinate(value) -> str:
+    """Coordonnée sur les 8 colonnes du PDB, avec moins de décimales si elle est trop grande"""
+    for decimals in (3, 2, 1, 0):
+        text = f"{value:8.{decimals}f}"
+        if len(text) == 8:
+            return text
+    raise ValueError(f"Coordinate {value} does not fit in a PDB record")
+
+
+def write_pdb(filename, seq, chunks):
+    """Ecrit un modèle PDB gros grain : un atome P par nucléotide
+
+    Les numéros d'atome (5 colonnes) sont pris modulo 100000 et chaque tranche de 9999 résidus
+    forme une chaîne numérotée à partir de 1 (4 colonnes), pour que les longues séquences restent lisibles.
+    """
+    with open(filename, "w") as file:
+        file.write("REMARK   1 COARSE-GRAINED DNA TRAJECTORY, ONE P ATOM PER NUCLEOTIDE\n")
+        i = 0
+        for points in chunks:
+            lines = []
+            for x, y, z in points.tolist():
+                residue = f"D{seq[i].upper()}"
+                chain = CHAINS[(i // 9999) % len(CHAINS)]
+                lines.append(f"ATOM  {(i + 1) % 100000:5d}  P   {residue:>3s} {chain}{i % 9999 + 1:4d}    "
+                             f"{pdb_coordinate(x)}{pdb_coordinate(y)}{pdb_coordinate(z)}  1.00  0.00           P\n")
+                i += 1
+            file.write("".join(lines))
+        file.write("TER\nEND\n")
+
+
+def export_trajectory(seq, rot_table, filename, fmt, chunk=65536) -> float:
+    """Calcule la trajectoire par blocs et l'écrit dans filename au format fmt
+
+    Args:
+        seq (str): Séquence d'ADN
+        rot_table (RotTable): Table de rotation
+        filename (str): Fichier de sortie
+        fmt (str): Format, parmi FORMATS
+        chunk (int): Nombre de points par bloc
+
+    Returns:
+        float -- Distance entre le premier et le dernier point
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    last = np.zeros(3)
+
+    def chunks():
+        nonlocal last
+        for points in trajectory_chunks(encode(seq), Traj3D().stepMatrices(rot_table), chunk):
+            last = points[-1]
+            yield points
+
+    if fmt == "npz":
+        write_npz(filename, len(seq), chunks())
+    elif fmt == "xyz":
+        write_xyz(filename, seq, chunks())
+    else:
+        write_pdb(filename, seq, chunks())
+    return float(np.linalg.norm(last))
+
+
+def export_file(seq, filename, JSON_filename, fmt):
+    """Fonction appelée par Traditionnal.py : écrit la trajectoire dans <filename>.<fmt>"""
+    output = f"{filename}.{fmt}"
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    start = time.time()
+    distance = export_trajectory(seq, RotTable(JSON_filename), output, fmt)
+    print(f"{len(seq)} points written to {output} in {time.time() - start:.2f}s")
+    return distance
@@ -5,8 +5,13 @@
 
 from dna.RotTable import RotTable
 from dna.Traj3D import *
+from dna.Sequence import encode, DINUCLEOTIDES
+from dna.Checkpoint import load, rng_restore, rng_snapshot
+from dna.Bounds import default_bounds, table_vector
+from dna.Evaluator import DistributedEvaluator, ReferenceEvaluator
 from math import *
 import random
+import numpy as np
 from copy import deepcopy
 import time
 import matplotlib.pyplot as plt
@@ -29,6 +34,7 @@ class Individu:
         self.data = RotTable()  # Paramètres de rotation (Twist, Wedge, Direction)
         self.traj = Traj3D()
         self.score = None       # Score de l'individu (calculé via calcul_dist)
+        self.exact = False      # Score calculé exactement (evaluer) pour les paramètres actuels, et non estimé
         self.bruit = {}         # Dictionnaire pour stocker les seuils min et max de bruit/ne pas sortir des bornes pour
         # les paramètres
 
@@ -78,6 +84,7 @@ class Individu:
         # Copie de la trajectoire, du score et du bruit
         new.traj = deepcopy(self.traj)
         new.score = self.score
+        new.exact = self.exact
         new.bruit = deepcopy(self.bruit)
         return new
 
@@ -116,11 +123,32 @@ class Individu:
     # Méthode principale
     # -------------------------------------------------------------------------
 
-    def add_bruit(self, dinucleotide: str):
+    def seed(self, vector):
+        """
+        Input :
+        - vector : 48 paramètres (ordre de DINUCLEOTIDES), par exemple ceux d'une table de results/
+
+        Output : None
+
+        Remplace les paramètres de l'individu, ramenés dans les bornes de la table par défaut,
+        et recalcule les plages de bruit par rapport à ces mêmes bornes
+        """
+
+        bounds = default_bounds()
+        vector = bounds.clip(vector)
+        self.data.setVector(vector)
+        # Plages de bruit : (-marge vers le bas, marge vers le haut) de chaque paramètre
+        slack = bounds.slack(vector).reshape(16, 3, 2)
+        for i, di in enumerate(DINUCLEOTIDES):
+            self.bruit[di] = [(-low, high) for low, high in slack[i].tolist()]
+        self.exact = False  # Nouveaux paramètres : le score est à recalculer
+
+    def add_bruit(self, dinucleotide: str, scale=1.0):
         """
         Input : 
         - self : Individu
         - dinucleotide : String représentant le di_nucléatide dont les valeurs vont être changées
+        - scale : float, fraction des plages de bruit dans laquelle on tire (1 : plages entières)
 
         Output : None
 
@@ -137,9 +165,9 @@ class Individu:
             2][1]
 
         # On tire trois valeurs uniformes indépendantes dans nos bornes possibles
-        unif_t = random.uniform(twist_min, twist_max)
-        unif_w = random.uniform(wedge_min, wedge_max)
-        unif_d = random.uniform(direction_min, direction_max)
+        unif_t = random.uniform(scale * twist_min, scale * twist_max)
+        unif_w = random.uniform(scale * wedge_min, scale * wedge_max)
+        unif_d = random.uniform(scale * direction_min, scale * direction_max)
 
         # Met à jour le dinucléotide avec ces nouveaux paramètres
         self.setDinucleotide(
@@ -160,6 +188,7 @@ class Individu:
             (wedge_min, wedge_max),
             (direction_min, direction_max)
         ]
+        self.exact = False  # Paramètres modifiés : le score est à recalculer
 
 
 # =============================================================================
@@ -173,17 +202,28 @@ class Individu:
 # =============================================================================
 class Genetique:
 
-    def __init__(self, len_pop):
+    def __init__(self, len_pop, seeds=None, scale=0.1):
         # Crée une liste d'individus de taille len_pop
         self.population = [Individu() for _ in range(len_pop)]
 
-        # Pour chaque individu, on ajoute un bruit initial sur tous les dinucléotides (1ere genération aléatoire)
-        for ind in self.population:
-            for dinucleotide in ind.data.getTable():
-                ind.add_bruit(dinucleotide)
+        if seeds:
+            # Démarrage à chaud : les premiers individus reprennent les tables données (seeds),
+            # les suivants en sont des copies perturbées dans une fraction scale des plages de bruit
+            for i, ind in enumerate(self.population):
+                ind.seed(seeds[i % len(seeds)])
+                if i >= len(seeds):
+                    for dinucleotide in ind.data.getTable():
+                        ind.add_bruit(dinucleotide, scale)
+        else:
+            # Pour chaque individu, on ajoute un bruit initial sur tous les dinucléotides (1ere genération aléatoire)
+            for ind in self.population:
+                for dinucleotide in ind.data.getTable():
+                    ind.add_bruit(dinucleotide)
 
         self.len_pop = len_pop
         self.best_individu = None  # On stock le meilleur individu (c'est a dire distance minimale)
+        self.evaluations = 0       # Nombre d'évaluations de trajectoires effectuées
+        self.restarts = 0          # Nombre de redémarrages (cf. restart)
 
     def __str__(self):
         """
@@ -209,6 +249,35 @@ class Genetique:
     def getBest_individu(self):
         return self.best_individu
 
+    # -------------------------------------------------------------------------
+    # Points de reprise
+    # -------------------------------------------------------------------------
+
+    def snapshot(self) -> dict:
+        """
+        Output : dict de tableaux numpy -> état complet de la population (paramètres, bruit,
+        scores, points d'arrivée) et du meilleur individu, pour un point de reprise
+        """
+
+        data = _individus_arrays(self.population, "pop_")
+        if self.best_individu is not None:
+            data.update(_individus_arrays([self.best_individu], "best_"))
+        data["counters"] = np.array([self.len_pop, self.evaluations, self.restarts])
+        return data
+
+    def restore(self, data):
+        """
+        Input : dict de tableaux sauvegardé par snapshot
+
+        Output : None -> remplace la population, le meilleur individu et les compteurs
+        """
+
+        self.population = _individus_from_arrays(data, "pop_")
+        self.best_individu = _individus_from_arrays(data, "best_")[0] if "best_values" in data else None
+        counters = [int(c) for c in data["counters"]]
+        self.len_pop, self.evaluations = counters[:2]
+        self.restarts = counters[2] if len(counters) > 2 else 0  # Points de reprise antérieurs aux redémarrages
+
     # =============================================================================
     # Méthodes principales
     # =============================================================================
@@ -261,7 +330,7 @@ class Genetique:
         # puis on ne garde que les meilleurs (c'est à dire les rate*100% premiers)
         self.population = sorted(
             self.population,
-            key=lambda x: calcul_dist(x),
+            key=lambda x: x.score,  # score = calcul_dist(x), ou estimation du modèle de substitution
             reverse=False
         )[: self.len_pop]
 
@@ -334,21 +403,95 @@ class Genetique:
     # -------------------------------------------------------------------------
     # Méthode pour la fonction fitness
     # -------------------------------------------------------------------------
-    def refresh_score(self, seq):
+    def refresh_score(self, seq, surrogate=None, backend=None, objective=None, evaluator=None):
         """
         Input : 
         - Genetique
         - seq : str, séquence d'adn traitées
+        - surrogate : Surrogate optionnel, modèle de substitution qui choisit les individus
+                      évalués exactement
+        - backend : Coordinator optionnel, évalue les individus sur des workers distants
+                    (seul le point d'arrivée de la trajectoire est alors connu)
+        - objective : Objective optionnel, le score est alors la racine de l'énergie pondérée
+                      sur toutes ses séquences (seq est la première d'entre elles)
+        - evaluator : Evaluator optionnel, moteur d'évaluation des individus (cf. Evaluator)
 
         Output : None -> Recalcul le score et met a jour son attribut (score) de
         chaque individu dans la population
 
+        Avec un modèle de substitution, seuls les individus sans score exact à jour (enfants,
+        individus mutés ou réparés, individus écartés à la génération précédente) passent par le
+        modèle : les survivants gardent leur score exact et leur point d'arrivée. Parmi les nouveaux,
+        seuls les plus prometteurs sont évalués ; les autres reçoivent un score pessimiste (jamais
+        meilleur que le pire score exact) pour ne pas fausser la sélection, puis le modèle est
+        réajusté avec les nouveaux scores.
         """
 
-        for individu in self.population:
-            individu.traj.compute(seq, individu.data)  # Calcule la trajectoire
-            score = calcul_dist(individu)              # Calcule la distance finale
-            individu.setScore(score)                   # Met a jour l'attribut
+        if surrogate is None:
+            self.evaluer(range(len(self.population)), seq, backend, objective=objective, evaluator=evaluator)
+            self.evaluations += len(self.population)
+            return
+
+        pending = np.array([i for i, individu in enumerate(self.population) if not individu.exact], dtype=int)
+        if len(pending) == 0:
+            return
+        X = np.array([individu.data.getVector() for individu in self.population])
+        screened, predictions = surrogate.screen(X[pending])
+        exact = pending[screened]
+        self.evaluer(exact, seq, backend, X, evaluator=evaluator)
+        scores = [self.population[i].score for i in exact]
+        points = [self.population[i].getLastPoint() for i in exact]
+
+        if predictions is not None:
+            surrogate.record(predictions[screened], scores)
+            # Jamais meilleur qu'un score exact, ni que le meilleur individu déjà trouvé
+            known = [individu.score for individu in self.population if individu.exact]
+            worst = max(known + ([self.best_individu.score] if self.best_individu else []))
+            worst = np.nextafter(worst, np.inf)
+            skipped = np.setdiff1d(np.arange(len(pending)), screened)
+            for i in skipped:
+                self.population[pending[i]].setScore(max(float(predictions[i]), worst))
+                self.population[pending[i]].traj = Traj3D()  # Trajectoire non calculée
+            surrogate.skipped += len(skipped)
+        surrogate.exact += len(exact)
+        self.evaluations += len(exact)
+        surrogate.add(X[exact], points)
+        surrogate.fit()
+
+    def evaluer(self, indices, seq, backend=None, X=None, objective=None, evaluator=None):
+        """
+        Input :
+        - indices : indices des individus à évaluer
+        - seq : str, séquence d'adn
+        - backend : Coordinator optionnel (évaluation distante, en un seul envoi)
+        - X : tableau (len_pop, 48) optionnel des paramètres déjà extraits
+        - objective : Objective optionnel (toutes les séquences d'un individu évaluées ensemble)
+        - evaluator : Evaluator optionnel, moteur d'évaluation des individus (défaut : référence,
+                      Traj3D.compute)
+
+        Output : None -> calcule le point d'arrivée et le score des individus, en un seul appel
+        au moteur d'évaluation pour tous les individus
+        """
+
+        indices = list(indices)
+        if X is None:
+            vectors = np.array([self.population[i].data.getVector() for i in indices])
+        else:
+            vectors = X[indices]
+        if objective is not None:
+            points = objective.endpoints(vectors)
+            scores = np.sqrt(np.sum(points ** 2, axis=2) @ objective.weights)
+        else:
+            if backend is not None:
+                evaluator = DistributedEvaluator(backend)
+            points = (evaluator or ReferenceEvaluator()).endpoints(vectors, [seq])
+            scores = np.linalg.norm(points[:, 0], axis=1)
+        for i, point, score in zip(indices, points[:, 0], scores):
+            individu = self.population[i]
+            # Le point d'arrivée conservé est celui de la première séquence (seq)
+            individu.traj.setCoordinates(np.array([[0.0, 0.0, 0.0], point]))
+            individu.setScore(float(score))
+            individu.exact = True
 
     # -------------------------------------------------------------------------
     # Méthode pour le croisement
@@ -378,46 +521,7 @@ class Genetique:
 
             # Selection de 2 parents au hasards pour le croisement
             parent1, parent2 = random.sample(self.population, 2)
-            child1, child2 = Individu(), Individu()
-            table = parent1.data.getTable().keys()
-
-            # On récupère n dinucléotides (points de croisement)
-            crossover_points = random.sample(list(table), n)
-
-            # booléen qui permettra d'échanger les parties des chromosomes
-            between_cross_point = False
-
-            # On parcourt l'ensemble des dinucléotides
-            for dinucleotide in table:
-
-                # On récupére les paramètres des 2 parents
-                p1_T, p1_W, p1_D = (
-                    parent1.data.getTwist(dinucleotide),
-                    parent1.data.getWedge(dinucleotide),
-                    parent1.data.getDirection(dinucleotide)
-                )
-                p2_T, p2_W, p2_D = (
-                    parent2.data.getTwist(dinucleotide),
-                    parent2.data.getWedge(dinucleotide),
-                    parent2.data.getDirection(dinucleotide)
-                )
-
-                # Chaque fois qu'on rencontre un point de croisement,
-                # on inverse la logique de copie
-                if dinucleotide in crossover_points:
-                    between_cross_point = not between_cross_point
-
-                # Par défaut, child1 <- parent1 et child2 <- parent2
-                # mais si on est entre deux points, on échange
-                c_fst, c_snd = child1, child2
-                if between_cross_point:
-                    c_fst, c_snd = child2, child1
-
-                # On ajoute les chromosomes
-                c_fst.setDinucleotide(dinucleotide, p1_T, p1_W, p1_D)
-                c_fst.bruit[dinucleotide] = parent1.bruit[dinucleotide].copy()
-                c_snd.setDinucleotide(dinucleotide, p2_T, p2_W, p2_D)
-                c_snd.bruit[dinucleotide] = parent2.bruit[dinucleotide].copy()
+            child1, child2 = self.croiser(parent1, parent2, n)
 
             # ajout des 2 fils croisés
             self.population.extend([child1, child2])
@@ -434,6 +538,59 @@ class Genetique:
 
         self.len_pop = len(self.population)
 
+    def croiser(self, parent1, parent2, n=2):
+        """
+        Input : 
+        - Genetique
+        - parent1, parent2 : Individu
+        - n : int, nombre de points de croisement
+
+        Output : (Individu, Individu) -> les 2 fils obtenus par croisement en n points
+        """
+
+        child1, child2 = Individu(), Individu()
+        table = parent1.data.getTable().keys()
+
+        # On récupère n dinucléotides (points de croisement)
+        crossover_points = random.sample(list(table), n)
+
+        # booléen qui permettra d'échanger les parties des chromosomes
+        between_cross_point = False
+
+        # On parcourt l'ensemble des dinucléotides
+        for dinucleotide in table:
+
+            # On récupére les paramètres des 2 parents
+            p1_T, p1_W, p1_D = (
+                parent1.data.getTwist(dinucleotide),
+                parent1.data.getWedge(dinucleotide),
+                parent1.data.getDirection(dinucleotide)
+            )
+            p2_T, p2_W, p2_D = (
+                parent2.data.getTwist(dinucleotide),
+                parent2.data.getWedge(dinucleotide),
+                parent2.data.getDirection(dinucleotide)
+            )
+
+            # Chaque fois qu'on rencontre un point de croisement,
+            # on inverse la logique de copie
+            if dinucleotide in crossover_points:
+                between_cross_point = not between_cross_point
+
+            # Par défaut, child1 <- parent1 et child2 <- parent2
+            # mais si on est entre deux points, on échange
+            c_fst, c_snd = child1, child2
+            if between_cross_point:
+                c_fst, c_snd = child2, child1
+
+            # On ajoute les chromosomes
+            c_fst.setDinucleotide(dinucleotide, p1_T, p1_W, p1_D)
+            c_fst.bruit[dinucleotide] = parent1.bruit[dinucleotide].copy()
+            c_snd.setDinucleotide(dinucleotide, p2_T, p2_W, p2_D)
+            c_snd.bruit[dinucleotide] = parent2.bruit[dinucleotide].copy()
+
+        return child1, child2
+
     # -------------------------------------------------------------------------
     # Méthode pour la mutation
     # -------------------------------------------------------------------------
@@ -460,11 +617,130 @@ class Genetique:
                     list(individu.data.getTable().keys()))  # dinucléotide au hasard
                 individu.add_bruit(mutation_point)  # bruit sur ce dinucléotide
 
+    def repair(self, method="clip", bounds=None):
+        """
+        Input :
+        - method : 'clip' (projection sur les bornes) ou 'reflect' (réflexion)
+        - bounds : Bounds, bornes de table.json par défaut
+
+        Output : int -> nombre d'individus réparés
+
+        Vérifie toute la population d'un coup (tableau (len_pop, 48)) et ramène dans les bornes
+        les individus qui en sortent (accumulation d'arrondis du bruit, tables de démarrage à chaud...)
+        """
+
+        return repair_individus(self.population, method, bounds)
+
+    # -------------------------------------------------------------------------
+    # Diversité et redémarrage
+    # -------------------------------------------------------------------------
+
+    def diversity(self) -> dict:
+        """
+        Output : dict -> diversité de la population (cf. diversite), calculée sur le tableau
+        (len_pop, 48) des paramètres
+        """
+
+        return diversite(np.array([ind.data.getVector() for ind in self.population]))
+
+    def restart(self, elite=0.2, scale=0.1):
+        """
+        Input :
+        - elite : float, proportion des meilleurs individus conservés tels quels (au moins 1)
+        - scale : float, fraction des plages de bruit dans laquelle les autres sont perturbés
+
+        Output : list -> indices des individus remplacés, à réévaluer
+
+        Réensemence la population autour de l'élite quand elle s'est effondrée : les meilleurs
+        individus sont gardés et les autres sont remplacés par des copies de l'élite (à tour de
+        rôle) perturbées sur tous les dinucléotides, pour explorer de nouvelles régions au lieu
+        de réévaluer des clones.
+        """
+
+        self.population.sort(key=lambda x: x.score)
+        n_elite = max(1, int(elite * len(self.population)))
+        for i in range(n_elite, len(self.population)):
+            individu = self.population[i % n_elite].copy()
+            for dinucleotide in individu.data.getTable():
+                individu.add_bruit(dinucleotide, scale)
+            self.population[i] = individu
+        self.restarts += 1
+        return list(range(n_elite, len(self.population)))
+
 
 # =============================================================================
 # Fin des classes / Début des fonctions pour l'algorithme
 # =============================================================================
 
+def repair_individus(individus, method="clip", bounds=None):
+    """Ramène dans les bornes, en un seul calcul vectorisé, les individus d'une liste qui en sortent
+
+    Renvoie le nombre d'individus réparés (cf. Genetique.repair)
+    """
+    bounds = bounds or default_bounds()
+    X = np.array([ind.data.getVector() for ind in individus])
+    X, outside = bounds.repair(X, method)
+    for i in np.flatnonzero(outside):
+        individus[i].seed(X[i])
+    return int(outside.sum())
+
+
+def diversite(X, bounds=None) -> dict:
+    """
+    Input :
+    - X : tableau (n, 48) des paramètres d'une population
+    - bounds : Bounds, bornes de table.json par défaut
+
+    Output : dict ->
+    - mean_distance : distance moyenne entre deux individus, chaque paramètre étant rapporté à la
+                      largeur de ses bornes et la distance à la racine du nombre de paramètres
+                      (environ 0.4 pour une population uniforme dans les bornes, 0 pour des clones)
+    - unique : nombre de génomes distincts
+
+    Les distances deux à deux viennent d'un seul produit matriciel (|x|^2 + |y|^2 - 2 x.y)
+    """
+
+    bounds = bounds or default_bounds()
+    X = np.asarray(X, dtype=float)
+    n = len(X)
+    Z = X / np.where(bounds.width > 0, bounds.width, 1.0)
+    norms = np.sum(Z * Z, axis=1)
+    squared = np.maximum(norms[:, None] + norms[None, :] - 2 * Z @ Z.T, 0)
+    mean = np.sqrt(squared[np.triu_indices(n, 1)]).mean() / sqrt(X.shape[1]) if n > 1 else 0.0
+    return {"mean_distance": float(mean), "unique": len(np.unique(X, axis=0))}
+
+
+def _individus_arrays(individus, prefix):
+    """Convertit une liste d'individus en tableaux (paramètres, bruit, score, point d'arrivée)"""
+    endpoints = np.full((len(individus), 3), np.nan)
+    for i, ind in enumerate(individus):
+        if len(ind.traj.getTraj()) > 0:  # La trajectoire n'est pas calculée si le modèle de substitution l'a écartée
+            endpoints[i] = ind.getLastPoint()
+    return {
+        prefix + "values": np.array([ind.data.getVector() for ind in individus]),
+        prefix + "bruit": np.array([[ind.bruit[di] for di in DINUCLEOTIDES] for ind in individus], dtype=float),
+        prefix + "scores": np.array([np.nan if ind.score is None else ind.score for ind in individus]),
+        prefix + "endpoints": endpoints,
+    }
+
+
+def _individus_from_arrays(data, prefix):
+    """Reconstruit les individus sauvegardés par _individus_arrays"""
+    individus = []
+    for values, bruit, score, endpoint in zip(data[prefix + "values"], data[prefix + "bruit"],
+                                              data[prefix + "scores"], data[prefix + "endpoints"]):
+        ind = Individu()
+        ind.data.setVector(values)
+        for di, b in zip(DINUCLEOTIDES, bruit):
+            ind.bruit[di] = [tuple(float(v) for v in pair) for pair in b]
+        ind.setScore(None if np.isnan(score) else float(score))
+        if not np.isnan(endpoint).any():
+            ind.traj.setCoordinates(np.array([[0.0, 0.0, 0.0], endpoint]))
+            ind.exact = not np.isnan(score)  # Les individus écartés par le modèle n'ont pas de point d'arrivée
+        individus.append(ind)
+    return individus
+
+
 # -------------------------------------------------------------------------
 # Fonction fitness
 # -------------------------------------------------------------------------
@@ -488,13 +764,44 @@ def calcul_dist(individu: Individu):
 #  -----------------------------------------------------------------------------
 # Algorithme
 # -----------------------------------------------------------------------------
-def algo_genetique(seq, taille,istest=False, n=2, algorithme_selection='elitisme', rate=0.5) -> Individu:
+def algo_genetique(seq, taille,istest=False, n=2, algorithme_selection='elitisme', rate=0.5, cache=None,
+                   surrogate=None, seuil=0.5, seuil_step=0.3, max_generations=None, budget=None,
+                   checkpoint=None, resume=None, seeds=None, progress=None, backend=None,
+                   objective=None, evaluator=None, restart=None, restart_elite=0.2, restart_patience=5,
+                   max_restarts=5) -> Individu:
     """
     Input : 
         - seq : chaine d'adn à calculer
         - taille : int pour le nombre d'individu -> attribut len_pop de Genetique
         - n : int pour le croisement_n_point (init=2)
         - rate : float % de la population qui va être mutée
+        - cache : TrajectoryCache optionnel où enregistrer la trajectoire du meilleur individu
+        - surrogate : Surrogate optionnel pour n'évaluer exactement que les descendants prometteurs
+        - seuil : float, probabilité initiale de mutation
+        - seuil_step : float, augmentation de seuil toutes les 5 générations sans amélioration
+        - max_generations : int optionnel, nombre maximal de générations
+        - budget : Budget optionnel (temps, évaluations, distance cible) ; quand une limite est
+                   atteinte, on s'arrête et on renvoie le meilleur individu trouvé
+        - checkpoint : Checkpointer optionnel, sauvegarde l'état toutes les checkpoint.every générations
+        - resume : str optionnel, point de reprise (.npz) à partir duquel continuer le lancement
+        - seeds : list optionnelle de vecteurs de paramètres (démarrage à chaud) dont la première
+                  génération est formée, avec des copies perturbées
+        - progress : Progress optionnel, reçoit l'avancement (génération, scores, débit) ; la
+                     fonction n'affiche rien elle-même
+        - backend : Coordinator optionnel, évaluation des individus sur des workers distants
+        - objective : Objective optionnel, optimise l'énergie pondérée de plusieurs séquences
+                      (seq doit être la première) ; le score est la racine de cette énergie
+        - evaluator : Evaluator optionnel, moteur d'évaluation des individus (défaut : référence,
+                      Traj3D.compute ; cf. Evaluator)
+        - restart : float optionnel, seuil de diversité (mean_distance, cf. diversite) ; quand la
+                    population stagne depuis restart_patience générations et s'est effondrée
+                    (diversité sous le seuil ou moins de la moitié de génomes distincts), elle est
+                    réensemencée autour de l'élite (cf. Genetique.restart), seuil revient à sa valeur
+                    initiale et le compteur de stagnation repart de 0 : le lancement dispose de 40
+                    nouvelles générations pour exploiter la région explorée
+        - restart_elite : float, proportion de l'élite conservée à chaque redémarrage
+        - restart_patience : int, nombre minimal de générations sans amélioration avant un redémarrage
+        - max_restarts : int, nombre maximal de redémarrages, pour que le lancement se termine
 
     Output :
         - Indidivu qui minimise la distance pour notre problème
@@ -512,25 +819,60 @@ def algo_genetique(seq, taille,istest=False, n=2, algorithme_selection='elitisme
     #       5. On conserve le meilleur individu 
     """
 
-    pop = Genetique(taille)
-    pop.refresh_score(seq)
+    if objective is not None and surrogate is not None:
+        raise ValueError("The surrogate model only predicts the end point of a single sequence")
+    pop = Genetique(taille, seeds)
+    seuil_initial = seuil
+    if resume is None:
+        pop.refresh_score(seq, surrogate, backend, objective, evaluator)
+        if budget is not None:
+            budget.charge(pop.evaluations, min(ind.score for ind in pop.population))
+        acc = 0
+        generation = 0
+    else:
+        # Reprise : population, générateurs aléatoires et compteurs tels qu'à la sauvegarde
+        data = load(resume)
+        pop.restore(data)
+        rng_restore(data)
+        if surrogate is not None and "surrogate_X" in data:
+            surrogate.restore(data)
+        acc, generation, seuil, elapsed = data["state"]
+        acc, generation = int(acc), int(generation)
+        if budget is not None:
+            budget.resume(pop.evaluations, elapsed)
+            budget.charge(0, min(ind.score for ind in pop.population))
     best = pop.getBest_individu()
-    acc = 0
-    seuil = 0.5
 
-    print("---- Lancement de l'algorithme génétique ----")
+    def snapshot():
+        data = pop.snapshot()
+        data.update(rng_snapshot())
+        if surrogate is not None:
+            data.update(surrogate.snapshot())
+        elapsed = budget.elapsed if budget is not None else 0.0
+        data["state"] = np.array([acc, generation, seuil, elapsed])
+        return data
+
     while (acc != 40):  # Tant que la génération ne donne pas 40 fois le meme meilleur score
+        if max_generations is not None and generation >= max_generations:
+            break
+        if budget is not None and budget.exhausted():
+            break
+        generation += 1
         # Sélection
         pop.selection(algorithme_selection, rate)
         # Croisement à n points
         pop.croisement_n_point(n)
         # Mutation
         pop.mutation(seuil)
+        # Réparation en lot des descendants sortis des bornes
+        pop.repair()
         # Mise à jour des scores
-        pop.refresh_score(seq)
+        evaluations = pop.evaluations
+        pop.refresh_score(seq, surrogate, backend, objective, evaluator)
+        if budget is not None:
+            budget.charge(pop.evaluations - evaluations, min(ind.score for ind in pop.population))
 
         tmp = pop.getBest_individu()
-        print(str(acc) + " :")
         # Si on trouve un meilleur individu, on reset acc
         if (best == None or tmp.score < best.score):
             acc = 0
@@ -540,17 +882,47 @@ def algo_genetique(seq, taille,istest=False, n=2, algorithme_selection='elitisme
         # Tous les 5 itérations sans nouveau changement, on augmente les probas de mutation
         # pour augmenter les chances de trouver une nouvelle solution
         if (acc % 5 == 0):
-            seuil += 0.3
-        print(pop.getBest_individu())
-
-    # On teste le meilleur individu final pour vérifier qu'il respecte
-    # les contraintes de la RotTable d'origine (pas de dépassement)
-    table = pop.getBest_individu().getData().getTable()
-    if isInBounds(table):
-        print("\033[92mVrai\033[0m")
-    else:
-        print("\033[91mFaux\033[0m")
-    print(pop.getBest_individu().getData().getTable())
+            seuil += seuil_step
+        diversity = pop.diversity()
+        if restart is not None and acc >= restart_patience and pop.restarts < max_restarts and \
+                (diversity["mean_distance"] < restart or 2 * diversity["unique"] < len(pop.population)):
+            # Population effondrée : les évaluations servent à explorer autour de l'élite
+            replaced = pop.restart(restart_elite)
+            pop.evaluer(replaced, seq, backend, objective=objective, evaluator=evaluator)
+            pop.evaluations += len(replaced)
+            if budget is not None:
+                budget.charge(len(replaced), min(ind.score for ind in pop.population))
+            seuil = seuil_initial
+            acc = 0
+        if progress is not None:
+            scores = [ind.score for ind in pop.population]
+            progress.emit("genetic", generation, pop.evaluations, min(min(scores), tmp.score), scores,
+                          stagnation=acc, seuil=seuil, diversity=diversity["mean_distance"],
+                          unique=diversity["unique"], restarts=pop.restarts)
+        if checkpoint is not None:
+            checkpoint.maybe_save(generation, snapshot)
+
+    # Le meilleur de la dernière génération n'est pris en compte qu'à la sélection suivante :
+    # on le compare au meilleur individu avant de s'arrêter
+    last = min(pop.population, key=lambda x: x.score)
+    if pop.best_individu is None or last.score < pop.best_individu.score:
+        pop.best_individu = last.copy()
+    # Les moteurs d'évaluation ne renvoient que le point d'arrivée : la trajectoire complète du
+    # meilleur individu est relue depuis le cache (ou calculée et enregistrée) pour le dessin et
+    # les modes suivants (traditional, batch...)
+    if cache is not None:
+        pop.best_individu.traj = cache.trajectory(seq, encode(seq), pop.best_individu.data)
+    elif len(pop.best_individu.traj.getTraj()) < len(seq):
+        pop.best_individu.traj.compute(seq, pop.best_individu.data)
+
+    if progress is not None:
+        # On teste le meilleur individu final pour vérifier qu'il respecte
+        # les contraintes de la RotTable d'origine (pas de dépassement)
+        progress.emit("genetic", generation, pop.evaluations, pop.best_individu.score,
+                      [ind.score for ind in pop.population], force=True, done=True,
+                      in_bounds=isInBounds(pop.best_individu.getData().getTable()),
+                      budget=None if budget is None else budget.report(),
+                      surrogate=None if surrogate is None else surrogate.report())
     if not istest: pop.getBest_individu().traj.draw()
     return pop.getBest_individu()
 
@@ -570,24 +942,8 @@ def isInBounds(table):
     les contraintes de la RotTable d'origine (pas de dépassement des bornes min et max)
     """
 
-    tdep = RotTable().getTable()
-
-    # on parcourt les nucléotides notre solution
-    for di in tdep:
-        # On regarde si Twist est bien dans les bornes min et max grace aux valeurs originales avec tdep
-        if table[di][0] > tdep[di][0] + tdep[di][3] or table[di][0] < tdep[di][0] - tdep[di][3]:
-            print(di)
-            return False
-        # On regarde si Wedge est bien dans les bornes min et max grace aux valeurs originales avec tdep
-        if table[di][1] > tdep[di][1] + tdep[di][4] or table[di][1] < tdep[di][1] - tdep[di][4]:
-            print(di)
-            return False
-        # On regarde si Direction est bien dans les bornes min et max grace aux valeurs originales avec tdep
-        if table[di][2] > tdep[di][2] + tdep[di][5] or table[di][2] < tdep[di][2] - tdep[di][5]:
-            print(di)
-            return False
-    # si tous les nucléotides sont validés
-    return True
+    # Les bornes de table.json sont calculées une seule fois (cf. Bounds)
+    return bool(default_bounds().contains(table_vector(table)))
 
 
 def stats(seq):
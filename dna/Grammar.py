@@ -0,0 +1,137 @@
+# =============================================================================
+# Compression d'une séquence encodée en grammaire (Re-Pair par tours).
+#
+# A chaque tour, les paires de symboles adjacents qui apparaissent au moins deux
+# fois sont remplacées par de nouveaux symboles (règles X -> A B). Les
+# occurrences qui se chevauchent sont départagées de gauche à droite, si bien
+# que toutes les règles d'un tour ne dépendent que des symboles des tours
+# précédents : pour une table donnée, leurs matrices se calculent en un seul
+# produit vectorisé par tour. La matrice de transformation de la séquence est
+# ensuite le produit de la séquence compressée : le travail dépend de la taille
+# de la grammaire et non plus de la longueur de la séquence.
+# =============================================================================
+
+import argparse
+import time
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Sequence import DINUCLEOTIDES, encode, read_fasta
+from dna.Traj3D import Traj3D, product
+
+
+class Grammar:
+    """Grammaire (straight-line program) d'une séquence encodée
+
+    Args:
+        encoded (np.ndarray): Séquence encodée (cf. Sequence.encode)
+        max_rounds (int): Nombre maximal de tours de remplacement (None : jusqu'à ce qu'aucune
+                          paire ne se répète)
+    """
+
+    def __init__(self, encoded, max_rounds=None):
+        start = time.perf_counter()
+        self.length = len(encoded)
+        seq = np.asarray(encoded, dtype=np.int64)
+        n_symbols = len(DINUCLEOTIDES)
+        self.rounds = []  # (premier symbole créé, membres gauches, membres droits) de chaque tour
+        while max_rounds is None or len(self.rounds) < max_rounds:
+            selected, keys = _disjoint_repeats(seq, n_symbols)
+            if len(selected) == 0:
+                break
+            pairs, inverse = np.unique(keys, return_inverse=True)
+            # Nouvelles règles n_symbols, n_symbols + 1... -> (gauche, droite)
+            self.rounds.append((n_symbols, pairs // n_symbols, pairs % n_symbols))
+            seq = seq.copy()
+            seq[selected] = n_symbols + inverse
+            keep = np.ones(len(seq), dtype=bool)
+            keep[selected + 1] = False
+            seq = seq[keep]
+            n_symbols += len(pairs)
+        self.sequence = seq
+        self.n_symbols = n_symbols
+        self.build_time = time.perf_counter() - start
+
+    @classmethod
+    def fromSequence(cls, seq, max_rounds=None):
+        return cls(encode(seq), max_rounds)
+
+    def rules(self) -> int:
+        """Nombre de règles de la grammaire"""
+        return self.n_symbols - len(DINUCLEOTIDES)
+
+    def ratio(self) -> float:
+        """Taux de compression : produits de matrices sans / avec la grammaire"""
+        return max(self.length, 1) / max(self.rules() + len(self.sequence), 1)
+
+    def report(self) -> dict:
+        """Résumé de la compression (longueurs, règles, tours, taux, temps de construction)"""
+        return {"length": self.length, "compressed": len(self.sequence), "rules": self.rules(),
+                "rounds": len(self.rounds), "ratio": self.ratio(), "build_time": self.build_time}
+
+    def transform(self, steps) -> np.ndarray:
+        """Matrice de transformation de la séquence
+
+        Args:
+            steps (np.ndarray): Matrices de pas (16, 4, 4), ou (n, 16, 4, 4) pour n tables
+                                (cf. Traj3D.stepMatrices et Traj3D.step_matrices)
+
+        Returns:
+            np.ndarray -- (4, 4), ou (n, 4, 4)
+        """
+        steps = np.asarray(steps, dtype=float)
+        matrices = np.empty(steps.shape[:-3] + (self.n_symbols, 4, 4))
+        matrices[..., :len(DINUCLEOTIDES), :, :] = steps
+        # Une règle par symbole, chacune calculée une seule fois : un produit vectorisé par tour
+        for first, left, right in self.rounds:
+            matrices[..., first:first + len(left), :, :] = matrices[..., left, :, :] @ matrices[..., right, :, :]
+        if matrices.ndim == 3:
+            return product(matrices[self.sequence])
+        return np.array([product(m[self.sequence]) for m in matrices])
+
+    def endpoint(self, rot_table) -> np.ndarray:
+        """Point d'arrivée (x, y, z) de la trajectoire pour une table de rotation"""
+        return self.transform(Traj3D().stepMatrices(rot_table))[:3, 3]
+
+
+def _disjoint_repeats(seq, n_symbols):
+    """Positions des paires à remplacer au prochain tour et leurs clés (gauche * n_symbols + droite)
+
+    Une position est retenue si sa paire se répète ; dans une suite de positions consécutives
+    retenues (paires qui se chevauchent), on garde une position sur deux en partant de la gauche.
+    Les paires qui ne se répètent plus après ce départage sont écartées.
+    """
+    if len(seq) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    keys = seq[:-1] * n_symbols + seq[1:]
+    _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    positions = np.flatnonzero(counts[inverse] >= 2)
+    if len(positions) == 0:
+        return positions, positions
+    run_start = np.maximum.accumulate(np.where(np.diff(positions, prepend=-2) != 1, positions, -1))
+    positions = positions[(positions - run_start) % 2 == 0]
+    _, inverse, counts = np.unique(keys[positions], return_inverse=True, return_counts=True)
+    positions = positions[counts[inverse] >= 2]
+    return positions, keys[positions]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grammar compression of DNA sequences")
+    parser.add_argument("fasta", nargs='+', help="FASTA files (every record is compressed)")
+    parser.add_argument("-j", "--json", default="dna/table.json", help="table used to time the evaluation")
+    args = parser.parse_args()
+    rot_table = RotTable(args.json)
+    steps = Traj3D().stepMatrices(rot_table)
+    for filename in args.fasta:
+        for record, seq in read_fasta(filename):
+            encoded = encode(seq)
+            grammar = Grammar(encoded)
+            start = time.perf_counter()
+            grammar.transform(steps)
+            compressed_time = time.perf_counter() - start
+            start = time.perf_counter()
+            product(steps[encoded])
+            direct_time = time.perf_counter() - start
+            r = grammar.report()
+            print(f"{filename}:{record} length={r['length']} compressed={r['compressed']} rules={r['rules']}"
+                  f" rounds={r['rounds']} ratio={r['ratio']:.2f} build={r['build_time']:.2f}s"
+                  f" evaluation={compressed_time * 1000:.1f}ms (direct {direct_time * 1000:.1f}ms)")
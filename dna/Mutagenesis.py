@@ -0,0 +1,181 @@
+# =============================================================================
+# Mutagenèse in silico : effet de chaque substitution d'une base sur la distance
+# de fermeture d'une séquence pour une table donnée.
+#
+# Un arbre de segments contient les produits des matrices de pas sur des
+# intervalles de taille 2^k. Une substitution en position i ne change que les
+# pas i-1 et i : la nouvelle transformation est
+#     produit(pas[0:i-1]) @ nouveaux pas @ produit(pas[i+1:])
+# où chaque produit d'intervalle s'obtient en O(log N) à partir de l'arbre.
+# Pour le balayage complet, tous les préfixes et suffixes sont calculés en une
+# fois à partir des niveaux de l'arbre (log N produits vectorisés) : les 3N
+# substitutions coûtent O(N log N) au lieu de 3N trajectoires complètes.
+# =============================================================================
+
+import csv
+import os
+import time
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Sequence import BASES, encode, load_sequence
+from dna.Traj3D import Traj3D
+
+
+class SegmentTree:
+    """Arbre de segments des produits ordonnés d'une pile de matrices (n, 4, 4)
+
+    Les feuilles sont complétées par des matrices identité jusqu'à une puissance de 2 :
+    levels[k][j] est le produit des feuilles j*2^k à (j+1)*2^k - 1.
+
+    Args:
+        matrices (np.ndarray): Matrices (n, 4, 4), par exemple stepMatrices()[encoded]
+    """
+
+    def __init__(self, matrices):
+        self.n = len(matrices)
+        size = 1 << max(self.n - 1, 0).bit_length()
+        leaves = np.tile(np.eye(4), (size, 1, 1))
+        leaves[:self.n] = matrices
+        self.levels = [leaves]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            self.levels.append(level[0::2] @ level[1::2])
+
+    def total(self) -> np.ndarray:
+        """Produit de toutes les matrices"""
+        return self.levels[-1][0].copy()
+
+    def query(self, lo, hi) -> np.ndarray:
+        """Produit ordonné des matrices lo à hi - 1, en O(log n)"""
+        left, right = np.eye(4), np.eye(4)
+        k = 0
+        while lo < hi:
+            if lo & 1:
+                left = left @ self.levels[k][lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                right = self.levels[k][hi] @ right
+            lo >>= 1
+            hi >>= 1
+            k += 1
+        return left @ right
+
+    def update(self, i, matrix):
+        """Remplace la matrice i et met à jour ses ancêtres, en O(log n)"""
+        self.levels[0][i] = matrix
+        for k in range(1, len(self.levels)):
+            i >>= 1
+            self.levels[k][i] = self.levels[k - 1][2 * i] @ self.levels[k - 1][2 * i + 1]
+
+    def prefixes(self) -> np.ndarray:
+        """Produits des matrices 0 à k - 1 pour k = 0..n, forme (n + 1, 4, 4)"""
+        k = np.arange(self.n + 1)
+        result = np.tile(np.eye(4), (self.n + 1, 1, 1))
+        # Décomposition binaire de [0, k) : blocs des bits de k, du plus fort au plus faible
+        for level in reversed(range(len(self.levels))):
+            mask = ((k >> level) & 1).astype(bool)
+            if mask.any():
+                result[mask] = result[mask] @ self.levels[level][(k[mask] >> level) - 1]
+        return result
+
+    def suffixes(self) -> np.ndarray:
+        """Produits des matrices k à n - 1 pour k = 0..n, forme (n + 1, 4, 4)"""
+        k = np.arange(self.n + 1)
+        result = np.tile(np.eye(4), (self.n + 1, 1, 1))
+        # Décomposition de [k, taille) : le bloc de niveau j est pris si le bit j du début courant est à 1
+        start = k.copy()
+        for level in range(len(self.levels) - 1):
+            mask = ((start >> level) & 1).astype(bool)
+            if mask.any():
+                result[mask] = result[mask] @ self.levels[level][start[mask] >> level]
+                start[mask] += 1 << level
+        result[start == 0] = self.levels[-1][0]
+        return result
+
+
+def mutant_transform(tree, steps, encoded, position, base) -> np.ndarray:
+    """Transformation de la séquence après substitution d'une base, en O(log n)
+
+    Args:
+        tree (SegmentTree): Arbre des pas de la séquence d'origine
+        steps (np.ndarray): Les 16 matrices de pas de la table
+        encoded (np.ndarray): Séquence encodée d'origine
+        position (int): Position de la base substituée
+        base (int): Nouvelle base (indice dans BASES)
+    """
+    n = len(encoded)
+    middle = np.eye(4)
+    if position > 0:
+        middle = middle @ steps[(encoded[position - 1] & 0b1100) | base]
+    if position < n:
+        middle = middle @ steps[(base << 2) | (encoded[position] & 0b11)]
+    return tree.query(0, max(position - 1, 0)) @ middle @ tree.query(min(position + 1, n), n)
+
+
+def scan(seq, rot_table, chunk=65536):
+    """Distances de fermeture de toutes les substitutions d'une base (3 par position)
+
+    Args:
+        seq (str): Séquence d'ADN
+        rot_table (RotTable): Table de rotation
+        chunk (int): Nombre de positions traitées par bloc
+
+    Yields:
+        tuple -- (positions, bases d'origine, bases substituées, distances), tableaux de 3 * bloc
+                 éléments, dans l'ordre des positions
+    """
+    encoded = encode(seq).astype(np.intp)
+    n = len(encoded)
+    steps = Traj3D().stepMatrices(rot_table)
+    tree = SegmentTree(steps[encoded])
+    prefixes, suffixes = tree.prefixes(), tree.suffixes()
+    # Code de chaque base (len(seq) = n + 1)
+    codes = np.concatenate(((encoded >> 2), encoded[-1:] & 0b11)) if n else np.array([BASES.index(seq.upper())])
+    for start in range(0, len(codes), chunk):
+        positions = np.arange(start, min(start + chunk, len(codes)))
+        reference = codes[positions]
+        alternative = (reference[:, None] + np.arange(1, 4)) % 4
+        # Pas modifiés : [position - 1, position + 1) ramené à [0, n)
+        lo, hi = np.maximum(positions - 1, 0), np.minimum(positions + 1, n)
+        vectors = np.broadcast_to(suffixes[hi][:, None, :, 3], (len(positions), 3, 4))[..., None]
+        right = positions < n
+        vectors = np.where(right[:, None, None, None],
+                           steps[(alternative << 2) | (codes[np.minimum(positions + 1, n)][:, None])] @ vectors,
+                           vectors)
+        left = positions > 0
+        vectors = np.where(left[:, None, None, None],
+                           steps[(codes[np.maximum(positions - 1, 0)][:, None] << 2) | alternative] @ vectors,
+                           vectors)
+        points = (prefixes[lo][:, None] @ vectors)[..., :3, 0]
+        yield (np.repeat(positions, 3), np.repeat(reference, 3), alternative.ravel(),
+               np.linalg.norm(points, axis=-1).ravel())
+
+
+def mutagenesis_main(seq_filename, JSON_filename, output=None):
+    """Fonction appelée par __main__.py : écrit l'effet de chaque substitution d'une base
+
+    Le fichier CSV (une ligne par substitution) est écrit au fil du calcul.
+
+    Args:
+        seq_filename (str): Fichier FASTA (première séquence)
+        JSON_filename (str): Table de rotation
+        output (str): Fichier CSV (défaut : results/mutagenesis.csv)
+    """
+    output = output or os.path.join("results", "mutagenesis.csv")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    seq = load_sequence(seq_filename)
+    rot_table = RotTable(JSON_filename)
+    traj = Traj3D()
+    traj.computeEndpoint(encode(seq), rot_table)
+    reference = traj.getDistance()
+    start = time.time()
+    with open(output, "w", newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(["position", "reference", "alternative", "distance", "delta"])
+        for positions, bases, alternatives, distances in scan(seq, rot_table):
+            writer.writerows(zip(positions.tolist(), [BASES[b] for b in bases], [BASES[b] for b in alternatives],
+                                 distances.tolist(), (distances - reference).tolist()))
+    print(f"{3 * len(seq)} substitutions written to {output} in {time.time() - start:.2f}s"
+          f" (reference distance {reference:.2f})")
+    return output
@@ -0,0 +1,102 @@
+# =============================================================================
+# Objectif multi-séquences. L'énergie d'une table est la somme pondérée des
+# carrés des distances de fermeture de chaque séquence. Les poids sont donnés
+# explicitement ou normalisent les distances par la longueur des séquences,
+# pour que la plus longue ne domine pas la somme.
+#
+# Les séquences d'un même candidat sont évaluées par un moteur d'évaluation
+# (cf. Evaluator), en parallèle avec les processus de calcul ou les workers
+# distants, la plus longue en premier : elle occupe un processus pendant que
+# les autres traitent les plus courtes.
+# =============================================================================
+
+import numpy as np
+from dna.Evaluator import DistributedEvaluator, GrammarEvaluator, NumpyEvaluator, PoolEvaluator
+from dna.Grammar import Grammar
+from dna.Sequence import encode
+
+
+class Objective:
+    """Energie pondérée d'une table sur plusieurs séquences
+
+    Args:
+        seqs (list): Séquences d'ADN
+        weights (list): Poids de chaque séquence (1 par défaut)
+        normalize (bool): Multiplie chaque poids par (longueur moyenne / longueur)^2, ce qui revient
+                          à comparer des distances de fermeture rapportées à la longueur
+        workers (int): Nombre de processus de calcul (1 : évaluation dans le processus courant)
+        cache (TrajectoryCache): Cache des points d'arrivée des états retenus (cf. distances) ; les
+                                 propositions évaluées par energy n'y sont jamais écrites
+        backend (Coordinator): Evaluation sur des workers distants (optionnel)
+        compress (bool): Compresse chaque séquence en grammaire (cf. Grammar) pour l'évaluation dans
+                         le processus courant : chaque répétition n'est multipliée qu'une fois (workers
+                         est alors ignoré)
+        evaluator (Evaluator): Moteur d'évaluation (cf. Evaluator) ; par défaut, il est déduit de
+                               backend, compress et workers. Il est fermé avec l'objectif
+    """
+
+    def __init__(self, seqs, weights=None, normalize=False, workers=1, cache=None, backend=None,
+                 compress=False, evaluator=None):
+        if weights is not None and len(weights) != len(seqs):
+            raise ValueError(f"{len(weights)} weights given for {len(seqs)} sequences")
+        self.seqs = list(seqs)
+        self.encoded = [encode(seq) for seq in self.seqs]  # Encodées une seule fois
+        self.lengths = np.array([len(seq) for seq in self.seqs], dtype=float)
+        self.weights = np.ones(len(self.seqs)) if weights is None else np.array(weights, dtype=float)
+        if normalize:
+            self.weights *= (self.lengths.mean() / self.lengths) ** 2
+        # Ordre d'évaluation : de la plus longue à la plus courte
+        self.order = [int(s) for s in np.argsort(-self.lengths, kind="stable")]
+        self.workers = workers or 1
+        self.cache = cache
+        self.backend = backend
+        self.grammars = [Grammar(encoded) for encoded in self.encoded] if compress else None
+        if evaluator is None:
+            if backend is not None:
+                evaluator = DistributedEvaluator(backend)
+            elif compress:
+                # Les grammaires priment sur les processus : chaque règle n'est multipliée qu'une fois
+                evaluator = GrammarEvaluator(zip(self.seqs, self.grammars))
+            elif self.workers > 1:
+                evaluator = PoolEvaluator(self.workers)
+            else:
+                evaluator = NumpyEvaluator()
+        self.evaluator = evaluator
+        self.evaluations = 0
+
+    def endpoints(self, vectors) -> np.ndarray:
+        """Points d'arrivée (n, m, 3) de n vecteurs de paramètres (n, 48) sur les m séquences"""
+        vectors = np.asarray(vectors, dtype=float).reshape(-1, 48)
+        points = np.empty((len(vectors), len(self.seqs), 3))
+        points[:, self.order] = self.evaluator.endpoints(vectors, [self.seqs[s] for s in self.order])
+        self.evaluations += len(vectors) * len(self.seqs)
+        return points
+
+    def energies(self, vectors) -> np.ndarray:
+        """Energie (somme pondérée des carrés des distances) de n vecteurs de paramètres (n, 48)"""
+        return np.sum(self.endpoints(vectors) ** 2, axis=2) @ self.weights
+
+    def energy(self, rot_table) -> float:
+        """Energie d'une table de rotation"""
+        return float(np.sum(self.endpoints(rot_table.getVector())[0] ** 2, axis=1) @ self.weights)
+
+    def distances(self, rot_table) -> list:
+        """Distances de fermeture d'une table retenue (état final, meilleur individu) sur chaque séquence
+
+        Avec un cache, les points d'arrivée y sont relus ou enregistrés : seuls les états conservés
+        entrent dans le cache, pas chaque proposition tirée au hasard (cf. energy).
+        """
+        if self.cache is None:
+            return np.linalg.norm(self.endpoints(rot_table.getVector())[0], axis=1).tolist()
+        return [float(np.linalg.norm(self.cache.endpoint(encoded, rot_table))) for encoded in self.encoded]
+
+    def close(self):
+        """Arrête le moteur d'évaluation (processus de calcul, mémoire partagée)"""
+        self.evaluator.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
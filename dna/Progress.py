@@ -0,0 +1,100 @@
+import json
+import math
+import time
+import numpy as np
+
+
+class Progress:
+    """Flux d'événements de progression des optimiseurs, limité en fréquence
+
+    Les optimiseurs appellent emit() à chaque génération ou itération. Tant que l'intervalle
+    minimal n'est pas écoulé, l'appel se résume à une lecture d'horloge : aucune chaîne n'est
+    formatée. Les événements retenus sont des dictionnaires transmis au callback et/ou écrits
+    dans un fichier JSONL (un objet JSON par ligne).
+
+    Args:
+        callback (callable): Fonction appelée avec chaque événement (None : aucune)
+        jsonl (str): Fichier JSONL où écrire les événements (None : aucun)
+        interval (float): Intervalle minimal entre deux événements, en secondes
+    """
+
+    def __init__(self, callback=None, jsonl=None, interval=1.0):
+        self.callback = callback
+        self.file = open(jsonl, "w") if jsonl else None
+        self.interval = interval
+        self.start = time.monotonic()
+        self.last = -math.inf
+        self.last_evaluations = 0
+        self.emitted = 0
+
+    def emit(self, algorithm, generation, evaluations, best, scores=None, force=False, **extra):
+        """Publie un événement si l'intervalle minimal est écoulé (ou si force)
+
+        Args:
+            algorithm (str): Nom de l'optimiseur
+            generation (int): Génération ou itération courante
+            evaluations (int): Nombre total d'évaluations de trajectoires
+            best (float): Meilleur score (distance de fermeture) trouvé
+            scores (list): Scores de la population courante, résumés par leur moyenne, écart type et pire
+                valeur (ou fonction qui les renvoie, appelée seulement si l'événement est publié)
+            force (bool): Publie même si l'intervalle n'est pas écoulé (fin de lancement...)
+            extra: Champs supplémentaires propres à l'optimiseur
+
+        Returns:
+            dict -- L'événement publié, ou None
+        """
+        now = time.monotonic()
+        if not force and now - self.last < self.interval:
+            return None
+        elapsed = now - self.start
+        # Débit depuis l'événement précédent (depuis le début pour le premier)
+        since = now - max(self.last, self.start)
+        event = {
+            "algorithm": algorithm,
+            "generation": generation,
+            "evaluations": evaluations,
+            "best": None if best is None else float(best),
+            "elapsed": elapsed,
+            "evaluations_per_second": (evaluations - self.last_evaluations) / since if since > 0 else None,
+        }
+        if callable(scores):
+            scores = scores()
+        if scores is not None and len(scores):
+            scores = np.asarray(scores, dtype=float)
+            event.update(mean=float(scores.mean()), std=float(scores.std()), worst=float(scores.max()))
+        event.update(extra)
+        self.last = now
+        self.last_evaluations = evaluations
+        self.emitted += 1
+        if self.file is not None:
+            self.file.write(json.dumps(event) + "\n")
+            self.file.flush()
+        if self.callback is not None:
+            self.callback(event)
+        return event
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def print_event(event):
+    """Affiche un événement sur une ligne (callback de la ligne de commande)"""
+    fields = []
+    for key, value in event.items():
+        if value is None or key == "algorithm":
+            continue
+        if isinstance(value, float):
+            value = f"{value:.4g}"
+        elif isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        fields.append(f"{key}={value}")
+    print(event["algorithm"], " ".join(fields))
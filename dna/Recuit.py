@@ -1,11 +1,15 @@
 import math
 import random
 import numpy as np
-from dna.Traj3D import Traj3D
 from dna.RotTable import RotTable
-import os
-import json
+from dna.Sequence import encode
+from dna.Objective import Objective
+from dna.Schedule import AdaptiveSchedule
+from dna.Checkpoint import load, rng_restore, rng_snapshot
+from dna.WarmStart import best_table
+from dna.Store import write_numbered
 import copy
+import time
 
 
 class Recuit:
@@ -16,33 +20,61 @@ class Recuit:
         initial_state (RotTable): Modèle de conformation initial
         k_max (int): Nombre maximal d'itérations
         e_max (int): Energie seuil pour arrêter l'algorithme
+        cache (TrajectoryCache): Cache des points d'arrivée de l'état final (optionnel, cf. Objective.distances)
+        backend (Coordinator): Evaluation sur des workers distants (optionnel)
+        objective (Objective): Energie pondérée des séquences (défaut : somme des carrés des
+                               distances, avec cache et backend)
+        temp (float): Température initiale
+        cooling (float): Facteur de refroidissement appliqué à chaque itération
+        step (float): Le pas du voisinage vaut la marge restante divisée par step
+        schedule (str): 'geometric' : température multipliée par cooling à chaque itération ;
+                        'adaptive' : température initiale, pas par dinucléotide et réchauffage
+                        adaptés au taux d'acceptation (cf. AdaptiveSchedule, temp et cooling ignorés)
+        tries (int): Nombre de voisins tirés à chaque itération (Metropolis à essais multiples si > 1) ;
+                     ils sont évalués ensemble, en un seul appel à l'objectif (lot, processus ou workers)
     """
 
-    def __init__(self, seqs, initial_state, k_max, e_max):
+    def __init__(self, seqs, initial_state, k_max, e_max, cache=None, temp=150000, cooling=0.992, step=3,
+                 backend=None, objective=None, schedule="geometric", tries=1):
+        if schedule not in ("geometric", "adaptive"):
+            raise ValueError(f"Unknown annealing schedule: {schedule}")
+        if tries < 1:
+            raise ValueError(f"At least one try per iteration is needed, got {tries}")
         self.seqs = seqs
+        self.encoded = [encode(seq) for seq in seqs]  # Encodées une seule fois
+        self.cache = cache
+        self.backend = backend
+        self.objective = objective or Objective(seqs, cache=cache, backend=backend)
         self.initial_state = initial_state
         self.state = initial_state
         self.e = self.energy(initial_state)
+        self.best_state, self.best_e = self.state, self.e  # Meilleur état rencontré
         self.k = 0
         self.k_max = k_max
         self.e_max = e_max
-        self.temp = 150000
+        self.temp = temp
+        self.temp0 = temp  # Température initiale (self.temp décroît)
+        self.cooling = cooling
+        self.step = step
+        self.adaptive = AdaptiveSchedule(k_max, step) if schedule == "adaptive" else None
+        self.sampled = 0  # Voisins évalués pour fixer la température initiale (programme adaptatif)
+        self.tries = tries
         """self.initial_delta_temp = 1000
         self.delta_temp = 1000
         self.stuck = 0"""
 
-    def generateNewState(self):
-        """Génère un nouvel état voisin en modifiant légèrement l'état actuel
+    def generateNewState(self, state=None):
+        """Génère un nouvel état voisin en modifiant légèrement l'état actuel (ou state)
         return: RotTable -- Nouvel état
         """
 
-        new_state = copy.deepcopy(self.state)
+        new_state = copy.deepcopy(self.state if state is None else state)
 
         # Modifier légèrement l'état
         for key in new_state.rot_table:
             ranges = new_state.getRanges(key)
-            delta_Twist, delta_Wedge, delta_Direction = random.uniform(-min(ranges[0])/3, min(
-                ranges[0])/3), random.uniform(-min(ranges[1])/3, min(ranges[1])/3), 0
+            delta_Twist, delta_Wedge, delta_Direction = random.uniform(-min(ranges[0])/self.step, min(
+                ranges[0])/self.step), random.uniform(-min(ranges[1])/self.step, min(ranges[1])/self.step), 0
             new_state.updateRangesAndValues(key, [delta_Twist, delta_Wedge, delta_Direction])
 
         return new_state
@@ -57,21 +89,10 @@ class Recuit:
             float -- Energie de l'état
         """
 
-        diff = 0
-
-        # Pour chaque séquence, on calcule l'énergie de la trajectoire (distance entre le départ et l'arrivée)^2 (sqrt prend beaucoup de temps et est inutile dans une fonction d'évaluation)
-        traj = Traj3D()
-
-        # dists = [] #Pour le terme de normalisation
-        for seq in self.seqs:
-            traj.compute(seq, state)
-            # dists.append(traj.getDistance())
-            diff += traj.energy()
-
-        # On ajoute un terme qui vise à trouver des valeurs valables pour toute séquence -> on normalise par la longueur de la séquence:
-        # diff += abs(dists[0]/len(self.seqs[0]) - dists[1] / len(self.seqs[1])) * 10000000
-
-        return diff
+        # Pour chaque séquence, on calcule l'énergie de la trajectoire (distance entre le départ et l'arrivée)^2
+        # (sqrt prend beaucoup de temps et est inutile dans une fonction d'évaluation), pondérée par l'objectif :
+        # avec normalize, les distances sont rapportées à la longueur des séquences (cf. Objective)
+        return self.objective.energy(state)
 
     def probability(self, energy_diff, temperature):
         """Calcule la probabilité d'accepter un nouvel état, même si son énergie est plus élevée
@@ -102,48 +123,225 @@ class Recuit:
         """
 
         # La température doit être très élevée au début puis décroître (on veut converger vers un minimum global)
-        self.temp = 0.992*self.temp
+        self.temp = self.cooling*self.temp
         return self.temp
 
+    def evaluations(self) -> int:
+        """Nombre d'évaluations de trajectoires depuis le début du lancement"""
+        # Metropolis à essais multiples : tries voisins et tries - 1 points de référence par itération
+        return (self.k * (2 * self.tries - 1) + self.sampled) * len(self.seqs)
+
+    def sampleTemperature(self) -> float:
+        """Température initiale du programme adaptatif, tirée des écarts d'énergie de voisins"""
+        deltas = []
+        for _ in range(self.adaptive.samples):
+            neighbour = copy.deepcopy(self.state)
+            self.adaptive.propose(neighbour)
+            deltas.append(self.energy(neighbour) - self.e)
+        self.sampled += self.adaptive.samples
+        return self.adaptive.initialTemperature(deltas)
+
     def iterate(self):
         """Itère une fois dans l'algorithme de recuit simulé"""
+        if self.tries > 1:
+            self.iterateMultipleTry()
+            return
+        if self.adaptive is not None:
+            self.iterateAdaptive()
+            return
         new_state = self.generateNewState()
         new_energy = self.energy(new_state)
         if new_energy < self.e or random.random() < self.probability(
                 new_energy - self.e, self.calculateTemp(self.k)):
             self.state = new_state
             self.e = new_energy
+            if new_energy < self.best_e:
+                self.best_state, self.best_e = new_state, new_energy
+        self.k += 1
+
+    def iterateAdaptive(self):
+        """Itération avec le programme adaptatif : la température et les pas suivent le taux d'acceptation"""
+        if self.adaptive.temp0 is None:
+            self.temp = self.temp0 = self.sampleTemperature()
+        new_state = copy.deepcopy(self.state)
+        moved = self.adaptive.propose(new_state)
+        new_energy = self.energy(new_state)
+        accepted = new_energy < self.e or random.random() < self.probability(new_energy - self.e, self.temp)
+        improved = False
+        if accepted:
+            self.state = new_state
+            self.e = new_energy
+            if new_energy < self.best_e:
+                self.best_state, self.best_e = new_state, new_energy
+                improved = True
+        self.temp = self.adaptive.update(self.temp, self.k, moved, accepted, improved)
+        self.k += 1
+
+    def neighbour(self, state):
+        """Voisin d'un état et dinucléotides modifiés, selon le programme de température"""
+        if self.adaptive is None:
+            return self.generateNewState(state), None
+        new_state = copy.deepcopy(state)
+        return new_state, self.adaptive.propose(new_state)
+
+    def energies(self, states) -> np.ndarray:
+        """Energies de plusieurs états, évaluées ensemble (cf. Objective.energies)"""
+        return self.objective.energies(np.array([state.getVector() for state in states]))
+
+    def iterateMultipleTry(self):
+        """Itération de Metropolis à essais multiples (Liu, Liang et Wong, 2000)
+
+        tries voisins y_j de l'état x sont évalués ensemble ; l'un d'eux, y, est choisi avec une
+        probabilité proportionnelle à exp(-E(y_j)/T). On tire ensuite tries - 1 voisins de y qui,
+        avec x, forment les points de référence x*_j, et y est accepté avec la probabilité
+        min(1, somme exp(-E(y_j)/T) / somme exp(-E(x*_j)/T)), ce qui conserve l'équilibre de
+        Metropolis à la température T.
+        """
+        if self.adaptive is not None and self.adaptive.temp0 is None:
+            self.temp = self.temp0 = self.sampleTemperature()
+        temp = self.temp if self.adaptive is not None else self.calculateTemp(self.k)
+        proposals = [self.neighbour(self.state) for _ in range(self.tries)]
+        energies = self.energies([state for state, _ in proposals])
+        # Poids exp(-E/T) calculés à partir de l'énergie minimale pour éviter les dépassements
+        shift = min(float(energies.min()), self.e)
+        weights = np.exp(-(energies - shift) / temp)
+        j = random.choices(range(self.tries), weights=weights)[0] if weights.sum() > 0 else int(energies.argmin())
+        selected, moved = proposals[j]
+        references = [self.neighbour(selected)[0] for _ in range(self.tries - 1)]
+        reference_energies = self.energies(references)
+        reference_weights = np.exp(-(np.append(reference_energies, self.e) - shift) / temp)
+        denominator = reference_weights.sum()
+        ratio = weights.sum() / denominator if denominator > 0 else math.inf
+        accepted = random.random() < ratio
+        improved = False
+        # Tous les états évalués peuvent améliorer le meilleur état rencontré
+        for state, e in zip([state for state, _ in proposals] + references,
+                            np.concatenate((energies, reference_energies))):
+            if e < self.best_e:
+                self.best_state, self.best_e = state, float(e)
+                improved = True
+        if accepted:
+            self.state, self.e = selected, float(energies[j])
+        if self.adaptive is not None:
+            self.temp = self.adaptive.update(self.temp, self.k, moved, accepted, improved)
         self.k += 1
 
-    def run(self):
-        """Lance l'algorithme de recuit simulé"""
+    def snapshot(self) -> dict:
+        """Etat du recuit (états courant et meilleur, énergies, température, itération,
+        générateurs aléatoires) sous forme de tableaux, pour un point de reprise"""
+        data = {
+            "state_values": self.state.getVector(),
+            "state_margins": self.state.getMargins(),
+            "best_values": self.best_state.getVector(),
+            "best_margins": self.best_state.getMargins(),
+            "counters": np.array([self.k, self.e, self.best_e, self.temp]),
+        }
+        if self.adaptive is not None:
+            data.update(self.adaptive.snapshot())
+            data["sampled"] = np.array(self.sampled)
+        data.update(rng_snapshot())
+        return data
+
+    def restore(self, data):
+        """Reprend le recuit dans l'état sauvegardé par snapshot"""
+        self.state = copy.deepcopy(self.initial_state)
+        self.state.setVector(data["state_values"])
+        self.state.setMargins(data["state_margins"])
+        self.best_state = copy.deepcopy(self.initial_state)
+        self.best_state.setVector(data["best_values"])
+        self.best_state.setMargins(data["best_margins"])
+        k, self.e, self.best_e, self.temp = (float(c) for c in data["counters"])
+        self.k = int(k)
+        if self.adaptive is not None and "schedule_state" in data:
+            self.adaptive.restore(data)
+            self.sampled = int(data["sampled"])
+            if self.adaptive.temp0 is not None:
+                self.temp0 = self.adaptive.temp0
+        rng_restore(data)
+
+    def run(self, budget=None, checkpoint=None, progress=None):
+        """Lance l'algorithme de recuit simulé
+
+        Args:
+            budget (Budget): Budget optionnel (temps, évaluations, distance cible = racine de l'énergie)
+            checkpoint (Checkpointer): Sauvegarde optionnelle de l'état toutes les checkpoint.every itérations
+            progress (Progress): Reçoit l'avancement (itération, énergie, température) ; rien n'est affiché
+
+        Returns:
+            RotTable -- Meilleur état rencontré
+        """
+        def snapshot():
+            data = self.snapshot()
+            data["elapsed"] = np.array(budget.elapsed if budget is not None else 0.0)
+            return data
+
         while self.k < self.k_max and self.e > self.e_max:
+            evaluations = self.evaluations()
             self.iterate()
-            # Affichage toutes les 10 itérations
-            if not self.k % 10:
-                print(f"iteration:{self.k}       energy:{self.e:.2f}       temp:{self.temp:.2f}")
-        return self.state
+            if progress is not None:
+                progress.emit("recuit", self.k, self.evaluations(), math.sqrt(self.best_e),
+                              energy=self.e, temp=self.temp, **self.report())
+            if budget is not None and budget.charge(self.evaluations() - evaluations, math.sqrt(self.best_e)):
+                break
+            if checkpoint is not None:
+                checkpoint.maybe_save(self.k, snapshot)
+        if progress is not None:
+            progress.emit("recuit", self.k, self.evaluations(), math.sqrt(self.best_e), force=True,
+                          done=True, energy=self.e, temp=self.temp, **self.report(),
+                          budget=None if budget is None else budget.report())
+        return self.best_state
+
+    def report(self) -> dict:
+        """Champs propres au programme de température dans les événements de progression"""
+        return {} if self.adaptive is None else self.adaptive.report()
 
     def write(self, filename="results/recuit_result"):
-        """Enregistre l'état final dans un fichier JSON"""
-        i = 1
-        while os.path.exists(f"{filename}{i}.json"):
-            i += 1
-        with open(f"{filename}{i}.json", "w") as file:
-            json.dump(self.state.rot_table, file, indent=4)
-        print("Result saved in", f"{filename}{i}.json")
-
-
-def recuit_main(seqs, JSON_filename, max_iters=100):
-    """Fonction appelée par __main__.py (pour éviter le bouclage des imports)"""
-    recuit = Recuit(seqs, RotTable(JSON_filename), max_iters, 10)
+        """Enregistre le meilleur état dans un fichier JSON et renvoie son nom"""
+        return write_numbered(self.best_state.rot_table, filename)
+
+
+def recuit_main(seqs, JSON_filename, max_iters=100, cache=None, budget=None, checkpoint=None, resume=None,
+                warm_start=None, progress=None, store=None, backend=None, weights=None, normalize=False,
+                workers=1, compress=False, schedule="geometric", tries=1, evaluator=None):
+    """Fonction appelée par __main__.py (pour éviter le bouclage des imports)
+
+    Avec warm_start (fichiers ou dossiers de tables), le recuit part de la meilleure table
+    enregistrée pour ces séquences si elle est meilleure que JSON_filename.
+    Avec store (ResultStore), le lancement est aussi enregistré dans la base des résultats.
+    weights, normalize, workers et compress configurent l'objectif multi-séquences (cf. Objective),
+    schedule le programme de température ('geometric' ou 'adaptive'), tries le nombre de voisins
+    évalués ensemble à chaque itération, evaluator le moteur d'évaluation (cf. Evaluator).
+    """
+    start = time.monotonic()
+    initial_state = RotTable(JSON_filename)
+    if warm_start is not None:
+        filename, initial_state = best_table(seqs, warm_start, initial_state)
+        print("Démarrage à chaud :", filename or JSON_filename)
+    objective = Objective(seqs, weights, normalize, workers, cache, backend, compress, evaluator)
+    if compress:
+        for seq, grammar in zip(seqs, objective.grammars):
+            print(f"Grammaire : {len(seq)} bases, {grammar.rules()} règles, taux de compression {grammar.ratio():.2f}")
+    recuit = Recuit(seqs, initial_state, max_iters, 10, cache, backend=backend, objective=objective,
+                    schedule=schedule, tries=tries)
+    if resume is not None:
+        data = load(resume)
+        recuit.restore(data)
+        if budget is not None:
+            budget.resume(recuit.evaluations(), float(data["elapsed"]))
+        print(f"Reprise à l'itération {recuit.k}")
     print("---- Lancement de l'algorithme du recuit simulé ----")
-    recuit.run()
-    traj = Traj3D()
-    dist = []
-    for seq in seqs:
-        traj.compute(seq, recuit.state)
-        dist.append(traj.getDistance())
-        print("Distance:", traj.getDistance())
-        # traj.draw()
-    recuit.write()
+    with objective:
+        recuit.run(budget, checkpoint, progress)
+        # Seul l'état final passe par le cache (s'il est actif), pas les voisins proposés
+        dist = objective.distances(recuit.best_state)
+    for distance in dist:
+        print("Distance:", distance)
+    print("Result saved in", recuit.write())
+    if store is not None:
+        run = store.insert("recuit", recuit.best_state, seqs, distances=dist,
+                           params={"k_max": max_iters, "temp": recuit.temp0, "cooling": recuit.cooling,
+                                   "step": recuit.step, "initial_state": JSON_filename,
+                                   "weights": objective.weights.tolist(), "schedule": schedule,
+                                   "tries": tries},
+                           elapsed=time.monotonic() - start, evaluations=recuit.evaluations())
+        print("Run", run, "recorded in", store.path)
@@ -1,5 +1,7 @@
 from json import load as json_load
 from os import path as os_path
+import numpy as np
+from dna.Sequence import DINUCLEOTIDES
 
 here = os_path.abspath(os_path.dirname(__file__))
 
@@ -58,4 +60,41 @@ class RotTable:
     
     def setTable(self,table:dict):
         self.rot_table = table
+
+    def getVector(self) -> np.ndarray:
+        """Renvoie les 48 paramètres (twist, wedge, direction) dans l'ordre de DINUCLEOTIDES"""
+        return np.array([self.rot_table[di][:3] for di in DINUCLEOTIDES], dtype=float).ravel()
+
+    def getMargins(self) -> np.ndarray:
+        """Renvoie les marges restantes (vers le bas, vers le haut) des 48 paramètres, tableau (48, 2)"""
+        return np.array([self.getRanges(di) for di in DINUCLEOTIDES], dtype=float).reshape(48, 2)
+
+    def setMargins(self, margins):
+        """Remplace les marges restantes par celles d'un tableau (48, 2)"""
+        for i, di in enumerate(DINUCLEOTIDES):
+            for j in range(3):
+                self.rot_table[di][3+j] = [float(m) for m in margins[3*i+j]]
+
+    def getBounds(self) -> tuple:
+        """Renvoie les bornes (min, max) des 48 paramètres : valeur moins/plus la marge restante"""
+        values = self.getVector()
+        low, high = np.empty(len(values)), np.empty(len(values))
+        for i, di in enumerate(DINUCLEOTIDES):
+            for j, (r_low, r_high) in enumerate(self.getRanges(di)):
+                low[3*i+j], high[3*i+j] = r_low, r_high
+        return values - low, values + high
+
+    def setVector(self, vector, bounds: tuple = None):
+        """Remplace les 48 paramètres par ceux d'un vecteur (ordre de DINUCLEOTIDES)
+
+        Si les bornes (min, max) sont données, les marges restantes sont mises à jour
+        comme le fait updateRangesAndValues : [valeur - min, max - valeur]
+        """
+        for i, di in enumerate(DINUCLEOTIDES):
+            self.rot_table[di][0:3] = [float(v) for v in vector[3*i:3*i+3]]
+            if bounds is not None:
+                self.getRanges(di)
+                for j in range(3):
+                    k = 3*i + j
+                    self.rot_table[di][3+j] = [float(vector[k] - bounds[0][k]), float(bounds[1][k] - vector[k])]
     ###################
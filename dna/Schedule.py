@@ -0,0 +1,146 @@
+# =============================================================================
+# Programme de température adaptatif pour le recuit simulé.
+#
+#   - Température initiale : tirée des écarts d'énergie de voisins de l'état
+#     initial, pour que la probabilité d'accepter une dégradation moyenne vaille
+#     initial_acceptance.
+#   - Taux d'acceptation cible "Lam modifié" : de 1 à 0.44 pendant les 15
+#     premiers % du lancement, 0.44 jusqu'à 65 %, puis décroissance
+#     exponentielle. La température est corrigée à chaque itération selon
+#     l'écart entre le taux d'acceptation mesuré et la cible.
+#   - Pas par dinucléotide : chaque voisin ne modifie que quelques
+#     dinucléotides, dont le pas grandit s'ils sont plus souvent acceptés que la
+#     cible et diminue sinon.
+#   - Réchauffage : après patience itérations sans amélioration du meilleur
+#     état, la température remonte au-dessus de celle de la dernière
+#     amélioration et les pas sont réinitialisés.
+# =============================================================================
+
+import math
+import random
+import numpy as np
+from dna.Sequence import DINUCLEOTIDES
+
+
+class AdaptiveSchedule:
+    """Température, pas du voisinage et réchauffage adaptatifs (cf. Recuit, schedule='adaptive')
+
+    Args:
+        k_max (int): Nombre d'itérations du lancement (définit les phases de la cible)
+        step (float): Pas initial : la marge restante divisée par step (comme Recuit.step)
+        moves (int): Nombre de dinucléotides modifiés par voisin
+        samples (int): Nombre de voisins tirés pour fixer la température initiale
+        initial_acceptance (float): Probabilité initiale d'accepter une dégradation moyenne
+        gain (float): Vitesse de correction de la température
+        window (int): Fenêtre (en itérations) du taux d'acceptation mesuré et de l'adaptation des pas
+        patience (int): Itérations sans amélioration avant réchauffage (défaut : k_max / 5, au moins 50)
+        reheat (float): Le réchauffage ramène la température à au moins reheat fois celle de la
+                        dernière amélioration du meilleur état
+    """
+
+    def __init__(self, k_max, step=3, moves=4, samples=20, initial_acceptance=0.8, gain=0.3, window=50,
+                 patience=None, reheat=2.0):
+        self.k_max = k_max
+        self.step = step
+        self.moves = min(moves, len(DINUCLEOTIDES))
+        self.samples = samples
+        self.initial_acceptance = initial_acceptance
+        self.gain = gain
+        self.window = window
+        self.patience = patience or max(50, k_max // 5)
+        self.reheat = reheat
+        self.temp0 = None
+        self.best_temp = None  # Température de la dernière amélioration du meilleur état
+        self.scales = np.full(len(DINUCLEOTIDES), 1 / step)
+        self.tried = np.zeros(len(DINUCLEOTIDES))
+        self.accepted = np.zeros(len(DINUCLEOTIDES))
+        self.rate = 1.0  # Taux d'acceptation mesuré (moyenne glissante)
+        self.stagnation = 0
+        self.reheats = 0
+
+    def target(self, k) -> float:
+        """Taux d'acceptation visé à l'itération k (programme de Lam modifié)"""
+        f = k / max(self.k_max, 1)
+        if f < 0.15:
+            return 0.44 + 0.56 * 560 ** (-f / 0.15)
+        if f < 0.65:
+            return 0.44
+        return 0.44 * 440 ** (-(f - 0.65) / 0.35)
+
+    def initialTemperature(self, deltas) -> float:
+        """Température initiale à partir des écarts d'énergie de voisins de l'état initial"""
+        uphill = [d for d in deltas if d > 0]
+        mean = sum(uphill) / len(uphill) if uphill else max((abs(d) for d in deltas), default=1.0)
+        self.temp0 = self.best_temp = max(mean, 1e-12) / -math.log(self.initial_acceptance)
+        return self.temp0
+
+    def propose(self, state):
+        """Modifie en place quelques dinucléotides d'un état (copie du courant) ; renvoie leurs indices"""
+        moved = random.sample(range(len(DINUCLEOTIDES)), self.moves)
+        for i in moved:
+            key = DINUCLEOTIDES[i]
+            ranges = state.getRanges(key)
+            twist, wedge = min(ranges[0]) * self.scales[i], min(ranges[1]) * self.scales[i]
+            state.updateRangesAndValues(key, [random.uniform(-twist, twist), random.uniform(-wedge, wedge), 0])
+        return moved
+
+    def update(self, temp, k, moved, accepted, improved) -> float:
+        """Prend en compte le résultat d'une itération et renvoie la nouvelle température
+
+        Args:
+            temp (float): Température courante
+            k (int): Itération qui vient d'être faite
+            moved (list): Dinucléotides modifiés par le voisin
+            accepted (bool): Le voisin a été accepté
+            improved (bool): Le meilleur état a été amélioré
+        """
+        self.rate += (accepted - self.rate) / min(self.window, k + 1)
+        target = self.target(k)
+        temp *= math.exp(self.gain * (target - self.rate))
+
+        # Pas : plus grand pour les dinucléotides plus souvent acceptés que la cible, plus petit sinon
+        self.tried[moved] += 1
+        self.accepted[moved] += accepted
+        ready = self.tried >= max(5, self.window * self.moves // len(DINUCLEOTIDES))
+        if ready.any():
+            ratio = self.accepted[ready] / self.tried[ready]
+            factor = np.where(ratio > target + 0.1, 1 + 2 * (ratio - target),
+                              np.where(ratio < target - 0.1, 1 / (1 + 2 * (target - ratio)), 1.0))
+            self.scales[ready] = np.clip(self.scales[ready] * factor, 1e-4, 1.0)
+            self.tried[ready] = self.accepted[ready] = 0
+
+        if improved:
+            self.stagnation = 0
+            self.best_temp = temp
+        else:
+            self.stagnation += 1
+        if self.stagnation >= self.patience:
+            # Réchauffage : on quitte le minimum local avec des pas de nouveau larges
+            temp = max(temp, self.reheat * self.best_temp)
+            self.scales[:] = 1 / self.step
+            self.stagnation = 0
+            self.reheats += 1
+        return temp
+
+    def snapshot(self) -> dict:
+        """Etat du programme sous forme de tableaux, pour un point de reprise"""
+        return {
+            "schedule_scales": self.scales.copy(),
+            "schedule_counts": np.stack((self.tried, self.accepted)),
+            "schedule_state": np.array([np.nan if self.temp0 is None else self.temp0,
+                                        np.nan if self.best_temp is None else self.best_temp, self.rate,
+                                        self.stagnation, self.reheats]),
+        }
+
+    def restore(self, data):
+        """Reprend le programme dans l'état sauvegardé par snapshot"""
+        self.scales = np.array(data["schedule_scales"], dtype=float)
+        self.tried, self.accepted = (np.array(c, dtype=float) for c in data["schedule_counts"])
+        temp0, best_temp, self.rate, stagnation, reheats = (float(v) for v in data["schedule_state"])
+        self.temp0 = None if math.isnan(temp0) else temp0
+        self.best_temp = None if math.isnan(best_temp) else best_temp
+        self.stagnation, self.reheats = int(stagnation), int(reheats)
+
+    def report(self) -> dict:
+        """Champs ajoutés aux événements de progression"""
+        return {"acceptance": self.rate, "reheats": self.reheats, "step_scale": float(self.scales.mean())}
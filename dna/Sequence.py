@@ -0,0 +1,93 @@
+import os
+import numpy as np
+
+# Ordre des bases et des dinucléotides (le même que celui de table.json) :
+# l'indice d'un dinucléotide vaut 4*base1 + base2 avec A=0, C=1, G=2, T=3
+BASES = "ACGT"
+DINUCLEOTIDES = [b1 + b2 for b1 in BASES for b2 in BASES]
+
+FASTA_EXTENSIONS = (".fasta", ".fa", ".fna", ".fas")
+# Corpus de séquences empaquetées à 2 bits par base (cf. Corpus)
+CORPUS_EXTENSION = ".dnac"
+
+# Table de correspondance octet -> code de base (255 = base inconnue)
+_BASE_CODES = np.full(256, 255, dtype=np.uint8)
+for _i, _b in enumerate(BASES):
+    _BASE_CODES[ord(_b)] = _i
+    _BASE_CODES[ord(_b.lower())] = _i
+
+
+def read_fasta(filename):
+    """Lit un fichier FASTA, éventuellement multi-séquences
+
+    Args:
+        filename (str): Chemin du fichier FASTA
+
+    Yields:
+        tuple -- (nom de l'enregistrement, séquence)
+    """
+    name, lines = None, []
+    with open(filename) as file:
+        for line in file:
+            line = line.rstrip('\n').rstrip('\r')
+            if line.startswith('>'):
+                if name is not None:
+                    yield name, ''.join(lines)
+                name, lines = (line[1:].split() or [''])[0], []
+            elif line:
+                lines.append(line)
+    if name is not None:
+        yield name, ''.join(lines)
+
+
+def load_sequence(filename):
+    """Renvoie la première séquence d'un fichier FASTA (comportement historique de __main__.py)
+
+    Un corpus .dnac (cf. Corpus) est aussi accepté : "corpus.dnac" pour son premier enregistrement,
+    "corpus.dnac:nom" pour l'enregistrement nom.
+    """
+    path, separator, name = filename.partition(CORPUS_EXTENSION + ":")
+    if separator or filename.endswith(CORPUS_EXTENSION):
+        from dna.Corpus import Corpus  # Import local : Corpus dépend de ce module
+        with Corpus(path + CORPUS_EXTENSION if separator else filename) as corpus:
+            return corpus.sequence(name if separator else 0)
+    for _, seq in read_fasta(filename):
+        return seq
+    raise ValueError(f"No sequence found in {filename}")
+
+
+def list_files(paths, extensions):
+    """Développe une liste de fichiers et de dossiers en une liste triée de fichiers
+
+    Args:
+        paths (list): Fichiers ou dossiers
+        extensions (tuple): Extensions retenues dans les dossiers
+
+    Returns:
+        list -- Chemins des fichiers
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in sorted(os.walk(path)):
+                files.extend(os.path.join(root, n) for n in sorted(names)
+                             if n.lower().endswith(extensions))
+        else:
+            files.append(path)
+    return files
+
+
+def encode(seq):
+    """Encode une séquence en indices de dinucléotides (uint8, longueur len(seq)-1)
+
+    Args:
+        seq (str): Séquence d'ADN
+
+    Returns:
+        np.ndarray -- Indices des dinucléotides successifs dans DINUCLEOTIDES
+    """
+    codes = _BASE_CODES[np.frombuffer(seq.encode('ascii'), dtype=np.uint8)]
+    if (codes == 255).any():
+        pos = int(np.argmax(codes == 255))
+        raise ValueError(f"Unknown base {seq[pos]!r} at position {pos}")
+    return (codes[:-1] << 2) | codes[1:]
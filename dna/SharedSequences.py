@@ -0,0 +1,112 @@
+# =============================================================================
+# Registre des séquences encodées en mémoire partagée. Le processus principal
+# place chaque séquence (et, au besoin, des index précalculés) une seule fois
+# dans un bloc multiprocessing.shared_memory ; les processus de calcul s'y
+# attachent par nom, sans copie : N processus x M séquences = M copies.
+#
+# Durée de vie : les blocs appartiennent au registre, qui les libère (unlink) à
+# sa fermeture, à sa destruction ou à la sortie de l'interpréteur. Si le
+# processus principal est tué, le resource_tracker de multiprocessing libère
+# les blocs restants.
+# =============================================================================
+
+import weakref
+from multiprocessing import shared_memory
+import numpy as np
+
+# Blocs attachés dans ce processus (gardés ouverts tant que leurs vues sont utilisées)
+_attached = {}
+
+
+def _release(blocks):
+    for block in blocks:
+        block.close()
+        try:
+            block.unlink()
+        except FileNotFoundError:
+            pass
+    blocks.clear()
+
+
+class SequenceRegistry:
+    """Séquences encodées (et index associés) en mémoire partagée
+
+    Chaque séquence occupe un bloc contenant ses tableaux les uns à la suite des autres.
+    handles() renvoie leur description (noms des blocs, types, formes, positions), légère
+    et sérialisable : c'est elle qui est transmise aux processus, qui appellent attach().
+
+    Args:
+        encoded_seqs (list): Séquences encodées (cf. Sequence.encode) à enregistrer d'emblée
+    """
+
+    def __init__(self, encoded_seqs=()):
+        self.blocks = []
+        self._handles = []
+        self._finalizer = weakref.finalize(self, _release, self.blocks)
+        for encoded in encoded_seqs:
+            self.add(encoded)
+
+    def add(self, encoded, **indexes) -> int:
+        """Copie une séquence encodée et ses index optionnels dans un nouveau bloc
+
+        Args:
+            encoded (np.ndarray): Séquence encodée
+            indexes: Tableaux précalculés associés à la séquence (par nom)
+
+        Returns:
+            int -- Indice de la séquence dans le registre
+        """
+        arrays = {"encoded": np.asarray(encoded), **{k: np.asarray(v) for k, v in indexes.items()}}
+        layout, size = [], 0
+        for key, array in arrays.items():
+            size = -(-size // 8) * 8  # Chaque tableau commence sur 8 octets
+            layout.append((key, array.dtype.str, array.shape, size))
+            size += array.nbytes
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.blocks.append(block)
+        for (key, dtype, shape, offset), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype, block.buf, offset)[...] = array
+        self._handles.append((block.name, layout))
+        return len(self._handles) - 1
+
+    def handles(self) -> list:
+        """Description sérialisable des blocs, à passer à attach() dans les processus"""
+        return list(self._handles)
+
+    def close(self):
+        """Libère tous les blocs (les processus attachés doivent avoir terminé)"""
+        self._finalizer()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def attach(handles) -> list:
+    """S'attache aux blocs d'un registre, sans copie
+
+    Args:
+        handles (list): Résultat de SequenceRegistry.handles()
+
+    Returns:
+        list -- Pour chaque séquence, dictionnaire nom -> tableau en lecture seule
+                ('encoded' pour la séquence encodée)
+    """
+    entries = []
+    for name, layout in handles:
+        if name not in _attached:
+            _attached[name] = shared_memory.SharedMemory(name=name)
+        buf = _attached[name].buf
+        entry = {}
+        for key, dtype, shape, offset in layout:
+            array = np.ndarray(shape, dtype, buf, offset)
+            array.flags.writeable = False
+            entry[key] = array
+        entries.append(entry)
+    return entries
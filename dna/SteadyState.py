@@ -0,0 +1,155 @@
+# =============================================================================
+# Algorithme génétique stationnaire (steady-state) et asynchrone.
+# Les descendants sont créés un par un et évalués en parallèle dans un pool de
+# processus : dès qu'un score revient, le descendant remplace le pire individu
+# et un nouveau descendant est soumis. Il n'y a plus de barrière par génération,
+# tous les coeurs restent occupés.
+# =============================================================================
+
+import os
+import random
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from dna.Batch import init_worker, score_steps
+from dna.SharedSequences import SequenceRegistry
+from dna.Genetic import Genetique, Individu, isInBounds, repair_individus
+from dna.Sequence import encode
+from dna.Traj3D import Traj3D
+
+
+class GenetiqueStationnaire(Genetique):
+    """Population d'un algorithme génétique stationnaire
+
+    Args:
+        len_pop (int): Taille (constante) de la population
+        n (int): Nombre de points de croisement
+    """
+
+    def __init__(self, len_pop, n=2, seeds=None):
+        super().__init__(len_pop, seeds)
+        self.n = n
+
+    def descendant(self, seuil):
+        """
+        Output : Individu -> un descendant non évalué
+
+        Deux parents choisis par tournoi sont croisés, puis le fils est muté
+        (bruit sur un dinucléotide au hasard) avec la probabilité seuil
+        """
+        parents = []
+        for _ in range(2):
+            tournament = random.sample(self.population, 2)
+            parents.append(min(tournament, key=lambda x: x.score))
+        child = self.croiser(parents[0], parents[1], self.n)[random.randrange(2)]
+        if random.uniform(0, 1) < seuil:
+            child.add_bruit(random.choice(list(child.data.getTable().keys())))
+        return child
+
+    def inserer(self, individu) -> bool:
+        """
+        Input : Individu évalué
+
+        Output : bool -> True si l'individu est le nouveau meilleur
+
+        L'individu remplace le pire de la population s'il est meilleur que lui
+        """
+        self.evaluations += 1
+        worst = max(range(self.len_pop), key=lambda i: self.population[i].score)
+        if individu.score < self.population[worst].score:
+            self.population[worst] = individu
+        if self.best_individu is None or individu.score < self.best_individu.score:
+            self.best_individu = individu.copy()
+            return True
+        return False
+
+
+def _soumettre(pool, individu):
+    steps = individu.traj.stepMatrices(individu.data)
+    return pool.submit(score_steps, 0, steps, 0)
+
+
+def _noter(individu, result):
+    _, _, dist, x, y, z = result
+    individu.traj.setCoordinates(np.array([[0.0, 0.0, 0.0], [x, y, z]]))
+    individu.setScore(dist)
+
+
+def algo_genetique_stationnaire(seq, taille, istest=False, n=2, workers=None, max_stagnant=None,
+                                cache=None, budget=None, seeds=None, progress=None) -> Individu:
+    """
+    Input :
+        - seq : chaine d'adn à calculer
+        - taille : int, taille constante de la population
+        - n : int pour le croisement en n points
+        - workers : int, nombre de processus d'évaluation (défaut : nombre de coeurs)
+        - max_stagnant : int, nombre d'évaluations sans amélioration avant l'arrêt
+                         (défaut : 40 * taille, soit les 40 générations de algo_genetique)
+        - cache : TrajectoryCache optionnel où enregistrer la trajectoire du meilleur individu
+        - budget : Budget optionnel (temps, évaluations, distance cible)
+        - seeds : list optionnelle de vecteurs de paramètres (démarrage à chaud), cf. algo_genetique
+        - progress : Progress optionnel, reçoit l'avancement (une "génération" = taille évaluations)
+
+    Output :
+        - Individu qui minimise la distance pour notre problème
+    """
+    workers = workers or os.cpu_count()
+    max_stagnant = max_stagnant or 40 * taille
+    pop = GenetiqueStationnaire(taille, n, seeds)
+    stagnant = 0
+    seuil = 0.5
+
+    with SequenceRegistry([encode(seq)]) as registry, \
+            ProcessPoolExecutor(workers, initializer=init_worker, initargs=(registry.handles(),)) as pool:
+        # Evaluation de la population initiale
+        futures = {_soumettre(pool, ind): ind for ind in pop.population}
+        for future, ind in futures.items():
+            _noter(ind, future.result())
+        pop.evaluations += taille
+        pop.best_individu = min(pop.population, key=lambda x: x.score).copy()
+        if budget is not None:
+            budget.charge(taille, pop.best_individu.score)
+
+        # On garde 2 descendants en attente par processus pour ne jamais les laisser inactifs
+        in_flight = {}
+        while stagnant < max_stagnant and not (budget is not None and budget.exhausted()):
+            # Les descendants sont vérifiés et réparés en lot avant d'être soumis
+            children = [pop.descendant(seuil) for _ in range(2 * workers - len(in_flight))]
+            repair_individus(children)
+            for child in children:
+                in_flight[_soumettre(pool, child)] = child
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                child = in_flight.pop(future)
+                _noter(child, future.result())
+                if pop.inserer(child):
+                    stagnant = 0
+                else:
+                    stagnant += 1
+                if progress is not None:
+                    progress.emit("steady-state", pop.evaluations // taille, pop.evaluations,
+                                  pop.best_individu.score, lambda: [ind.score for ind in pop.population],
+                                  stagnation=stagnant)
+                if budget is not None:
+                    budget.charge(1, pop.best_individu.score)
+                # Comme algo_genetique : plus de mutations toutes les 5 "générations" sans progrès
+                if stagnant and stagnant % (5 * taille) == 0:
+                    seuil += 0.3
+        for future in in_flight:
+            future.cancel()
+
+    # Trajectoire complète du meilleur individu pour le rapport final, relue depuis le cache
+    # (ou calculée et enregistrée) s'il est actif
+    best = pop.getBest_individu()
+    if cache is not None:
+        best.traj = cache.trajectory(seq, encode(seq), best.data)
+    else:
+        best.traj = Traj3D()
+        best.traj.compute(seq, best.data)
+    if progress is not None:
+        progress.emit("steady-state", pop.evaluations // taille, pop.evaluations, best.score,
+                      [ind.score for ind in pop.population], force=True, done=True,
+                      in_bounds=isInBounds(best.getData().getTable()),
+                      budget=None if budget is None else budget.report())
+    if not istest:
+        best.traj.draw()
+    return best
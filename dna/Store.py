@@ -0,0 +1,229 @@
+# =============================================================================
+# Base locale des résultats (SQLite). Chaque lancement enregistre sa table, les
+# séquences sur lesquelles elle a été optimisée (par leur hash), les distances
+# de fermeture, les hyperparamètres et les temps. Les insertions concurrentes
+# sont atomiques (journal WAL) et "meilleure table pour cette séquence" est une
+# requête indexée au lieu de l'ouverture de tous les fichiers de results/.
+# =============================================================================
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Traj3D import Traj3D
+
+DEFAULT_STORE = os.environ.get("DNA_RESULTS_DB", os.path.join("results", "results.db"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created REAL NOT NULL,
+    algorithm TEXT NOT NULL,
+    sequences TEXT NOT NULL,
+    energy REAL NOT NULL,
+    elapsed REAL,
+    evaluations INTEGER,
+    params TEXT,
+    rot_table TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_best ON runs (sequences, energy);
+CREATE TABLE IF NOT EXISTS distances (
+    run INTEGER NOT NULL REFERENCES runs (id),
+    sequence TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    distance REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS distances_best ON distances (sequence, distance);
+"""
+
+
+def sequence_hash(seq) -> str:
+    """Identifiant d'une séquence dans la base (sha256 de la séquence en majuscules)"""
+    return hashlib.sha256(seq.upper().encode()).hexdigest()
+
+
+def sequences_hash(seqs) -> str:
+    """Identifiant d'un ensemble de séquences (indépendant de leur ordre)"""
+    return hashlib.sha256(",".join(sorted(sequence_hash(seq) for seq in seqs)).encode()).hexdigest()
+
+
+class ResultStore:
+    """Base SQLite des résultats d'optimisation
+
+    Args:
+        path (str): Fichier de la base (créé s'il n'existe pas)
+        timeout (float): Attente maximale, en secondes, quand un autre processus écrit
+    """
+
+    def __init__(self, path=DEFAULT_STORE, timeout=30.0):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=timeout)
+        self.connection.row_factory = sqlite3.Row
+        # Le passage en WAL d'une base neuve peut échouer immédiatement (sans attente) si un
+        # autre processus la crée au même moment : on réessaie jusqu'au délai maximal
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                # WAL : les lectures ne bloquent pas les écritures, les écritures concurrentes sont sérialisées
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+                with self.connection:
+                    self.connection.executescript(SCHEMA)
+                break
+            except sqlite3.OperationalError:
+                if time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def insert(self, algorithm, rot_table, seqs, params=None, elapsed=None, evaluations=None,
+               distances=None) -> int:
+        """Enregistre un lancement (une seule transaction)
+
+        Args:
+            algorithm (str): Optimiseur ('recuit', 'genetic', 'cmaes'...)
+            rot_table (RotTable): Table obtenue
+            seqs (list): Séquences sur lesquelles la table a été optimisée
+            params (dict): Hyperparamètres du lancement
+            elapsed (float): Durée du lancement en secondes
+            evaluations (int): Nombre d'évaluations de trajectoires
+            distances (list): Distances de fermeture de chaque séquence (calculées si absentes)
+
+        Returns:
+            int -- Identifiant du lancement
+        """
+        if distances is None:
+            traj = Traj3D()
+            distances = []
+            for seq in seqs:
+                traj.computeEndpoint(encode(seq), rot_table)
+                distances.append(traj.getDistance())
+        energy = sum(d * d for d in distances)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (created, algorithm, sequences, energy, elapsed, evaluations, params, rot_table)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), algorithm, sequences_hash(seqs), energy, elapsed, evaluations,
+                 json.dumps(params or {}), json.dumps(rot_table.getTable())))
+            run = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO distances (run, sequence, length, distance) VALUES (?, ?, ?, ?)",
+                [(run, sequence_hash(seq), len(seq), float(d)) for seq, d in zip(seqs, distances)])
+        return run
+
+    def get(self, run) -> dict:
+        """Renvoie un lancement (dictionnaire, avec ses distances), ou None"""
+        row = self.connection.execute("SELECT * FROM runs WHERE id = ?", (run,)).fetchone()
+        if row is None:
+            return None
+        result = dict(row)
+        result["params"] = json.loads(result["params"])
+        result["rot_table"] = json.loads(result["rot_table"])
+        result["distances"] = {r["sequence"]: r["distance"] for r in self.connection.execute(
+            "SELECT sequence, distance FROM distances WHERE run = ?", (run,))}
+        return result
+
+    def best(self, seqs, limit=1) -> list:
+        """Meilleurs lancements pour des séquences (requête indexée)
+
+        Pour une seule séquence, tous les lancements où elle intervient sont classés par sa
+        distance de fermeture ; pour plusieurs, ceux optimisés sur exactement ces séquences
+        sont classés par énergie (somme des carrés des distances).
+
+        Args:
+            seqs (list): Séquences d'ADN
+            limit (int): Nombre de lancements renvoyés
+
+        Returns:
+            list -- Couples (identifiant, énergie), du meilleur au moins bon
+        """
+        if len(seqs) == 1:
+            rows = self.connection.execute(
+                "SELECT run, distance * distance FROM distances WHERE sequence = ? ORDER BY distance LIMIT ?",
+                (sequence_hash(seqs[0]), limit))
+        else:
+            rows = self.connection.execute(
+                "SELECT id, energy FROM runs WHERE sequences = ? ORDER BY energy LIMIT ?",
+                (sequences_hash(seqs), limit))
+        return [tuple(row) for row in rows]
+
+    def table(self, run) -> RotTable:
+        """Table de rotation d'un lancement"""
+        row = self.connection.execute("SELECT rot_table FROM runs WHERE id = ?", (run,)).fetchone()
+        if row is None:
+            raise KeyError(run)
+        rot_table = RotTable()
+        rot_table.setTable(json.loads(row[0]))
+        return rot_table
+
+    def export(self, run, filename):
+        """Ecrit la table d'un lancement au format JSON de results/"""
+        write_json(self.table(run).getTable(), filename)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+def write_json(table, filename):
+    """Ecrit une table au format JSON de façon atomique (fichier temporaire puis renommage)"""
+    directory = os.path.dirname(os.path.abspath(filename))
+    os.makedirs(directory, exist_ok=True)
+    tmp = f"{filename}.{os.getpid()}.tmp"
+    with open(tmp, "w") as file:
+        json.dump(table, file, indent=4)
+    os.replace(tmp, filename)
+
+
+def write_numbered(table, prefix):
+    """Ecrit une table dans un fichier {prefix}{i}.json libre et renvoie son nom
+
+    Le nom est réservé par une création exclusive (O_EXCL) : deux processus concurrents
+    ne peuvent pas obtenir le même fichier.
+    """
+    directory, name = os.path.split(os.path.abspath(prefix))
+    os.makedirs(directory, exist_ok=True)
+    # On commence après le nombre de fichiers existants plutôt qu'à 1 : une seule tentative en général
+    i = 1 + sum(1 for f in os.listdir(directory) if f.startswith(name) and f.endswith(".json"))
+    while True:
+        filename = f"{prefix}{i}.json"
+        try:
+            fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+        except FileExistsError:
+            i += 1
+            continue
+        with os.fdopen(fd, "w") as file:
+            json.dump(table, file, indent=4)
+        return filename
+
+
+def export_main(path, run=None, seqs=None, filename=None):
+    """Fonction appelée par __main__.py : exporte un lancement de la base au format JSON
+
+    Args:
+        path (str): Base des résultats
+        run (int): Lancement à exporter (défaut : le meilleur pour seqs)
+        seqs (list): Séquences dont on exporte la meilleure table si run n'est pas donné
+        filename (str): Fichier JSON (défaut : results/run{run}.json)
+    """
+    with ResultStore(path) as store:
+        if run is None:
+            best = store.best(seqs)
+            if not best:
+                print("No run recorded for these sequences in", path)
+                return None
+            run = best[0][0]
+        filename = filename or os.path.join("results", f"run{run}.json")
+        store.export(run, filename)
+        row = store.get(run)
+    print(f"Run {run} ({row['algorithm']}, energy {row['energy']:.2f}) exported to {filename}")
+    return filename
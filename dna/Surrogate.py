@@ -0,0 +1,122 @@
+import math
+import numpy as np
+
+
+class Surrogate:
+    """Modèle de substitution de l'énergie de fermeture
+
+    Modèle quadratique local (termes linéaires et carrés, régression ridge) du point
+    d'arrivée (x, y, z) de la trajectoire en fonction des 48 paramètres, ajusté sur les
+    individus déjà évalués exactement. Le point d'arrivée varie régulièrement avec les
+    paramètres (contrairement à la distance, qui s'annule à l'optimum) : la distance
+    prédite est la norme du point prédit. Il sert à classer les descendants : seule la
+    fraction la plus prometteuse est évaluée exactement.
+
+    Le modèle n'est fiable que localement (descendants proches les uns des autres). Tant que
+    la corrélation de rang mesurée reste sous min_correlation, toute la population est
+    évaluée exactement, ce qui donne une mesure non biaisée de la qualité du classement.
+
+    Args:
+        fraction (float): Proportion de la population évaluée exactement
+        max_samples (int): Nombre maximal d'évaluations (les plus récentes) conservées pour l'ajustement
+        ridge (float): Coefficient de régularisation
+        min_correlation (float): Corrélation de rang en dessous de laquelle le filtrage est suspendu
+    """
+
+    def __init__(self, fraction=0.3, max_samples=500, ridge=1e-3, min_correlation=0.5):
+        self.fraction = fraction
+        self.max_samples = max_samples
+        self.ridge = ridge
+        self.min_correlation = min_correlation
+        self.X = np.empty((0, 0))
+        self.y = np.empty((0, 3))
+        self.coefs = None
+        self.exact = 0          # Nombre d'évaluations exactes
+        self.skipped = 0        # Nombre d'évaluations évitées
+        self.correlations = []  # Corrélation de rang prédiction / score exact à chaque génération
+
+    def add(self, X, points):
+        """Ajoute des évaluations exactes (paramètres, points d'arrivée) à l'archive
+
+        On garde les max_samples plus récentes, qui décrivent la région explorée actuellement
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        y = np.atleast_2d(np.asarray(points, dtype=float))
+        if self.X.size == 0:
+            self.X, self.y = X, y
+        else:
+            self.X = np.vstack((self.X, X))[-self.max_samples:]
+            self.y = np.vstack((self.y, y))[-self.max_samples:]
+
+    def _features(self, X):
+        Z = (X[:, self.active] - self.center) / self.scale
+        return np.hstack((np.ones((len(Z), 1)), Z, Z**2))
+
+    def fit(self):
+        """Réajuste le modèle sur l'archive. Il reste inactif tant qu'il y a moins d'évaluations que de coefficients"""
+        if len(self.y) == 0:
+            return
+        std = self.X.std(axis=0)
+        self.active = std > 1e-12  # Les paramètres qui ne varient jamais (direction) sont ignorés
+        if len(self.y) <= 2 * self.active.sum() + 1:
+            return
+        self.center = self.X[:, self.active].mean(axis=0)
+        self.scale = std[self.active]
+        F = self._features(self.X)
+        # Régression ridge (le terme constant n'est pas régularisé)
+        penalty = self.ridge * np.eye(F.shape[1])
+        penalty[0, 0] = 0
+        self.coefs = np.linalg.solve(F.T @ F + penalty, F.T @ self.y)
+
+    def ready(self):
+        return self.coefs is not None
+
+    def predict(self, X):
+        """Prédit la distance de fermeture de chaque ligne de X"""
+        points = self._features(np.atleast_2d(np.asarray(X, dtype=float))) @ self.coefs
+        return np.linalg.norm(points, axis=1)
+
+    def screen(self, X):
+        """Renvoie les indices des lignes à évaluer exactement et les prédictions (None si le modèle est inactif)"""
+        if not self.ready():
+            return np.arange(len(X)), None
+        predictions = self.predict(X)
+        if not self.trusted():
+            return np.argsort(predictions), predictions
+        n_exact = max(1, math.ceil(self.fraction * len(X)))
+        return np.argsort(predictions)[:n_exact], predictions
+
+    def trusted(self):
+        """Le filtrage n'est appliqué que si le dernier classement mesuré était assez bon"""
+        return bool(self.correlations) and self.correlations[-1] >= self.min_correlation
+
+    def record(self, predictions, scores):
+        """Mémorise la qualité du classement (corrélation de Spearman) sur les individus évalués"""
+        if len(scores) < 3:
+            return
+        rp = np.argsort(np.argsort(predictions))
+        rs = np.argsort(np.argsort(scores))
+        if rp.std() > 0 and rs.std() > 0:
+            self.correlations.append(float(np.corrcoef(rp, rs)[0, 1]))
+
+    def snapshot(self) -> dict:
+        """Etat du modèle (archive et compteurs) sous forme de tableaux"""
+        return {"surrogate_X": self.X, "surrogate_y": self.y,
+                "surrogate_correlations": np.array(self.correlations),
+                "surrogate_counts": np.array([self.exact, self.skipped])}
+
+    def restore(self, data):
+        """Restaure l'état sauvegardé par snapshot et réajuste le modèle"""
+        self.X, self.y = data["surrogate_X"], data["surrogate_y"]
+        self.correlations = [float(c) for c in data["surrogate_correlations"]]
+        self.exact, self.skipped = (int(c) for c in data["surrogate_counts"])
+        self.fit()
+
+    def report(self) -> dict:
+        """Statistiques du filtrage : évaluations exactes, évitées et qualité moyenne du classement"""
+        return {
+            "exact": self.exact,
+            "skipped": self.skipped,
+            "rank_correlation": float(np.mean(self.correlations)) if self.correlations else None,
+            "samples": len(self.y),
+        }
@@ -1,14 +1,34 @@
 from dna.RotTable import RotTable
 from dna.Traj3D import Traj3D
+from dna.Sequence import encode
+from dna.Export import export_file
 
 
-def traditionnal_main(seq, filename, JSON_filename):
-    """Fonction appelée par __main__.py (pour éviter le bouclage des imports)"""
-    rot_table = RotTable(JSON_filename)
-    traj = Traj3D()
-    traj.compute(seq, rot_table)
+def traditionnal_main(seq, filename, JSON_filename, cache=None, formats=("png",), evaluator=None):
+    """Fonction appelée par __main__.py (pour éviter le bouclage des imports)
 
+    Args:
+        formats (tuple): Sorties écrites à côté de la séquence : "png" (figure) et/ou un format
+                         d'export des coordonnées (cf. Export.FORMATS), calculées par blocs
+        evaluator (Evaluator): Si donné, la distance affichée est calculée par ce moteur (cf. Evaluator)
+    """
+    distance = None
+    for fmt in formats:
+        if fmt != "png":
+            distance = export_file(seq, filename, JSON_filename, fmt)
+            continue
+        rot_table = RotTable(JSON_filename)
+        if cache is None:
+            traj = Traj3D()
+            traj.compute(seq, rot_table)
+        else:
+            # Trajectoire relue depuis le cache si elle a déjà été calculée
+            traj = cache.trajectory(seq, encode(seq), rot_table)
+        distance = traj.getDistance()
+        # Rendu simplifié ; hors écran (directement dans le fichier) sans affichage interactif
+        traj.draw(filename+".png")
+
+    if evaluator is not None:
+        distance = float(evaluator.score(RotTable(JSON_filename).getVector(), [seq])[0, 0])
     # print(traj.getTraj())
-    print("Distance:", traj.getDistance())
-    traj.draw()
-    traj.write(filename+".png")
+    print("Distance:", distance)
@@ -1,10 +1,20 @@
 import math
+import os
+import sys
 
 # For drawing
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
 from mpl_toolkits.mplot3d import Axes3D
 from dna.RotTable import RotTable
+from dna.Sequence import DINUCLEOTIDES
+
+
+# Densité du tracé simplifié par pas régulier : points par pixel de la plus grande dimension de la figure
+POINTS_PER_PIXEL = 4
+NON_INTERACTIVE_BACKENDS = ("agg", "cairo", "pdf", "pgf", "ps", "svg", "template")
 
 
 class Traj3D:
@@ -24,6 +34,14 @@ class Traj3D:
     def getTraj(self) -> dict:
         return self.__Traj3D
 
+    def getCoordinates(self) -> np.ndarray:
+        """Renvoie les coordonnées (x, y, z) de la trajectoire sous forme d'un tableau (n, 3)"""
+        return np.array(self.__Traj3D)[:, :3]
+
+    def setCoordinates(self, xyz: np.ndarray):
+        """Remplace la trajectoire par des coordonnées (n, 3) déjà calculées"""
+        self.__Traj3D = np.hstack((xyz, np.ones((len(xyz), 1))))
+
     def compute(self, dna_seq: str, rot_table: RotTable):
 
         # Matrice cumulant l'ensemble des transformations géométriques engendrées par la séquence d'ADN
@@ -59,6 +77,24 @@ class Traj3D:
             # à la position du premier nucléotide
             self.__Traj3D.append(total_matrix @ self.__Traj3D[0])
 
+    def stepMatrices(self, rot_table: RotTable) -> np.ndarray:
+        """Renvoie les 16 matrices de pas T.Rz.Q.Rz.T, dans l'ordre de DINUCLEOTIDES"""
+        steps = np.empty((len(DINUCLEOTIDES), 4, 4))
+        for i, dinucleotide in enumerate(DINUCLEOTIDES):
+            matrix_Rz, matrix_Q = self.__compute_matrices(rot_table, dinucleotide)
+            steps[i] = self.__MATRIX_T @ matrix_Rz @ matrix_Q @ matrix_Rz @ self.__MATRIX_T
+        return steps
+
+    def computeEndpoint(self, encoded_seq: np.ndarray, rot_table: RotTable):
+        """Calcule seulement le premier et le dernier point de la trajectoire
+
+        Args:
+            encoded_seq (np.ndarray): Séquence encodée (cf Sequence.encode)
+            rot_table (RotTable): Table de rotation
+        """
+        total_matrix = product(self.stepMatrices(rot_table)[encoded_seq])
+        self.__Traj3D = [np.array([0.0, 0.0, 0.0, 1.0]), total_matrix[:, 3].copy()]
+
     def __compute_matrices(self, rot_table: RotTable, dinucleotide: str):
 
         Omega = math.radians(rot_table.getTwist(dinucleotide))
@@ -98,15 +134,37 @@ class Traj3D:
 
         return matrices_Rz, matrices_Q
 
-    def draw(self):
-        self.fig = plt.figure()
-        self.ax = plt.axes(projection='3d')
-        xyz = np.array(self.__Traj3D)
+    def draw(self, filename: str = None, max_points: int = None, tolerance: float = None, show: bool = None):
+        """Trace la trajectoire, simplifiée pour que le rendu ne dépende pas de la longueur de la séquence
+
+        Args:
+            filename (str): Image où enregistrer la figure
+            max_points (int): Nombre maximal de points tracés, par pas régulier
+                              (défaut : POINTS_PER_PIXEL fois la largeur de la figure en pixels)
+            tolerance (float): Si donnée, simplification de Ramer-Douglas-Peucker : aucun point
+                               retiré n'est à plus de tolerance (Å) du tracé
+            show (bool): Ouvre une fenêtre (défaut : seulement si un affichage interactif est disponible) ;
+                         sinon le rendu se fait hors écran (Agg), directement dans filename
+        """
+        if show is None:
+            show = interactive()
+        # Hors écran, la figure n'est pas enregistrée auprès de pyplot (pas de fuite mémoire)
+        self.fig = plt.figure() if show else Figure()
+        self.ax = self.fig.add_subplot(projection='3d')
+        xyz = self.getCoordinates()
+        if tolerance is not None:
+            xyz = xyz[simplify(xyz, tolerance)]
+        else:
+            width, height = self.fig.get_size_inches() * self.fig.dpi
+            xyz = xyz[decimate(len(xyz), max_points or int(POINTS_PER_PIXEL * max(width, height)))]
         x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
         self.ax.plot(x[1:-1], y[1:-1], z[1:-1])
         self.ax.scatter(x[0], y[0], z[0], c='red')
         self.ax.scatter(x[-1], y[-1], z[-1], c='green')
-        plt.show()
+        if filename is not None:
+            self.write(filename)
+        if show:
+            plt.show()
 
     def getDistance(self):
         return math.sqrt(self.energy())
@@ -118,3 +176,135 @@ class Traj3D:
         xyz = np.array(self.__Traj3D)
         x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
         return (x[0]-x[-1])**2 + (y[0]-y[-1])**2 + (z[0]-z[-1])**2
+
+
+def interactive() -> bool:
+    """True si matplotlib peut ouvrir une fenêtre (backend interactif et affichage disponible)"""
+    if matplotlib.get_backend().lower() in NON_INTERACTIVE_BACKENDS:
+        return False
+    if sys.platform.startswith("linux"):
+        return bool(os.environ.get("DISPLAY") or os.environ.get("WAYLAND_DISPLAY"))
+    return True
+
+
+def decimate(n: int, max_points: int) -> np.ndarray:
+    """Indices d'au plus max_points points régulièrement espacés parmi n, extrémités comprises"""
+    max_points = max(max_points, 2)
+    if n <= max_points:
+        return np.arange(n)
+    stride = math.ceil((n - 1) / (max_points - 1))
+    return np.append(np.arange(0, n - 1, stride), n - 1)
+
+
+def simplify(xyz: np.ndarray, tolerance: float) -> np.ndarray:
+    """Simplification de Ramer-Douglas-Peucker d'une ligne brisée (n, 3)
+
+    Chaque point retiré est à moins de tolerance du segment qui le remplace. La version est
+    itérative (pile explicite, pas de récursion) et chaque segment est traité d'un bloc.
+
+    Returns:
+        np.ndarray -- Indices des points conservés, extrémités comprises
+    """
+    n = len(xyz)
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        points = xyz[a+1:b] - xyz[a]
+        chord = xyz[b] - xyz[a]
+        # Distance au segment [a, b] (au point a si les extrémités sont confondues)
+        length2 = chord @ chord
+        t = np.clip(points @ chord / length2, 0, 1) if length2 > 0 else np.zeros(len(points))
+        dist = np.linalg.norm(points - t[:, None] * chord, axis=1)
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            m = a + 1 + i
+            keep[m] = True
+            stack += [(a, m), (m, b)]
+    return np.flatnonzero(keep)
+
+
+def product(matrices: np.ndarray) -> np.ndarray:
+    """Produit ordonné M0 @ M1 @ ... d'une pile de matrices (..., n, 4, 4)
+
+    Réduction par paires : log2(n) produits vectorisés au lieu de n produits en Python.
+    Les dimensions de tête éventuelles (plusieurs piles de même longueur) sont réduites ensemble.
+    """
+    if matrices.shape[-3] == 0:
+        return np.broadcast_to(np.eye(4), matrices.shape[:-3] + (4, 4)).copy()
+    while matrices.shape[-3] > 1:
+        n = matrices.shape[-3]
+        tail = matrices[..., n - 1:, :, :] if n % 2 else matrices[..., :0, :, :]
+        pairs = matrices[..., :n - tail.shape[-3], :, :]
+        matrices = np.concatenate((pairs[..., 0::2, :, :] @ pairs[..., 1::2, :, :], tail), axis=-3)
+    return matrices[..., 0, :, :]
+
+
+def prefix_products(matrices: np.ndarray) -> np.ndarray:
+    """Produits cumulés M0, M0 @ M1, ..., M0 @ ... @ Mn-1 d'une pile de matrices (n, 4, 4)
+
+    Balayage par doublement : log2(n) produits vectorisés au lieu de n produits en Python
+    """
+    result = np.array(matrices, dtype=float)
+    shift = 1
+    while shift < len(result):
+        result[shift:] = result[:-shift] @ result[shift:]
+        shift *= 2
+    return result
+
+
+def trajectory_chunks(encoded_seq: np.ndarray, steps: np.ndarray, chunk: int = 65536):
+    """Points de la trajectoire par blocs, sans liste Python ni tableau de la trajectoire entière
+
+    Chaque bloc de pas est cumulé par prefix_products puis composé avec le produit de tous les
+    blocs précédents : le temps est linéaire et la mémoire bornée par la taille d'un bloc.
+
+    Args:
+        encoded_seq (np.ndarray): Séquence encodée (cf Sequence.encode)
+        steps (np.ndarray): Les 16 matrices de pas (cf Traj3D.stepMatrices)
+        chunk (int): Nombre de pas par bloc
+
+    Yields:
+        np.ndarray -- Coordonnées (m, 3) des points successifs, le premier (l'origine) compris
+    """
+    carry = np.eye(4)
+    yield np.zeros((1, 3))
+    for start in range(0, len(encoded_seq), chunk):
+        prefixes = carry @ prefix_products(steps[encoded_seq[start:start + chunk]])
+        carry = prefixes[-1]
+        yield prefixes[:, :3, 3]
+
+
+def step_matrices(params: np.ndarray) -> np.ndarray:
+    """Matrices de pas T.Rz.Q.Rz.T pour une pile de paramètres, sans boucle Python
+
+    Args:
+        params (np.ndarray): (..., 16, 3) twist, wedge, direction dans l'ordre de DINUCLEOTIDES
+
+    Returns:
+        np.ndarray -- (..., 16, 4, 4)
+    """
+    params = np.asarray(params, dtype=float)
+    shape = params.shape[:-1]
+    Omega = np.radians(params[..., 0])
+    alpha = np.radians(params[..., 1])
+    beta = np.radians(params[..., 2] - 90)
+
+    def rotation(c, s, axes):
+        m = np.zeros(shape + (4, 4))
+        m[..., 0, 0] = m[..., 1, 1] = m[..., 2, 2] = m[..., 3, 3] = 1
+        (i, j) = axes
+        m[..., i, i], m[..., i, j], m[..., j, i], m[..., j, j] = c, -s, s, c
+        return m
+
+    cO, sO = np.cos(Omega/2), np.sin(Omega/2)
+    cb, sb = np.cos(beta), np.sin(beta)
+    ca, sa = np.cos(alpha), np.sin(alpha)
+    matrix_Rz = rotation(cO, -sO, (0, 1))
+    matrix_Q = rotation(cb, sb, (0, 1)) @ rotation(ca, sa, (1, 2)) @ rotation(cb, -sb, (0, 1))
+    matrix_T = np.eye(4)
+    matrix_T[2, 3] = -3.38/2
+    return matrix_T @ matrix_Rz @ matrix_Q @ matrix_Rz @ matrix_T
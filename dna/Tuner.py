@@ -0,0 +1,165 @@
+# =============================================================================
+# Réglage des hyperparamètres par élimination successive (successive halving).
+# Chaque configuration reçoit un petit budget d'évaluations de trajectoires, la
+# moitié la moins bonne est éliminée, les survivantes sont relancées avec un
+# budget double, jusqu'à ce qu'il n'en reste qu'une.
+# =============================================================================
+
+import contextlib
+import io
+import itertools
+import json
+import logging
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dna.Genetic import algo_genetique
+from dna.Recuit import Recuit
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.SharedSequences import SequenceRegistry, attach
+
+# Espaces de recherche des deux algorithmes
+GENETIC_SPACE = {
+    "taille": [10, 20, 50, 100],
+    # Avec un autre taux, la population rétrécit ou grossit à chaque génération
+    "rate": [0.5],
+    "n": [1, 2, 4, 8],
+    "algorithme_selection": ['elitisme', 'roulette', 'tournoi'],
+    "seuil": [0.2, 0.5, 0.8],
+    "seuil_step": [0.1, 0.3, 0.5],
+}
+RECUIT_SPACE = {
+    "temp": [1e3, 1e4, 1.5e5, 1e6],
+    "cooling": [0.95, 0.98, 0.992, 0.998],
+    "step": [2, 3, 5, 10],
+}
+
+logger = logging.getLogger(__name__)
+
+
+def sample_configs(space, n_configs, seed=None):
+    """Tire n_configs configurations distinctes d'un espace de recherche
+
+    Args:
+        space (dict): Valeurs possibles de chaque hyperparamètre
+        n_configs (int): Nombre de configurations
+        seed (int): Graine du tirage
+
+    Returns:
+        list -- Liste de dictionnaires de configuration
+    """
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    return random.Random(seed).sample(grid, min(n_configs, len(grid)))
+
+
+def run_config(target, config, budget, seqs, seed=0):
+    """Lance une configuration avec un budget d'évaluations et renvoie la distance obtenue
+
+    Args:
+        target (str): 'genetic' ou 'recuit'
+        config (dict): Hyperparamètres
+        budget (int): Nombre d'évaluations de trajectoires
+        seqs (list): Séquences (seule la première est utilisée en mode genetic)
+        seed (int): Graine, identique pour toutes les configurations d'un même tour
+
+    Returns:
+        float -- Distance de fermeture finale (racine de l'énergie pour le recuit)
+    """
+    # La sélection par roulette tire avec numpy : les deux générateurs sont fixés
+    random.seed(seed)
+    np.random.seed(seed)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            if target == "genetic":
+                generations = max(1, budget // config["taille"])
+                best = algo_genetique(seqs[0], istest=True, max_generations=generations, **config)
+                return best.getScore()
+            recuit = Recuit(seqs, RotTable(), max(1, budget // len(seqs)), 0, **config)
+            recuit.run()
+            return math.sqrt(recuit.e)
+    except (ArithmeticError, ValueError) as error:
+        # Echec numérique (débordement de exp, score nul à la roulette, probabilités invalides...) :
+        # la configuration est classée dernière
+        logger.warning("%s configuration %s failed with budget %d: %r", target, config, budget, error)
+        return math.inf
+
+
+# Séquences lues en mémoire partagée par chaque processus (cf _init_worker)
+_worker_seqs = None
+
+
+def _init_worker(handles):
+    global _worker_seqs
+    _worker_seqs = [entry["bases"].tobytes().decode("ascii") for entry in attach(handles)]
+
+
+def _run_shared(target, config, budget, seed):
+    """run_config sur les séquences du registre partagé (elles ne sont pas transmises à chaque tâche)"""
+    return run_config(target, config, budget, _worker_seqs, seed)
+
+
+def successive_halving(target, seqs, n_configs=16, min_budget=200, eta=2, workers=None, seed=0, progress=None):
+    """Elimination successive sur des configurations tirées au hasard
+
+    Args:
+        target (str): 'genetic' ou 'recuit'
+        seqs (list): Séquences d'ADN
+        n_configs (int): Nombre de configurations au premier tour
+        min_budget (int): Budget (évaluations de trajectoires) du premier tour
+        eta (int): Facteur d'élimination : on garde 1/eta des configurations, le budget est multiplié par eta
+        workers (int): Nombre de processus (défaut : nombre de coeurs)
+        seed (int): Graine du tirage des configurations et des lancements
+        progress (Progress): Reçoit un événement par tour ; rien n'est affiché
+
+    Returns:
+        list -- Classement : dictionnaires (config, budget, score, round) du dernier tour atteint
+                par chaque configuration, triés du meilleur au moins bon
+    """
+    space = GENETIC_SPACE if target == "genetic" else RECUIT_SPACE
+    configs = sample_configs(space, n_configs, seed)
+    results = {}
+    budget = min_budget
+    survivors = list(range(len(configs)))
+    round_ = 0
+    evaluations = 0
+    with SequenceRegistry() as registry:
+        for seq in seqs:
+            registry.add(encode(seq), bases=np.frombuffer(seq.encode("ascii"), dtype=np.uint8))
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(registry.handles(),)) as pool:
+            while True:
+                futures = {i: pool.submit(_run_shared, target, configs[i], budget, seed + round_)
+                           for i in survivors}
+                for i, future in futures.items():
+                    results[i] = {"config": configs[i], "budget": budget, "score": future.result(),
+                                  "round": round_}
+                evaluations += budget * len(survivors)
+                if progress is not None:
+                    scores = [results[i]["score"] for i in survivors]
+                    progress.emit("tune", round_, evaluations, min(scores), scores, force=True,
+                                  configurations=len(survivors), budget=budget)
+                if len(survivors) == 1:
+                    break
+                survivors = sorted(survivors, key=lambda i: results[i]["score"])
+                survivors = survivors[:max(1, len(survivors) // eta)]
+                budget *= eta
+                round_ += 1
+    # Les configurations ayant atteint un tour plus avancé sont classées en premier
+    return sorted(results.values(), key=lambda r: (-r["round"], r["score"]))
+
+
+def tune_main(target, seqs, n_configs=16, min_budget=200, workers=None, filename="results/tune_", progress=None):
+    """Fonction appelée par __main__.py (pour éviter le bouclage des imports)"""
+    print(f"---- Réglage des hyperparamètres ({target}) par élimination successive ----")
+    leaderboard = successive_halving(target, seqs, n_configs, min_budget, workers=workers, progress=progress)
+    print("rank  round  budget      score  config")
+    for rank, row in enumerate(leaderboard, 1):
+        print(f"{rank:4d}  {row['round']:5d}  {row['budget']:6d}  {row['score']:9.2f}  {row['config']}")
+    print("Best configuration:", leaderboard[0]["config"])
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    with open(f"{filename}{target}.json", "w") as file:
+        json.dump({"best": leaderboard[0]["config"], "leaderboard": leaderboard}, file, indent=4)
+    print("Leaderboard saved in", f"{filename}{target}.json")
+    return leaderboard[0]["config"]
@@ -0,0 +1,117 @@
+# =============================================================================
+# Démarrage à chaud : les tables déjà optimisées (results/*.json) servent de
+# point de départ au recuit et de première génération à l'algorithme génétique,
+# au lieu de repartir de table.json à chaque lancement.
+# =============================================================================
+
+import os
+from dna.RotTable import RotTable
+from dna.Store import DEFAULT_STORE, ResultStore
+from dna.Sequence import DINUCLEOTIDES, encode, list_files
+from dna.Traj3D import product, step_matrices
+
+DEFAULT_PATHS = ("results", DEFAULT_STORE)
+
+
+def load_tables(paths=DEFAULT_PATHS):
+    """Charge les tables de rotation de fichiers JSON ou de dossiers en contenant
+
+    Les fichiers JSON qui ne sont pas des tables (classements du mode tune...) et les bases
+    de résultats (.db, cf. stored_tables) sont ignorés.
+
+    Args:
+        paths (list): Fichiers JSON ou dossiers
+
+    Returns:
+        list -- Couples (nom du fichier, RotTable)
+    """
+    tables = []
+    for filename in list_files(paths, (".json",)):
+        if filename.endswith(".db"):
+            continue
+        try:
+            rot_table = RotTable(filename)
+        except (OSError, ValueError):
+            continue
+        table = rot_table.getTable()
+        if isinstance(table, dict) and all(len(table.get(di, ())) == 6 for di in DINUCLEOTIDES):
+            tables.append((filename, rot_table))
+    return tables
+
+
+def stored_tables(paths, seqs, size=1):
+    """Charge les meilleures tables des bases de résultats (.db) pour des séquences
+
+    Seules les size meilleures tables de chaque base sont lues (requête indexée).
+
+    Args:
+        paths (list): Fichiers ; seuls les fichiers .db existants sont consultés
+        seqs (list): Séquences d'ADN
+        size (int): Nombre maximal de tables par base
+
+    Returns:
+        list -- Couples ("base#lancement", RotTable)
+    """
+    tables = []
+    for path in paths:
+        if path.endswith(".db") and os.path.isfile(path):
+            with ResultStore(path) as store:
+                tables += [(f"{path}#{run}", store.table(run)) for run, _ in store.best(seqs, size)]
+    return tables
+
+
+def rank_tables(tables, seqs):
+    """Classe des tables selon leur énergie (somme des carrés des distances de fermeture) sur des séquences
+
+    Args:
+        tables (list): Couples (nom, RotTable) renvoyés par load_tables
+        seqs (list): Séquences d'ADN
+
+    Returns:
+        list -- Triplets (énergie, nom, RotTable), de la meilleure à la moins bonne table
+    """
+    encoded = [encode(seq) for seq in seqs]
+    ranked = []
+    for filename, rot_table in tables:
+        steps = step_matrices(rot_table.getVector().reshape(16, 3))
+        energy = 0.0
+        for e in encoded:
+            x, y, z = product(steps[e])[:3, 3]
+            energy += x*x + y*y + z*z
+        ranked.append((energy, filename, rot_table))
+    return sorted(ranked, key=lambda r: r[0])
+
+
+def best_table(seqs, paths=DEFAULT_PATHS, initial_state=None):
+    """Renvoie la meilleure table enregistrée pour des séquences
+
+    Args:
+        seqs (list): Séquences d'ADN
+        paths (list): Fichiers JSON ou dossiers de tables
+        initial_state (RotTable): Table de départ, conservée si aucune table enregistrée n'est meilleure
+
+    Returns:
+        tuple -- (nom du fichier ou None, RotTable)
+    """
+    tables = load_tables(paths) + stored_tables(paths, seqs)
+    if initial_state is not None:
+        tables.append((None, initial_state))
+    if not tables:
+        return None, initial_state
+    _, filename, rot_table = rank_tables(tables, seqs)[0]
+    return filename, rot_table
+
+
+def seed_vectors(seq, size, paths=DEFAULT_PATHS):
+    """Vecteurs de paramètres des meilleures tables enregistrées pour une séquence
+
+    Args:
+        seq (str): Séquence d'ADN
+        size (int): Nombre maximal de tables retenues
+        paths (list): Fichiers JSON ou dossiers de tables
+
+    Returns:
+        list -- Vecteurs de 48 paramètres, du meilleur au moins bon
+    """
+    ranked = rank_tables(load_tables(paths) + stored_tables(paths, [seq], size), [seq])
+    return [rot_table.getVector() for _, _, rot_table in ranked[:size]]
@@ -1,50 +1,248 @@
 import argparse
+import os
+import time
 from dna.Recuit import recuit_main
 from dna.Traditionnal import traditionnal_main
 from dna.Genetic import algo_genetique as genetic_main
 from dna.Genetic import stats
+from dna.Batch import DEFAULT_SEQUENCES, batch_main
+from dna.SteadyState import algo_genetique_stationnaire
+from dna.CMAES import cmaes_main
+from dna.Tuner import tune_main
+from dna.Budget import Budget
+from dna.Checkpoint import Checkpointer
+from dna.Progress import Progress, print_event
+from dna.Store import DEFAULT_STORE, ResultStore, export_main
+from dna.Distributed import Coordinator, parse_address, worker_main
+from dna.Objective import Objective
+from dna.Evaluator import BACKENDS, make_evaluator
+from dna.Mutagenesis import mutagenesis_main
+from dna.Corpus import DEFAULT_CORPUS, corpus_main
+from dna.Cyclization import cyclization_main
+from dna.Sequence import load_sequence
+from dna.Cache import TrajectoryCache, DEFAULT_DIR
+from dna.Surrogate import Surrogate
+from dna.WarmStart import DEFAULT_PATHS, seed_vectors
 
 # Gestion des arguments -> voir le README.md
 parser = argparse.ArgumentParser()
 parser.add_argument(
     "-m", "--mode", nargs='?',
-    help="Choose mode : 'traditional'[default] , 'recuit'[training] or 'genetic'[training]",
+    help="Choose mode : 'traditional'[default] , 'recuit'[training], 'genetic'[training], 'cmaes'[training], 'tune'[hyperparameters], 'batch'[scoring], 'mutagenesis'[point mutations], 'cyclization'[sliding windows], 'corpus'[packed sequences], 'export'[results store] or 'worker'[distributed evaluation]",
     default='traditional')
 parser.add_argument(
-    "-d", "--dna", nargs='?', help="input filename of DNA sequence",
-    default='data/plasmid_8k.fasta')
+    "-d", "--dna", nargs='+', default=None,
+    help="input filename(s) of DNA sequence(s) (default: data/plasmid_8k.fasta, both plasmids for recuit and cmaes)")
 parser.add_argument("-j", "--json", nargs='?',
                     help="input filename of JSON file", default='dna/table.json')
 parser.add_argument("-i", "--max-iters", nargs='?',
                     help="max iterations for recuit mode", default=100, type=int)
+parser.add_argument("-e", "--max-evals", nargs='?', default=None, type=int,
+                    help="max trajectory evaluations of the optimizer (cmaes default: 20000)")
+parser.add_argument("--target", nargs='?', default=None, type=float,
+                    help="target closure distance of the optimizer (cmaes default: 10)")
+parser.add_argument("--max-time", nargs='?', default=None, type=float,
+                    help="max wall time of the optimizer in seconds")
+parser.add_argument("--checkpoint", nargs='?', default=None,
+                    help="file (.npz) where the state of the run is saved periodically (genetic and recuit modes)")
+parser.add_argument("--checkpoint-every", nargs='?', default=10, type=int,
+                    help="generations (genetic) or iterations (recuit) between two checkpoints")
+parser.add_argument("--resume", nargs='?', default=None,
+                    help="checkpoint file from which the run is resumed (genetic and recuit modes)")
+parser.add_argument("--warm-start", nargs='*', default=None,
+                    help="start genetic and recuit modes from the best tables stored in these files or directories (default: results)")
+parser.add_argument("--progress", nargs='?', default=None,
+                    help="JSONL file receiving the progress events of the optimizer")
+parser.add_argument("--progress-interval", nargs='?', default=1.0, type=float,
+                    help="minimum time between two progress events, in seconds")
+parser.add_argument("-q", "--quiet", action='store_true',
+                    help="do not print progress events on the console")
+parser.add_argument("--weights", nargs='+', default=None, type=float,
+                    help="weight of each -d sequence in the objective of recuit and genetic modes")
+parser.add_argument("--normalize", action='store_true',
+                    help="normalize the closure distances by sequence length in the objective of recuit and genetic modes")
+parser.add_argument("--compress", action='store_true',
+                    help="evaluate recuit and genetic candidates on grammar-compressed sequences")
+parser.add_argument("--backend", nargs='?', default=None, choices=list(BACKENDS),
+                    help="evaluation engine of traditional, recuit and genetic modes (default: reference for genetic,"
+                         " numpy for recuit)")
+parser.add_argument("--schedule", nargs='?', default='geometric', choices=['geometric', 'adaptive'],
+                    help="temperature schedule of recuit mode")
+parser.add_argument("--tries", nargs='?', default=1, type=int,
+                    help="neighbours evaluated together at each iteration of recuit mode (multiple-try Metropolis)")
+parser.add_argument("--format", nargs='+', default=['png'], choices=['png', 'npz', 'xyz', 'pdb'], dest='formats',
+                    help="outputs of traditional mode: figure (png) and/or coordinates streamed to npz, xyz or pdb")
 parser.add_argument("-p", "--pop-size", nargs='?', default=10,
                     type=int, help="population size for genetic mode")
 parser.add_argument("-s", "--stat", action='store_true',
                     help="best scores by population for genetic mode")
-parser.parse_args()
+parser.add_argument("--restart", nargs='?', default=None, const=0.05, type=float,
+                    help="restart the genetic population around its elite (at most 5 times) when it stagnates and its"
+                         " diversity falls below this threshold (default when given without value: 0.05)")
+parser.add_argument("--steady-state", action='store_true',
+                    help="asynchronous steady-state genetic algorithm evaluated on worker processes (genetic mode)")
+parser.add_argument("--surrogate", nargs='?', default=None, type=float,
+                    help="fraction of the offspring evaluated exactly, the rest being screened by a surrogate model (genetic mode)")
+parser.add_argument("--tune-target", nargs='?', default='genetic', choices=['genetic', 'recuit'],
+                    help="algorithm whose hyperparameters are tuned in tune mode")
+parser.add_argument("--configs", nargs='?', default=16, type=int,
+                    help="number of configurations raced in tune mode")
+parser.add_argument("--min-budget", nargs='?', default=200, type=int,
+                    help="trajectory evaluations given to each configuration in the first round of tune mode")
+parser.add_argument("--tables", nargs='+', default=['dna/table.json'],
+                    help="JSON tables or directories of tables for batch mode")
+parser.add_argument("--sequences", nargs='+', default=DEFAULT_SEQUENCES,
+                    help="FASTA files or directories of FASTA files for batch and corpus modes (.dnac corpora are"
+                         " also read by batch mode)")
+parser.add_argument("--windows", nargs='+', default=[200], type=int,
+                    help="window lengths (in bases) of cyclization mode")
+parser.add_argument("-o", "--output", nargs='?', default=None,
+                    help="report of batch mode (.csv or .jsonl, default: results/batch_scores.csv) or mutagenesis mode"
+                         " (default: results/mutagenesis.csv), cyclization mode (default: results/cyclization.csv)"
+                         " or corpus mode (default: results/corpus.dnac)")
+parser.add_argument("-w", "--workers", nargs='?', default=None, type=int,
+                    help="number of worker processes (default: number of cores)")
+parser.add_argument("--cache-dir", nargs='?', default=DEFAULT_DIR,
+                    help="directory of the trajectory cache")
+parser.add_argument("--cache-size", nargs='?', default=256, type=int,
+                    help="maximum size of the trajectory cache in MB")
+parser.add_argument("--no-cache", action='store_true',
+                    help="disable the trajectory cache")
+parser.add_argument("--store", nargs='?', default=DEFAULT_STORE,
+                    help="SQLite database where the runs of recuit, genetic and cmaes modes are recorded")
+parser.add_argument("--no-store", action='store_true',
+                    help="do not record the run in the results database")
+parser.add_argument("--listen", nargs='?', default=None,
+                    help="[host:]port where distributed evaluation workers connect (genetic and recuit modes, "
+                         "host 127.0.0.1 by default; 0.0.0.0 accepts workers from other machines)")
+parser.add_argument("--min-workers", nargs='?', default=1, type=int,
+                    help="number of workers to wait for before starting a distributed run")
+parser.add_argument("--coordinator", nargs='?', default="127.0.0.1:5555",
+                    help="host:port of the coordinator for worker mode")
+parser.add_argument("--run", nargs='?', default=None, type=int,
+                    help="run exported by export mode (default: best run for the -d sequence)")
 args = parser.parse_args()
 
+# Séquence par défaut, et séquences d'entraînement par défaut des modes recuit et cmaes
+DNA = "data/plasmid_8k.fasta"
+PLASMIDS = ("data/plasmid_8k.fasta", "data/plasmid_180k.fasta")
+if args.mode in ("recuit", "cmaes") or (args.mode == "tune" and args.tune_target == "recuit"):
+    dna_files = args.dna or list(PLASMIDS)
+else:
+    dna_files = args.dna or [DNA]
+if args.backend is not None and args.listen is not None:
+    parser.error("--backend and --listen both choose the evaluation engine")
+if args.weights is not None and len(args.weights) != len(dna_files):
+    parser.error("--weights needs one weight per -d sequence")
+if args.mode == "genetic" and args.steady_state:
+    # L'algorithme stationnaire n'a ni point de reprise, ni modèle de substitution, ni redémarrage
+    ignored = [flag for flag, value in (("--checkpoint", args.checkpoint), ("--resume", args.resume),
+                                        ("--surrogate", args.surrogate), ("--restart", args.restart))
+               if value is not None]
+    if ignored:
+        parser.error(f"{', '.join(ignored)} cannot be used with --steady-state")
+
 
 def main():
     """Fonction principale, qui redirige vers les fonctions de l'algorithme choisi"""
-    if args.mode == "recuit":
-        seqs = []
-        for filename in ("data/plasmid_8k.fasta", "data/plasmid_180k.fasta"):
-            lineList = [line.rstrip('\n') for line in open(filename)]
-            seq = ''.join(lineList[1:])
-            seqs.append(seq)
-        recuit_main(seqs, args.json, args.max_iters)
-    elif args.mode == "genetic":
-        lineList = [line.rstrip('\n') for line in open(args.dna)]
-        seq = ''.join(lineList[1:])
-        if args.stat:
-            stats(seq)
-        else:
-            genetic_main(seq, args.pop_size)
-    elif args.mode == "traditional":
-        lineList = [line.rstrip('\n') for line in open(args.dna)]
-        seq = ''.join(lineList[1:])
-        traditionnal_main(seq, args.dna, args.json)
+    cache = None if args.no_cache else TrajectoryCache(args.cache_dir, args.cache_size * 1024 * 1024)
+    budget = None
+    if args.max_time is not None or args.max_evals is not None or args.target is not None:
+        budget = Budget(args.max_time, args.max_evals, args.target)
+    warm_start = None if args.warm_start is None else args.warm_start or list(DEFAULT_PATHS)
+    checkpoint = None if args.checkpoint is None else Checkpointer(args.checkpoint, args.checkpoint_every)
+    progress = Progress(None if args.quiet else print_event, args.progress, args.progress_interval)
+    store = None
+    if not args.no_store and args.mode in ("recuit", "cmaes", "genetic"):
+        store = ResultStore(args.store)
+    backend = None
+    if args.listen is not None and args.mode in ("recuit", "genetic"):
+        backend = Coordinator(*parse_address(args.listen))
+        print(f"Waiting for {args.min_workers} worker(s) on {backend.address[0]}:{backend.address[1]}")
+        backend.wait_workers(args.min_workers)
+    # Plusieurs séquences ou des poids : les séquences d'un candidat sont évaluées en parallèle
+    workers = args.workers or min(len(dna_files), os.cpu_count())
+    evaluator = None
+    if args.backend is not None and args.mode in ("traditional", "recuit", "genetic"):
+        evaluator = make_evaluator(args.backend, args.workers)
+    objective = None
+    try:
+        if args.mode == "recuit":
+            seqs = [load_sequence(filename) for filename in dna_files]
+            recuit_main(seqs, args.json, args.max_iters, cache, budget, checkpoint, args.resume, warm_start,
+                        progress, store, backend, args.weights, args.normalize, workers, args.compress,
+                        args.schedule, args.tries, evaluator)
+        elif args.mode == "cmaes":
+            seqs = [load_sequence(filename) for filename in dna_files]
+            cmaes_main(seqs, args.json, args.max_evals or 20000, 10 if args.target is None else args.target,
+                       args.workers or 1, budget, progress, store)
+        elif args.mode == "genetic":
+            seqs = [load_sequence(filename) for filename in dna_files]
+            seq = seqs[0]
+            if len(seqs) > 1 or args.weights is not None or args.normalize or args.compress:
+                objective = Objective(seqs, args.weights, args.normalize, workers, cache, backend, args.compress,
+                                      evaluator)
+            # La moitié de la première génération au plus reprend des tables enregistrées
+            seeds = None if warm_start is None else seed_vectors(seq, max(1, args.pop_size // 2), warm_start)
+            start = time.monotonic()
+            if args.stat:
+                stats(seq)
+            elif args.steady_state:
+                if objective is not None:
+                    raise SystemExit("The steady-state algorithm optimizes a single sequence")
+                best = algo_genetique_stationnaire(seq, args.pop_size, workers=args.workers, cache=cache,
+                                                   budget=budget, seeds=seeds, progress=progress)
+                print(best.getData().getTable())
+                if store is not None:
+                    store.insert("steady-state", best.getData(), [seq], {"pop_size": args.pop_size},
+                                 time.monotonic() - start)
+            else:
+                surrogate = None if args.surrogate is None else Surrogate(args.surrogate)
+                best = genetic_main(seq, args.pop_size, cache=cache, surrogate=surrogate, budget=budget,
+                                    checkpoint=checkpoint, resume=args.resume, seeds=seeds, progress=progress,
+                                    backend=backend, objective=objective,
+                                    evaluator=None if objective is not None else evaluator, restart=args.restart)
+                print(best.getData().getTable())
+                if store is not None:
+                    store.insert("genetic", best.getData(), seqs,
+                                 {"pop_size": args.pop_size, "surrogate": args.surrogate, "restart": args.restart,
+                                  "weights": None if objective is None else objective.weights.tolist()},
+                                 time.monotonic() - start)
+        elif args.mode == "traditional":
+            for filename in dna_files:
+                traditionnal_main(load_sequence(filename), filename, args.json, cache, args.formats, evaluator)
+        elif args.mode == "tune":
+            if args.tune_target == "recuit":
+                seqs = [load_sequence(filename) for filename in dna_files]
+            else:
+                seqs = [load_sequence(dna_files[0])]
+            tune_main(args.tune_target, seqs, args.configs, args.min_budget, args.workers, progress=progress)
+        elif args.mode == "batch":
+            batch_main(args.tables, args.sequences, args.output or "results/batch_scores.csv", args.workers, cache)
+        elif args.mode == "export":
+            export_main(args.store, args.run, [load_sequence(filename) for filename in dna_files],
+                        args.output if args.output and args.output.endswith(".json") else None)
+        elif args.mode == "mutagenesis":
+            mutagenesis_main(dna_files[0], args.json, args.output)
+        elif args.mode == "cyclization":
+            cyclization_main(dna_files[0], args.json, args.windows, args.output, args.workers)
+        elif args.mode == "corpus":
+            corpus_main(args.sequences, args.output or DEFAULT_CORPUS)
+        elif args.mode == "worker":
+            worker_main(args.coordinator, args.sequences)
+    finally:
+        if objective is not None:
+            objective.close()
+        if evaluator is not None:
+            evaluator.close()
+        if backend is not None:
+            backend.close()
+        if store is not None:
+            store.close()
+        progress.close()
+        # Attend l'écriture du dernier point de reprise
+        if checkpoint is not None:
+            checkpoint.close()
 
 
 if __name__ == "__main__":
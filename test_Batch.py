@@ -0,0 +1,42 @@
+import csv
+import json
+from dna.Batch import batch_main, load_corpus
+from dna.RotTable import RotTable
+from dna.Sequence import encode, read_fasta, DINUCLEOTIDES
+from dna.Traj3D import Traj3D
+
+
+def test_encode():
+    assert list(encode("AACGT")) == [DINUCLEOTIDES.index(d) for d in ("AA", "AC", "CG", "GT")]
+    assert len(encode("A")) == 0
+
+
+def test_compute_endpoint():
+    seq = "ATCGGATTACAGGCTTAAC" * 20
+    traj, traj2 = Traj3D(), Traj3D()
+    traj.compute(seq, RotTable())
+    traj2.computeEndpoint(encode(seq), RotTable())
+    assert abs(traj.getDistance() - traj2.getDistance()) < 1e-8
+
+
+def test_read_fasta(tmp_path):
+    (tmp_path / "a.fasta").write_text(">s1 desc\nACGT\nAC\n>s2\nTTTT\n")
+    assert list(read_fasta(tmp_path / "a.fasta")) == [("s1", "ACGTAC"), ("s2", "TTTT")]
+    names, encoded = load_corpus([str(tmp_path)])
+    assert len(names) == 2 and len(encoded[0]) == 5
+
+
+def test_batch_main(tmp_path):
+    (tmp_path / "a.fasta").write_text(">s1\nACGTACGGA\n>s2\nTTTAAGC\n")
+    out = tmp_path / "scores.csv"
+    batch_main(["dna/table.json", "test_table.json"], [str(tmp_path)], str(out), 2)
+    rows = list(csv.DictReader(open(out)))
+    assert len(rows) == 4
+    traj = Traj3D()
+    traj.compute("TTTAAGC", RotTable("test_table.json"))
+    row = [r for r in rows if r["table"] == "test_table.json" and r["sequence"].endswith(":s2")][0]
+    assert abs(float(row["distance"]) - traj.getDistance()) < 1e-8
+
+    out = tmp_path / "scores.jsonl"
+    batch_main(["dna/table.json"], [str(tmp_path)], str(out), 1)
+    assert len([json.loads(line) for line in open(out)]) == 2
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from dna.Bounds import Bounds, default_bounds
+from dna.CleanJson import clean_table
+from dna.Genetic import Genetique, isInBounds
+from dna.RotTable import RotTable
+
+
+def test_check_and_projection():
+    bounds = Bounds(np.zeros(48), np.full(48, 2.0))
+    X = np.ones((3, 48))
+    X[1, 5] = 2.5
+    X[2, 0] = -5.5
+    assert bounds.contains(X).tolist() == [True, False, False]
+    assert bounds.violations(X)[1, 5] == 0.5 and bounds.violations(X)[2, 0] == 5.5
+    assert bounds.clip(X)[1, 5] == 2.0 and bounds.reflect(X)[1, 5] == 1.5
+    assert bounds.reflect(X)[2, 0] == 1.5  # -5.5 -> 5.5 (une réflexion) -> 1.5 (période 4)
+    repaired, outside = bounds.repair(X, "reflect")
+    assert outside.tolist() == [False, True, True] and bounds.contains(repaired).all()
+    assert np.array_equal(repaired[0], X[0])
+    assert np.allclose(bounds.slack(X[0]), 1.0)
+
+
+def test_is_in_bounds():
+    table = RotTable()
+    assert isInBounds(table.getTable())
+    low, high = default_bounds().low, default_bounds().high
+    table.setVector(np.where(high > low, high + 0.1, high))
+    assert not isInBounds(table.getTable())
+
+
+def test_population_repair():
+    pop = Genetique(6)
+    high = default_bounds().high
+    pop.population[2].data.setVector(high + 1)
+    assert pop.repair() == 1
+    assert all(isInBounds(ind.data.getTable()) for ind in pop.population)
+    assert np.array_equal(pop.population[2].data.getVector(), high)
+    assert pop.repair() == 0
+
+
+def test_clean_table():
+    table = RotTable("results/recuit_result_best_8k.json").getTable()
+    cleaned, _ = clean_table(table)
+    assert np.allclose([cleaned[di][3][0] for di in table], [table[di][3][0] for di in table])
+    table["AA"][0] = 50.0
+    with pytest.raises(ValueError):
+        clean_table(table)
+    cleaned, corrected = clean_table(table, repair="clip")
+    assert "AA" in corrected and cleaned["AA"][3][1] == 0.0
+
+
+def test_clean_json_script(tmp_path):
+    # Lancé comme script depuis un autre dossier, sans le dépôt dans PYTHONPATH
+    table = tmp_path / "table.json"
+    table.write_text(json.dumps(RotTable().getTable()))
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dna", "CleanJson.py")
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONPATH"}
+    result = subprocess.run([sys.executable, script, str(table)], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / "cleaned_table.json").exists()
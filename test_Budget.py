@@ -0,0 +1,31 @@
+from dna.Budget import Budget
+from dna.Genetic import algo_genetique
+from dna.Recuit import Recuit
+from dna.RotTable import RotTable
+
+
+def test_budget_limits():
+    budget = Budget(max_evals=10)
+    assert not budget.charge(5, 100)
+    assert budget.charge(5, 90)
+    assert budget.reason == "evaluations" and budget.report()["best"] == 90
+    budget = Budget(target=50)
+    assert not budget.charge(1, 60) and budget.charge(1, 40)
+    assert budget.reason == "target"
+    budget = Budget(max_time=0)
+    assert budget.charge(0) and budget.reason == "time"
+
+
+def test_recuit_budget():
+    budget = Budget(max_evals=20)
+    recuit = Recuit(["AGCTTAGGCA", "CGTAAGCT"], RotTable(), 1000, 0)
+    state = recuit.run(budget)
+    assert recuit.k == 10 and budget.evaluations == 20
+    assert state is recuit.best_state and recuit.best_e <= recuit.e
+
+
+def test_genetic_budget():
+    budget = Budget(max_evals=30)
+    ind = algo_genetique("AGCTTAGGCAAT", 10, True, budget=budget)
+    assert budget.reason == "evaluations" and budget.evaluations == 30
+    assert ind.getScore() <= budget.best
@@ -0,0 +1,32 @@
+import math
+import numpy as np
+from dna.CMAES import CMAES
+from dna.RotTable import RotTable
+from dna.Traj3D import Traj3D, step_matrices
+
+
+def test_step_matrices():
+    rot = RotTable("results/recuit_result_best_8k.json")
+    assert np.allclose(step_matrices(rot.getVector().reshape(16, 3)), Traj3D().stepMatrices(rot))
+
+
+def test_cmaes_improves_in_bounds():
+    seqs = ["ATCGGATTACAGGCTTAACGGATCCATGCA" * 5, "GGATCCATTTAAACG" * 8]
+    cmaes = CMAES(seqs, RotTable(), max_evals=400, target=0, seed=1)
+    state = cmaes.run()
+    start = CMAES(seqs, RotTable(), max_evals=0, target=0)
+    start.run()
+    assert cmaes.evals >= 400
+    assert cmaes.e < start.e
+    low, high = RotTable().getBounds()
+    v = state.getVector()
+    assert np.all(v >= low - 1e-9) and np.all(v <= high + 1e-9)
+    # Les marges écrites sont cohérentes avec les bornes d'origine
+    low2, high2 = state.getBounds()
+    assert np.allclose(low, low2) and np.allclose(high, high2)
+    energy = 0
+    for seq in seqs:
+        traj = Traj3D()
+        traj.compute(seq, state)
+        energy += traj.energy()
+    assert math.isclose(energy, cmaes.e, rel_tol=1e-6)
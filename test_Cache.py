@@ -0,0 +1,69 @@
+import os
+import random
+import numpy as np
+from dna.Cache import TrajectoryCache
+from dna.Genetic import algo_genetique
+from dna.Objective import Objective
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Traj3D import Traj3D
+
+
+def test_endpoint_cached(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    seq = "ATCGGATTACAGGCTTAAC"
+    traj = Traj3D()
+    traj.compute(seq, RotTable())
+    p1 = cache.endpoint(encode(seq), RotTable())
+    p2 = cache.endpoint(encode(seq), RotTable())
+    assert cache.misses == 1 and cache.hits == 1
+    assert np.allclose(p1, traj.getTraj()[-1][:3]) and np.array_equal(p1, p2)
+    # Une autre table donne une autre clé
+    assert cache.key(encode(seq), RotTable()) != cache.key(encode(seq), RotTable("test_table.json"))
+
+
+def test_trajectory_cached(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    seq = "ATCGGATTACAGGCTTAAC"
+    traj = cache.trajectory(seq, encode(seq), RotTable())
+    traj2 = cache.trajectory(seq, encode(seq), RotTable())
+    assert cache.hits == 1
+    assert np.allclose(traj.getCoordinates(), traj2.getCoordinates())
+    assert traj.getDistance() == traj2.getDistance()
+
+
+def test_lru_eviction(tmp_path):
+    cache = TrajectoryCache(str(tmp_path), max_bytes=2000)
+    for i in range(20):
+        cache.put(f"k{i}", "end", np.array([i, 0.0, 0.0]))
+        os.utime(cache._path(f"k{i}", "end"), (i, i))
+    assert cache.size <= 2000
+    assert cache.get("k19", "end")[0] == 19
+    assert cache.get("k0", "end") is None
+
+
+def test_objective_caches_only_retained_states(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    seqs = ["ATCGGATTACAGGCTTAAC", "CGTAAGCTTTAGCA"]
+    objective = Objective(seqs, cache=cache)
+    objective.energy(RotTable())  # Proposition : jamais mise en cache
+    assert cache.misses == cache.hits == 0
+    traj = Traj3D()
+    expected = []
+    for seq in seqs:
+        traj.compute(seq, RotTable())
+        expected.append(traj.getDistance())
+    assert np.allclose(objective.distances(RotTable()), expected) and cache.misses == 2
+    assert np.allclose(objective.distances(RotTable()), expected) and cache.hits == 2
+
+
+def test_genetic_final_trajectory_cached(tmp_path):
+    cache = TrajectoryCache(str(tmp_path))
+    seq = "ATCGGATTACAGGCTTAACGGATCC"
+    for run in range(2):
+        random.seed(0)
+        best = algo_genetique(seq, 6, True, max_generations=3, cache=cache)
+        # Seule la trajectoire finale passe par le cache : calculée au premier lancement, relue au second
+        assert (cache.misses, cache.hits) == (1, run)
+        assert len(best.getTraj().getTraj()) == len(seq)
+        assert np.isclose(np.linalg.norm(best.getLastPoint()), best.getScore())
@@ -0,0 +1,47 @@
+import random
+import numpy as np
+from dna.Checkpoint import Checkpointer, load, rng_restore, rng_snapshot
+from dna.Genetic import algo_genetique
+from dna.Recuit import Recuit
+from dna.RotTable import RotTable
+
+
+def test_rng_roundtrip():
+    random.seed(3)
+    np.random.seed(3)
+    state = rng_snapshot()
+    a = random.random(), random.gauss(0, 1), np.random.rand()
+    rng_restore(state)
+    assert (random.random(), random.gauss(0, 1), np.random.rand()) == a
+
+
+def test_genetic_resume(tmp_path):
+    seq = "AGCTTAGGCAATCGGA"
+    random.seed(0)
+    straight = algo_genetique(seq, 10, True, max_generations=6)
+    path = str(tmp_path / "genetic.npz")
+    random.seed(0)
+    with Checkpointer(path, every=3) as checkpoint:
+        algo_genetique(seq, 10, True, max_generations=3, checkpoint=checkpoint)
+    random.seed(42)  # La reprise ne dépend pas de l'état courant des générateurs
+    resumed = algo_genetique(seq, 10, True, max_generations=6, resume=path)
+    assert resumed.getScore() == straight.getScore()
+    assert np.array_equal(resumed.getData().getVector(), straight.getData().getVector())
+    assert len(resumed.getTraj().getTraj()) == len(seq)
+
+
+def test_recuit_resume(tmp_path):
+    seqs = ["AGCTTAGGCA", "CGTAAGCT"]
+    random.seed(0)
+    straight = Recuit(seqs, RotTable(), 40, 0)
+    straight.run()
+    path = str(tmp_path / "recuit.npz")
+    random.seed(0)
+    with Checkpointer(path, every=20) as checkpoint:
+        Recuit(seqs, RotTable(), 20, 0).run(checkpoint=checkpoint)
+    resumed = Recuit(seqs, RotTable(), 40, 0)
+    resumed.restore(load(path))
+    assert resumed.k == 20
+    resumed.run()
+    assert resumed.best_e == straight.best_e and resumed.temp == straight.temp
+    assert resumed.best_state.getTable() == straight.best_state.getTable()
@@ -0,0 +1,80 @@
+import csv
+import numpy as np
+import pytest
+from dna.Batch import DEFAULT_SEQUENCES, batch_main, load_corpus
+from dna.Corpus import DEFAULT_CORPUS, Corpus, build, corpus_main, pack
+from dna.RotTable import RotTable
+from dna.Sequence import encode, load_sequence, read_fasta
+from dna.Traj3D import Traj3D
+
+
+def _fasta(path, records):
+    path.write_text("".join(f">{name} description\n{seq[:30]}\n{seq[30:]}\n" for name, seq in records))
+    return str(path)
+
+
+def test_pack_runs():
+    packed, runs = pack("ACGTNNNAcgtRYNa")
+    assert len(packed) == 4
+    assert runs.tolist() == [[4, 3, ord("N")], [11, 1, ord("R")], [12, 1, ord("Y")], [13, 1, ord("N")]]
+
+
+def test_corpus_round_trip(tmp_path):
+    rng = np.random.default_rng(0)
+    long = "".join(rng.choice(list("ACGT"), 1001))
+    ambiguous = "ACGTTGCA" + "N" * 13 + "GATTACA" + "RYK" + "ACGTAC"
+    (tmp_path / "fasta").mkdir()
+    _fasta(tmp_path / "fasta" / "a.fasta", [("long", long), ("ambiguous", ambiguous)])
+    _fasta(tmp_path / "fasta" / "b.fa", [("short", "ACG")])
+    output = corpus_main([str(tmp_path / "fasta")], str(tmp_path / "c.dnac"))
+    with Corpus(output) as corpus:
+        assert len(corpus) == 3 and corpus.names()[0].endswith("a.fasta:long")
+        assert corpus.sequence(0) == long and corpus.sequence(1) == ambiguous and corpus.sequence(2) == "ACG"
+        assert np.array_equal(corpus.encoded(0), encode(long))
+        for start, stop in ((0, 1), (3, 17), (5, 6), (998, 1001), (401, 800)):
+            assert corpus.sequence(0, start, stop) == long[start:stop]
+            assert np.array_equal(corpus.encoded(0, start, stop), encode(long[start:stop]))
+        assert corpus.sequence(1, 10, 30) == ambiguous[10:30]
+        assert np.array_equal(corpus.encoded(1, 21, 28), encode(ambiguous[21:28]))
+        with pytest.raises(ValueError):
+            corpus.encoded(1)
+        with pytest.raises(KeyError):
+            corpus.record("missing")
+    # Le corpus remplace les fichiers FASTA partout où une séquence est lue
+    assert load_sequence(output) == long
+    assert load_sequence(output + ":" + str(tmp_path / "fasta" / "b.fa") + ":short") == "ACG"
+    build([str(tmp_path / "fasta" / "b.fa")], str(tmp_path / "b.dnac"))
+    names, encoded = load_corpus([str(tmp_path / "fasta" / "b.fa"), str(tmp_path / "b.dnac")])
+    assert names[0] == names[-1] and np.array_equal(encoded[0], encoded[-1])
+
+
+def test_corpus_of_plasmids(tmp_path):
+    build(["data"], str(tmp_path / "plasmids.dnac"))
+    with Corpus(str(tmp_path / "plasmids.dnac")) as corpus:
+        for name in corpus.names():
+            filename, record = name.rsplit(":", 1)
+            assert corpus.sequence(name) == dict(read_fasta(filename))[record].upper()
+
+
+def test_batch_directory_with_corpus(tmp_path):
+    # Un dossier de --sequences peut contenir des corpus, lus comme les fichiers FASTA
+    _fasta(tmp_path / "a.fasta", [("s1", "ACGTACGGATTAC" * 3), ("s2", "TTTAAGCAGG" * 4)])
+    (tmp_path / "corpora").mkdir()
+    build([str(tmp_path / "a.fasta")], str(tmp_path / "corpora" / "a.dnac"))
+    out = tmp_path / "scores.csv"
+    batch_main(["test_table.json"], [str(tmp_path / "corpora")], str(out), 1)
+    rows = list(csv.DictReader(open(out)))
+    assert [row["sequence"].rsplit(":", 1)[1] for row in rows] == ["s1", "s2"]
+    traj = Traj3D()
+    traj.compute("TTTAAGCAGG" * 4, RotTable("test_table.json"))
+    assert abs(float(rows[1]["distance"]) - traj.getDistance()) < 1e-8
+
+
+def test_default_corpus_not_read_twice(tmp_path, monkeypatch):
+    # -m corpus puis -m batch avec les chemins par défaut : chaque séquence n'est lue qu'une fois
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    _fasta(tmp_path / "data" / "a.fasta", [("s1", "ACGTACGGATTAC" * 3), ("s2", "TTTAAGCAGG" * 4)])
+    corpus_main(DEFAULT_SEQUENCES, DEFAULT_CORPUS)
+    names, _ = load_corpus(DEFAULT_SEQUENCES)
+    assert len(names) == len(set(names)) == 2
@@ -0,0 +1,41 @@
+import csv
+import numpy as np
+import pytest
+from dna.Cyclization import cyclization_main, rigid_inverse, scan
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Traj3D import Traj3D, product
+
+
+def _window(seq, rot_table):
+    transform = product(Traj3D().stepMatrices(rot_table)[encode(seq)])
+    return np.linalg.norm(transform[:3, 3]), np.degrees(np.arccos(np.clip(transform[2, 2], -1, 1)))
+
+
+def test_rigid_inverse():
+    steps = Traj3D().stepMatrices(RotTable())
+    assert np.allclose(rigid_inverse(steps), np.linalg.inv(steps))
+
+
+def test_scan_matches_windows():
+    rot_table = RotTable("test_table.json")
+    seq = "".join(np.random.default_rng(0).choice(list("ACGT"), 90))
+    for workers in (1, 2):
+        rows = {}
+        for length, starts, distances, angles in scan(seq, rot_table, [12, 2, 40, 95], chunk=16, workers=workers):
+            for start, distance, angle in zip(starts, distances, angles):
+                rows[length, int(start)] = distance, angle
+        assert len(rows) == (90 - 11) + (90 - 1) + (90 - 39)
+        for (length, start), (distance, angle) in rows.items():
+            assert np.allclose((distance, angle), _window(seq[start:start + length], rot_table))
+    with pytest.raises(ValueError):
+        next(scan(seq, rot_table, [1]))
+
+
+def test_cyclization_main(tmp_path, capsys):
+    (tmp_path / "s.fasta").write_text(">s\nACGTTGCAAGGTACCATGA\n")
+    output = cyclization_main(str(tmp_path / "s.fasta"), "dna/table.json", [10], str(tmp_path / "c.csv"), 1)
+    rows = list(csv.DictReader(open(output)))
+    assert len(rows) == 10 and rows[3]["start"] == "3"
+    assert np.isclose(float(rows[3]["distance"]), _window("ACGTTGCAAGGTACCATGA"[3:13], RotTable())[0])
+    assert "Length 10: best window" in capsys.readouterr().out
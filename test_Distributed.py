@@ -0,0 +1,110 @@
+import json
+import multiprocessing
+import random
+import socket
+import time
+import numpy as np
+import pytest
+from dna.Distributed import HEADER, Coordinator, Worker, endpoints, parse_address, receive_message, send_message
+from dna.Store import sequence_hash
+from dna.Genetic import algo_genetique
+from dna.Recuit import Recuit
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+
+SEQS = ["AGCTTAGGCAATCGGATTACGA", "CGTAAGCTTTAGCA"]
+
+
+def _worker(port, fail_after=None):
+    Worker(SEQS, fail_after).run("127.0.0.1", port)
+
+
+def _start(port, fail_after=None):
+    process = multiprocessing.Process(target=_worker, args=(port, fail_after), daemon=True)
+    process.start()
+    return process
+
+
+def test_evaluate_and_requeue():
+    vectors = RotTable().getVector() + np.random.default_rng(0).normal(0, 0.5, (20, 48))
+    with Coordinator("127.0.0.1", 0, batch_size=4, job_timeout=30) as coordinator:
+        port = coordinator.address[1]
+        # Le premier worker coupe la connexion au deuxième lot : son lot est remis en file
+        failing = _start(port, fail_after=1)
+        assert coordinator.wait_workers(1, timeout=30)
+        pending = coordinator.submit(vectors, SEQS[0])
+        failing.join(30)
+        healthy = _start(port)
+        points = pending.result(timeout=60)
+        assert coordinator.requeued >= 1 and coordinator.lost >= 1
+        assert np.allclose(points, endpoints(vectors, encode(SEQS[0])))
+        assert np.allclose(coordinator.evaluate(vectors[:3], SEQS[1], timeout=60),
+                           endpoints(vectors[:3], encode(SEQS[1])))
+    healthy.join(30)
+    assert healthy.exitcode == 0
+
+
+def test_optimizers_with_backend():
+    with Coordinator("127.0.0.1", 0) as coordinator:
+        worker = _start(coordinator.address[1])
+        assert coordinator.wait_workers(1, timeout=30)
+        random.seed(0)
+        best = algo_genetique(SEQS[0], 6, max_generations=3, backend=coordinator)
+        assert best.getScore() < float("inf")
+        recuit = Recuit(SEQS, RotTable(), 5, 10, backend=coordinator)
+        assert np.isclose(recuit.e, Recuit(SEQS, RotTable(), 5, 10).e)
+    worker.join(30)
+
+
+def test_parse_address():
+    assert parse_address("5555") == ("127.0.0.1", 5555)
+    assert parse_address("node1:6000", "0.0.0.0") == ("node1", 6000)
+
+
+def test_default_host_is_local():
+    with Coordinator() as coordinator:
+        assert coordinator.address[0] == "127.0.0.1"
+
+
+def test_close_and_orphans_fail_pending():
+    vectors = RotTable().getVector()[None]
+    with Coordinator(orphan_timeout=0.2) as coordinator:
+        # Aucun worker ne possède la séquence : l'appel échoue au lieu d'attendre
+        start = time.monotonic()
+        with pytest.raises(ConnectionError):
+            coordinator.evaluate(vectors, SEQS[0], timeout=30)
+        assert time.monotonic() - start < 10
+    coordinator = Coordinator(orphan_timeout=60)
+    pending = coordinator.submit(vectors, SEQS[0])
+    coordinator.close()
+    with pytest.raises(ConnectionError):
+        pending.result(timeout=5)
+    with Coordinator() as coordinator, pytest.raises(TimeoutError):
+        coordinator.submit(vectors, SEQS[0]).result(timeout=0.1)
+
+
+def _raw_header(sock, header):
+    data = json.dumps(header).encode()
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def test_malformed_messages_are_requeued():
+    vectors = RotTable().getVector() + np.random.default_rng(1).normal(0, 0.5, (4, 48))
+    with Coordinator("127.0.0.1", 0, batch_size=4, job_timeout=30) as coordinator:
+        host, port = coordinator.address
+        # Inscription sans liste de séquences : le worker est rejeté, le coordinateur continue
+        with socket.create_connection((host, port)) as sock:
+            _raw_header(sock, {"type": "register"})
+            assert sock.recv(1) == b""
+        pending = coordinator.submit(vectors, SEQS[0])
+        for reply in ({"type": "result", "count": 4},                # Sans charge utile
+                      {"type": "result", "count": 4, "size": 1 << 40}):  # Taille annoncée démesurée
+            with socket.create_connection((host, port)) as sock:
+                send_message(sock, {"type": "register", "sequences": [sequence_hash(SEQS[0])]})
+                header, _ = receive_message(sock)
+                _raw_header(sock, dict(reply, job=header["job"]))
+                assert sock.recv(1) == b""
+        assert coordinator.requeued == 2 and coordinator.lost == 3
+        worker = _start(port)
+        assert np.allclose(pending.result(timeout=60), endpoints(vectors, encode(SEQS[0])))
+    worker.join(30)
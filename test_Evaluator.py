@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from dna.Evaluator import BACKENDS, BatchEvaluator, GrammarEvaluator, PoolEvaluator, make_evaluator
+from dna.Genetic import algo_genetique
+from dna.Objective import Objective
+from dna.RotTable import RotTable
+from dna.Traj3D import Traj3D
+
+SEQS = ["AGCTTAGGCAATCGGATTACGA" * 5, "CGTAAGCTTTAGCA", "A"]
+
+
+def _distances(vectors, seqs):
+    traj, rot_table = Traj3D(), RotTable()
+    distances = np.empty((len(vectors), len(seqs)))
+    for b, vector in enumerate(vectors):
+        rot_table.setVector(vector)
+        for s, seq in enumerate(seqs):
+            traj.compute(seq, rot_table)
+            distances[b, s] = traj.getDistance()
+    return distances
+
+
+def test_backends_agree():
+    vectors = RotTable().getVector() + np.random.default_rng(0).normal(0, 0.3, (4, 48))
+    expected = _distances(vectors, SEQS)
+    for name in BACKENDS:
+        with make_evaluator(name, workers=2) as evaluator:
+            assert np.allclose(evaluator.score(vectors, SEQS), expected)
+            assert evaluator.endpoints(vectors, SEQS).shape == (4, len(SEQS), 3)
+    assert np.allclose(GrammarEvaluator().score(vectors, SEQS), expected)
+    # Blocs plus petits que la population et que la séquence
+    assert np.allclose(BatchEvaluator(block=3).score(vectors, SEQS), expected)
+    with pytest.raises(ValueError):
+        make_evaluator("gpu")
+
+
+def test_pool_new_sequences():
+    vectors = RotTable().getVector()[None]
+    with PoolEvaluator(2) as evaluator:
+        first = evaluator.score(vectors, SEQS[:1])
+        # Une séquence inconnue redémarre les processus avec toutes les séquences
+        both = evaluator.score(vectors, SEQS[1::-1])
+        assert np.allclose(both[:, 1], first[:, 0]) and np.allclose(both, _distances(vectors, SEQS[1::-1]))
+    assert evaluator._pool is None
+
+
+def test_optimizers_with_evaluator():
+    with Objective(SEQS[:2], evaluator=make_evaluator("batch")) as objective:
+        assert np.isclose(objective.energy(RotTable()), np.sum(_distances(RotTable().getVector()[None], SEQS[:2]) ** 2))
+    best = algo_genetique(SEQS[0], 6, istest=True, max_generations=3, evaluator=make_evaluator("numpy"))
+    traj = Traj3D()
+    traj.compute(SEQS[0], best.getData())
+    assert np.isclose(best.score, traj.getDistance())
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+from dna.Export import export_trajectory, pdb_coordinate
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Traditionnal import traditionnal_main
+from dna.Traj3D import Traj3D, prefix_products, product, trajectory_chunks
+
+
+def _reference(seq, rot_table):
+    traj = Traj3D()
+    traj.compute(seq, rot_table)
+    return traj.getCoordinates()
+
+
+def test_trajectory_chunks():
+    rng = np.random.default_rng(0)
+    rot_table = RotTable("test_table.json")
+    steps = Traj3D().stepMatrices(rot_table)
+    seq = "".join(rng.choice(list("ACGT"), 101))
+    encoded = encode(seq)
+    prefixes = prefix_products(steps[encoded[:37]])
+    assert np.allclose(prefixes[-1], product(steps[encoded[:37]])) and np.allclose(prefixes[0], steps[encoded[0]])
+    for chunk in (1, 7, 64, 1000):
+        points = np.concatenate(list(trajectory_chunks(encoded, steps, chunk)))
+        assert np.allclose(points, _reference(seq, rot_table))
+    assert np.allclose(np.concatenate(list(trajectory_chunks(encode("A"), steps))), [[0, 0, 0]])
+
+
+def test_export_formats(tmp_path):
+    rng = np.random.default_rng(1)
+    rot_table = RotTable()
+    seq = "".join(rng.choice(list("ACGT"), 250))
+    reference = _reference(seq, rot_table)
+    distance = export_trajectory(seq, rot_table, str(tmp_path / "t.npz"), "npz", chunk=16)
+    assert np.isclose(distance, np.linalg.norm(reference[-1]))
+    assert np.allclose(np.load(tmp_path / "t.npz")["coordinates"], reference)
+
+    export_trajectory(seq, rot_table, str(tmp_path / "t.xyz"), "xyz", chunk=16)
+    lines = (tmp_path / "t.xyz").read_text().splitlines()
+    assert int(lines[0]) == len(seq) and len(lines) == len(seq) + 2
+    assert "".join(line.split()[0] for line in lines[2:]) == seq
+    assert np.allclose([[float(v) for v in line.split()[1:]] for line in lines[2:]], reference, atol=1e-4)
+
+    export_trajectory(seq, rot_table, str(tmp_path / "t.pdb"), "pdb", chunk=16)
+    atoms = [line for line in (tmp_path / "t.pdb").read_text().splitlines() if line.startswith("ATOM")]
+    assert len(atoms) == len(seq) and all(len(line) == 78 for line in atoms)
+    assert atoms[3][17:20] == " D" + seq[3]
+    xyz = [[float(line[30:38]), float(line[38:46]), float(line[46:54])] for line in atoms]
+    assert np.allclose(xyz, reference, atol=1e-3)
+
+    with pytest.raises(ValueError):
+        export_trajectory(seq, rot_table, str(tmp_path / "t.csv"), "csv")
+
+
+def test_pdb_coordinate():
+    assert pdb_coordinate(-12.5) == " -12.500"
+    assert pdb_coordinate(123456.789) == "123456.8" and len(pdb_coordinate(-9876543.2)) == 8
+    with pytest.raises(ValueError):
+        pdb_coordinate(1e9)
+
+
+def test_traditional_formats(tmp_path, capsys):
+    (tmp_path / "s.fasta").write_text(">s\nACGTTGCAAGGT\n")
+    traditionnal_main("ACGTTGCAAGGT", str(tmp_path / "s.fasta"), "dna/table.json", formats=("npz", "pdb"))
+    assert (tmp_path / "s.fasta.npz").exists() and (tmp_path / "s.fasta.pdb").exists()
+    assert not (tmp_path / "s.fasta.png").exists()
+    assert "Distance:" in capsys.readouterr().out
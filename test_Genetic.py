@@ -3,6 +3,8 @@ from dna.Genetic import *
 from dna.RotTable import *
 from dna.Traj3D import *
 from unittest.mock import patch
+from dna.Bounds import default_bounds
+from dna.Progress import Progress
 
 # ====== TESTS POUR LA CLASSE Individu ======
 
@@ -198,3 +200,77 @@ def test_croisement_n_point_population():
 def test_algo_genetique():
     ind = algo_genetique("AA",10,True)
     assert isInBounds(ind.getData().getTable())
+
+def test_croiser():
+    genetique = Genetique(2)
+    parent1, parent2 = genetique.population
+    child1, child2 = genetique.croiser(parent1, parent2, 2)
+    for di in parent1.data.getTable():
+        genes = {tuple(child1.data.getTable()[di][:3]), tuple(child2.data.getTable()[di][:3])}
+        assert genes == {tuple(parent1.data.getTable()[di][:3]), tuple(parent2.data.getTable()[di][:3])}
+
+
+def test_diversite():
+    genetique = Genetique(30)
+    X = np.array([ind.data.getVector() for ind in genetique.population])
+    metrics = genetique.diversity()
+    assert metrics["unique"] == 30 and 0.2 < metrics["mean_distance"] < 0.6
+    clones = diversite(np.repeat(X[:1], 5, axis=0))
+    assert clones == {"mean_distance": 0.0, "unique": 1}
+    # Distance moyenne calculée deux à deux directement
+    Z = X[:4] / np.where(default_bounds().width > 0, default_bounds().width, 1)
+    pairs = [np.linalg.norm(Z[i] - Z[j]) for i in range(4) for j in range(i + 1, 4)]
+    assert np.isclose(diversite(X[:4])["mean_distance"], np.mean(pairs) / np.sqrt(48))
+
+
+def test_restart():
+    genetique = Genetique(20)
+    genetique.refresh_score("ATCGGATTACAGG")
+    best = min(genetique.population, key=lambda x: x.score)
+    genetique.population = [best.copy() for _ in range(20)]
+    assert genetique.diversity()["unique"] == 1
+    replaced = genetique.restart(elite=0.1, scale=0.5)
+    assert replaced == list(range(2, 20)) and genetique.restarts == 1
+    assert genetique.population[0].data.getTable() == best.data.getTable()
+    assert genetique.diversity()["unique"] == 19
+    assert all(isInBounds(ind.getData().getTable()) for ind in genetique.population)
+
+
+def test_algo_genetique_restart():
+    events = []
+    random.seed(3)
+    progress = Progress(events.append, None, 0)
+    ind = algo_genetique("ATCGGATTACAGGCTTAACGT", 10, True, max_generations=30, restart=1.0, progress=progress)
+    generations = [e for e in events if "diversity" in e]
+    assert generations[-1]["restarts"] > 0 and all("unique" in e for e in generations)
+    assert isInBounds(ind.getData().getTable())
+    # Seuil de génomes distincts : redémarrage avec moins de la moitié, pas avec exactement la moitié
+    for missing, restarted in ((0, False), (1, True)):
+        diversity = lambda self: {"mean_distance": 1.0, "unique": len(self.population) // 2 - missing}
+        with patch.object(Genetique, "diversity", diversity):
+            random.seed(3)
+            events = []
+            algo_genetique("ATCGGATTACAGGCTTAACGT", 10, True, max_generations=30, restart=0.0,
+                           restart_patience=1, progress=Progress(events.append, None, 0))
+        generations = [e for e in events if "diversity" in e]
+        assert any(e["stagnation"] > 0 for e in generations)
+        assert (generations[-1]["restarts"] > 0) == restarted
+
+
+def test_restart_extends_run():
+    # Un redémarrage remet le compteur de stagnation à 0 : le lancement dure plus longtemps,
+    # dans la limite de max_restarts redémarrages
+    runs = []
+    for restart in (None, 1.0):
+        events = []
+        random.seed(5)
+        algo_genetique("ATCGGATTACAGGCTTAACGT", 10, True, restart=restart, restart_patience=5, max_restarts=2,
+                       progress=Progress(events.append, None, 0))
+        runs.append([e for e in events if "diversity" in e])
+    plain, restarted = runs
+    assert plain[-1]["restarts"] == 0 and restarted[-1]["restarts"] == 2
+    assert len(restarted) > len(plain)
+    # Jamais avant restart_patience générations sans amélioration
+    for previous, event in zip(restarted, restarted[1:]):
+        if event["restarts"] > previous["restarts"]:
+            assert previous["stagnation"] >= 4 and event["stagnation"] == 0
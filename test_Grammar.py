@@ -0,0 +1,48 @@
+import numpy as np
+from dna.Evaluator import GrammarEvaluator, PoolEvaluator
+from dna.Grammar import Grammar
+from dna.Objective import Objective
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Traj3D import Traj3D, product, step_matrices
+
+
+def test_transform_matches_product():
+    rng = np.random.default_rng(0)
+    repeat = "".join(rng.choice(list("ACGT"), 40))
+    seq = "".join(rng.choice(list("ACGT"), 30)) + repeat * 12 + "AAAAAAAAAA" + repeat
+    encoded = encode(seq)
+    grammar = Grammar(encoded)
+    assert grammar.rules() > 0 and grammar.ratio() > 2
+    report = grammar.report()
+    assert report["compressed"] == len(grammar.sequence) and report["length"] == len(encoded)
+    steps = Traj3D().stepMatrices(RotTable())
+    assert np.allclose(grammar.transform(steps), product(steps[encoded]))
+    traj = Traj3D()
+    traj.compute(seq, RotTable())
+    assert np.allclose(grammar.endpoint(RotTable()), traj.getCoordinates()[-1])
+    # Plusieurs tables à la fois
+    vectors = RotTable().getVector() + rng.normal(0, 0.5, (3, 48))
+    batch = step_matrices(vectors.reshape(3, 16, 3))
+    assert np.allclose(grammar.transform(batch), [product(s[encoded]) for s in batch])
+
+
+def test_short_sequences():
+    steps = Traj3D().stepMatrices(RotTable())
+    for seq in ("A", "AC", "ACGTA"):
+        grammar = Grammar.fromSequence(seq)
+        assert grammar.rules() == 0
+        assert np.allclose(grammar.transform(steps), product(steps[encode(seq)]))
+
+
+def test_objective_compress():
+    seqs = ["ATCGGATTACAGGCTTAAC" * 20, "CGTAAGCTTTAGCA"]
+    vectors = RotTable().getVector() + np.random.default_rng(1).normal(0, 0.3, (4, 48))
+    compressed = Objective(seqs, [1, 2], compress=True)
+    assert np.allclose(compressed.energies(vectors), Objective(seqs, [1, 2]).energies(vectors))
+    assert np.isclose(compressed.energy(RotTable()), Objective(seqs, [1, 2]).energy(RotTable()))
+    # compress prime sur les processus de calcul (plusieurs séquences : workers > 1 par défaut dans __main__)
+    with Objective(seqs, workers=2, compress=True) as objective:
+        assert isinstance(objective.evaluator, GrammarEvaluator)
+    with Objective(seqs, workers=2) as objective:
+        assert isinstance(objective.evaluator, PoolEvaluator)
@@ -0,0 +1,58 @@
+import csv
+import numpy as np
+from dna.Mutagenesis import SegmentTree, mutagenesis_main, mutant_transform, scan
+from dna.RotTable import RotTable
+from dna.Sequence import BASES, encode
+from dna.Traj3D import Traj3D, product
+
+
+def _distance(seq, rot_table):
+    traj = Traj3D()
+    traj.computeEndpoint(encode(seq), rot_table)
+    return traj.getDistance()
+
+
+def test_segment_tree():
+    rng = np.random.default_rng(0)
+    steps = Traj3D().stepMatrices(RotTable())
+    encoded = encode("".join(rng.choice(list("ACGT"), 38)))
+    tree = SegmentTree(steps[encoded])
+    n = len(encoded)
+    assert np.allclose(tree.total(), product(steps[encoded]))
+    assert np.allclose(tree.query(5, 23), product(steps[encoded[5:23]]))
+    prefixes, suffixes = tree.prefixes(), tree.suffixes()
+    for k in (0, 1, 16, 31, n):
+        assert np.allclose(prefixes[k], product(steps[encoded[:k]]))
+        assert np.allclose(suffixes[k], product(steps[encoded[k:]]))
+    modified = encoded.copy()
+    modified[10] = 3
+    tree.update(10, steps[3])
+    assert np.allclose(tree.total(), product(steps[modified]))
+
+
+def test_scan_matches_full_evaluation():
+    rot_table = RotTable("test_table.json")
+    rng = np.random.default_rng(1)
+    for length in (1, 2, 9, 40):
+        seq = "".join(rng.choice(list("ACGT"), length))
+        chunks = list(scan(seq, rot_table, chunk=7))
+        positions, reference, alternative, distances = (np.concatenate(c) for c in zip(*chunks))
+        assert len(distances) == 3 * length
+        for p, r, a, d in zip(positions, reference, alternative, distances):
+            assert BASES[r] == seq[p] and a != r
+            mutant = seq[:p] + BASES[a] + seq[p + 1:]
+            assert np.isclose(d, _distance(mutant, rot_table))
+    encoded = encode(seq)
+    steps = Traj3D().stepMatrices(rot_table)
+    mutant = seq[:12] + "T" + seq[13:] if seq[12] != "T" else seq[:12] + "A" + seq[13:]
+    transform = mutant_transform(SegmentTree(steps[encoded]), steps, encoded, 12, BASES.index(mutant[12]))
+    assert np.allclose(transform, product(steps[encode(mutant)]))
+
+
+def test_mutagenesis_main(tmp_path):
+    (tmp_path / "s.fasta").write_text(">s\nACGTTGCAAG\n")
+    output = mutagenesis_main(str(tmp_path / "s.fasta"), "dna/table.json", str(tmp_path / "scan.csv"))
+    rows = list(csv.DictReader(open(output)))
+    assert len(rows) == 30
+    reference = _distance("ACGTTGCAAG", RotTable())
+    assert np.isclose(float(rows[4]["distance"]) - reference, float(rows[4]["delta"]))
@@ -0,0 +1,57 @@
+import math
+import random
+import numpy as np
+import pytest
+from dna.Genetic import algo_genetique
+from dna.Objective import Objective
+from dna.Recuit import Recuit
+from dna.RotTable import RotTable
+from dna.Traj3D import Traj3D
+
+SEQS = ["CGTAAGCTTTAGCA", "AGCTTAGGCAATCGGATTACGA" * 4, "ATCGGATTACAGG"]
+
+
+def _distances(rot_table):
+    traj = Traj3D()
+    distances = []
+    for seq in SEQS:
+        traj.compute(seq, rot_table)
+        distances.append(traj.getDistance())
+    return np.array(distances)
+
+
+def test_weights_and_normalization():
+    rot_table = RotTable()
+    d = _distances(rot_table)
+    assert np.isclose(Objective(SEQS).energy(rot_table), np.sum(d ** 2))
+    assert np.isclose(Objective(SEQS, [1, 0.5, 2]).energy(rot_table), d @ (d * [1, 0.5, 2]))
+    lengths = np.array([len(seq) for seq in SEQS])
+    normalized = Objective(SEQS, normalize=True)
+    assert np.isclose(normalized.energy(rot_table), np.sum((d * lengths.mean() / lengths) ** 2))
+    # La plus longue séquence est évaluée en premier
+    assert normalized.order == [1, 0, 2]
+    with pytest.raises(ValueError):
+        Objective(SEQS, [1, 2])
+
+
+def test_workers_match_in_process():
+    vectors = RotTable().getVector() + np.random.default_rng(0).normal(0, 0.3, (5, 48))
+    expected = Objective(SEQS, [1, 2, 3]).energies(vectors)
+    with Objective(SEQS, [1, 2, 3], workers=2) as objective:
+        assert np.allclose(objective.energies(vectors), expected)
+        assert objective.evaluations == 5 * len(SEQS)
+    assert objective.evaluator._pool is None
+
+
+def test_optimizers_with_objective():
+    objective = Objective(SEQS, normalize=True)
+    recuit = Recuit(SEQS, RotTable(), 5, 0, objective=objective)
+    assert np.isclose(recuit.e, objective.energy(RotTable()))
+    recuit.run()
+    assert recuit.best_e <= recuit.e
+
+    random.seed(0)
+    best = algo_genetique(SEQS[0], 6, istest=True, max_generations=2, objective=objective)
+    assert math.isclose(best.getScore() ** 2, objective.energy(best.getData()), rel_tol=1e-9)
+    with pytest.raises(ValueError):
+        algo_genetique(SEQS[0], 6, istest=True, objective=objective, surrogate=object())
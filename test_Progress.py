@@ -0,0 +1,32 @@
+import json
+from dna.Genetic import algo_genetique
+from dna.Progress import Progress
+from dna.Recuit import Recuit
+from dna.RotTable import RotTable
+
+
+def test_rate_limit(tmp_path):
+    events = []
+    path = str(tmp_path / "progress.jsonl")
+    with Progress(events.append, path, interval=3600) as progress:
+        assert progress.emit("test", 1, 10, 5.0, [5.0, 7.0]) is not None
+        assert progress.emit("test", 2, 20, 4.0) is None
+        progress.emit("test", 3, 30, 3.0, lambda: [3.0, 9.0], force=True, done=True)
+    assert [e["generation"] for e in events] == [1, 3]
+    assert events[0]["mean"] == 6.0 and events[1]["worst"] == 9.0 and events[1]["done"]
+    with open(path) as file:
+        assert [json.loads(line) for line in file] == events
+
+
+def test_library_is_silent(capsys):
+    events = []
+    progress = Progress(events.append, interval=0)
+    algo_genetique("AGCTTAGGCAATCGGA", 10, True, max_generations=4, progress=progress)
+    Recuit(["AGCTTAGGCA", "CGTAAGCT"], RotTable(), 20, 0).run(progress=progress)
+    assert capsys.readouterr().out == ""
+    genetic = [e for e in events if e["algorithm"] == "genetic"]
+    assert [e["generation"] for e in genetic] == [1, 2, 3, 4, 4]
+    assert genetic[-1]["done"] and genetic[-1]["in_bounds"]
+    assert all(e["best"] <= e["mean"] <= e["worst"] for e in genetic[:-1])
+    recuit = [e for e in events if e["algorithm"] == "recuit"]
+    assert len(recuit) == 21 and recuit[-1]["evaluations"] == 40
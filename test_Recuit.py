@@ -1,5 +1,12 @@
+import math
+import random
+import numpy as np
+import pytest
+from dna.Genetic import isInBounds
+from dna.Objective import Objective
 from dna.Recuit import Recuit
 from dna.RotTable import RotTable
+from dna.Schedule import AdaptiveSchedule
 from dna.Traj3D import Traj3D
 
 
@@ -71,3 +78,72 @@ def test_run():
     recuit.run()
     assert (recuit.k == recuit.k_max and recuit.e > recuit.e_max) or (
         recuit.k < recuit.k_max and recuit.e <= recuit.e_max)
+
+
+def test_adaptive_schedule():
+    seqs = ["AGCTTAGGCAATCGGATTACGA" * 3, "CGTAAGCTTTAGCA"]
+    random.seed(0)
+    recuit = Recuit(seqs, RotTable(), 60, 0, schedule="adaptive")
+    schedule = recuit.adaptive
+    assert schedule.target(0) == 1 and schedule.target(30) == 0.44 and schedule.target(60) < 0.01
+    for _ in range(30):
+        recuit.iterate()
+    # Température initiale tirée des voisins, évaluations comptées
+    assert recuit.temp0 == schedule.temp0 > 0
+    assert recuit.evaluations() == (30 + schedule.samples) * len(seqs)
+    assert isInBounds(recuit.state.getTable())
+    data = recuit.snapshot()
+    recuit.run()
+    resumed = Recuit(seqs, RotTable(), 60, 0, schedule="adaptive")
+    resumed.restore(data)
+    resumed.run()
+    assert resumed.best_e == recuit.best_e and resumed.temp == recuit.temp
+    assert np.array_equal(resumed.adaptive.scales, recuit.adaptive.scales)
+    assert recuit.best_e <= recuit.energy(RotTable())
+    with pytest.raises(ValueError):
+        Recuit(seqs, RotTable(), 10, 0, schedule="linear")
+
+
+def test_adaptive_reheat():
+    schedule = AdaptiveSchedule(1000, patience=5)
+    schedule.initialTemperature([10.0, -3.0, 30.0])
+    assert math.isclose(schedule.temp0, 20 / -math.log(0.8))
+    temp = 1e-3
+    for k in range(5):
+        temp = schedule.update(temp, k, [0, 1, 2, 3], False, False)
+    assert schedule.reheats == 1 and temp == 2 * schedule.temp0
+
+
+def test_multiple_try():
+    seqs = ["AGCTTAGGCAATCGGATTACGA" * 3, "CGTAAGCTTTAGCA"]
+    objective = Objective(seqs)
+    calls = []
+    energies = objective.energies
+    objective.energies = lambda vectors: calls.append(len(vectors)) or energies(vectors)
+    random.seed(0)
+    recuit = Recuit(seqs, RotTable(), 20, 0, objective=objective, tries=4)
+    recuit.run()
+    # Chaque itération : un lot de 4 voisins puis un lot de 3 points de référence
+    assert calls == [4, 3] * 20
+    assert recuit.evaluations() == 20 * 7 * len(seqs)
+    assert recuit.best_e <= recuit.e and recuit.best_e < recuit.energy(RotTable())
+    assert np.isclose(recuit.best_e, recuit.energy(recuit.best_state))
+    # Mêmes tirages avec les séquences évaluées par des processus de calcul
+    random.seed(0)
+    with Objective(seqs, workers=2) as pooled:
+        parallel = Recuit(seqs, RotTable(), 20, 0, objective=pooled, tries=4, schedule="geometric")
+        parallel.run()
+    assert np.isclose(parallel.best_e, recuit.best_e)
+
+
+def test_multiple_try_high_temperature():
+    # A température très élevée, tous les essais ont le même poids et presque tout est accepté
+    seqs = ["AGCTTAGGCAATCGGA"]
+    random.seed(1)
+    recuit = Recuit(seqs, RotTable(), 30, 0, temp=1e12, cooling=1, tries=3)
+    accepted = 0
+    for _ in range(30):
+        before = recuit.state
+        recuit.iterate()
+        accepted += recuit.state is not before
+    assert accepted >= 27
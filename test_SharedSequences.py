@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pytest
+from dna.Batch import init_worker, score_steps
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.SharedSequences import SequenceRegistry, attach
+from dna.Traj3D import Traj3D
+
+SEQS = ["AGCTTAGGCAATCGGATTACGA", "CGTAAGCTTTAGCA", "A"]
+
+
+def _inspect(handles):
+    entries = attach(handles)
+    return [(e["encoded"].tolist(), e["encoded"].flags.owndata, e["encoded"].flags.writeable) for e in entries]
+
+
+def test_registry_and_workers():
+    encoded = [encode(seq) for seq in SEQS]
+    with SequenceRegistry(encoded) as registry:
+        counts = np.bincount(encoded[0], minlength=16)
+        assert registry.add(encoded[0], counts=counts) == 3 and len(registry) == 4
+        entry = attach(registry.handles())[3]
+        assert np.array_equal(entry["counts"], counts)
+        with ProcessPoolExecutor(2) as pool:
+            inspected = pool.submit(_inspect, registry.handles()).result()
+        for (values, owndata, writeable), e in zip(inspected, encoded + [encoded[0]]):
+            assert values == e.tolist() and not owndata and not writeable
+        # Les processus de calcul lisent les séquences en mémoire partagée
+        steps = Traj3D().stepMatrices(RotTable())
+        with ProcessPoolExecutor(2, initializer=init_worker, initargs=(registry.handles(),)) as pool:
+            _, _, dist, _, _, _ = pool.submit(score_steps, 0, steps, 0).result()
+        traj = Traj3D()
+        traj.compute(SEQS[0], RotTable())
+        assert np.isclose(dist, traj.getDistance())
+        names = [name for name, _ in registry.handles()]
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_cleanup_after_crash():
+    # Processus tué sans fermer son registre : le resource_tracker libère les blocs
+    script = ("import os, sys\n"
+              "from dna.SharedSequences import SequenceRegistry\n"
+              "from dna.Sequence import encode\n"
+              "registry = SequenceRegistry([encode('ACGTACGT')])\n"
+              "print(registry.handles()[0][0], flush=True)\n"
+              "os._exit(1)\n")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=60)
+    name = result.stdout.strip()
+    assert name
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            block = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            break
+        block.close()
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
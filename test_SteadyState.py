@@ -0,0 +1,23 @@
+from dna.SteadyState import GenetiqueStationnaire, algo_genetique_stationnaire
+from dna.Genetic import Individu, isInBounds
+
+
+def test_inserer_replaces_worst():
+    pop = GenetiqueStationnaire(4)
+    for i, ind in enumerate(pop.population):
+        ind.setScore(float(i + 10))
+    pop.best_individu = pop.population[0].copy()
+    child = Individu()
+    child.setScore(1.0)
+    assert pop.inserer(child)
+    assert sorted(ind.score for ind in pop.population) == [1.0, 10.0, 11.0, 12.0]
+    child = Individu()
+    child.setScore(50.0)
+    assert not pop.inserer(child)
+    assert pop.len_pop == 4 and pop.evaluations == 2
+
+
+def test_algo_genetique_stationnaire():
+    ind = algo_genetique_stationnaire("ATCGGATTACAGGCTTAAC" * 5, 6, True, workers=2, max_stagnant=30)
+    assert isInBounds(ind.getData().getTable())
+    assert abs(ind.getScore() - ind.getTraj().getDistance()) < 1e-8
@@ -0,0 +1,44 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Store import ResultStore, sequence_hash, write_numbered
+from dna.WarmStart import best_table
+
+SEQS = ["AGCTTAGGCAATCGGA", "CGTAAGCTTTAGCA"]
+
+
+def _insert(args):
+    path, i = args
+    with ResultStore(path) as store:
+        rot_table = RotTable()
+        rot_table.setTwist("AA", 35.62 + 0.01 * i)
+        return store.insert("recuit", rot_table, SEQS, {"i": i})
+
+
+def test_insert_and_best(tmp_path):
+    path = str(tmp_path / "results.db")
+    with ProcessPoolExecutor(2) as pool:
+        runs = list(pool.map(_insert, [(path, i) for i in range(6)]))
+    assert sorted(runs) == list(range(1, 7))
+    with ResultStore(path) as store:
+        run, energy = store.best(SEQS)[0]
+        assert energy == min(store.get(r)["energy"] for r in runs)
+        _, distance2 = store.best(SEQS[:1])[0]
+        key = sequence_hash(SEQS[0])
+        assert np.isclose(distance2, min(store.get(r)["distances"][key] for r in runs) ** 2)
+        store.export(run, str(tmp_path / "best.json"))
+        assert RotTable(str(tmp_path / "best.json")).getTable() == store.get(run)["rot_table"]
+        assert store.best(["ACGT"]) == []
+    # Le démarrage à chaud consulte la base
+    filename, _ = best_table(SEQS, [path])
+    assert filename == f"{path}#{run}"
+
+
+def test_write_numbered(tmp_path):
+    prefix = str(tmp_path / "recuit_result")
+    names = [write_numbered(RotTable().getTable(), prefix) for _ in range(3)]
+    assert len(set(names)) == 3 and all(os.path.exists(n) for n in names)
+    with open(names[0]) as file:
+        assert json.load(file) == RotTable().getTable()
@@ -0,0 +1,64 @@
+import numpy as np
+from dna.Genetic import Genetique
+from dna.RotTable import RotTable
+from dna.Sequence import encode
+from dna.Surrogate import Surrogate
+from dna.Traj3D import Traj3D
+
+SEQ = "ATCGGATTACAGGCTTAACGGATCCATGCA" * 10
+
+
+def endpoint(vector):
+    rot = RotTable()
+    rot.setVector(vector)
+    traj = Traj3D()
+    traj.computeEndpoint(encode(SEQ), rot)
+    return traj.getTraj()[-1][:3]
+
+
+def test_surrogate_ranks_local_offspring():
+    rng = np.random.default_rng(0)
+    v0 = RotTable().getVector()
+    X = v0 + rng.uniform(-0.05, 0.05, (200, 48)) * (np.arange(48) % 3 != 2)
+    Y = np.array([endpoint(x) for x in X])
+    surrogate = Surrogate()
+    assert not surrogate.ready()
+    surrogate.add(X[:150], Y[:150])
+    surrogate.fit()
+    assert surrogate.ready()
+    surrogate.record(surrogate.predict(X[150:]), np.linalg.norm(Y[150:], axis=1))
+    assert surrogate.correlations[-1] > 0.9
+
+
+def test_refresh_score_with_surrogate():
+    genetique = Genetique(20)
+    surrogate = Surrogate(fraction=0.25, min_correlation=-1)
+    for _ in range(6):
+        genetique.refresh_score(SEQ, surrogate)
+        assert all(ind.score is not None for ind in genetique.population)
+        for ind in genetique.population:
+            ind.add_bruit('AA')
+    report = surrogate.report()
+    assert report["skipped"] > 0
+    assert report["exact"] + report["skipped"] == 6 * 20
+
+
+def test_refresh_score_keeps_exact_survivors():
+    genetique = Genetique(20)
+    surrogate = Surrogate(fraction=0.25, min_correlation=-1)
+    for _ in range(3):
+        for ind in genetique.population:
+            ind.add_bruit('AA')
+        genetique.refresh_score(SEQ, surrogate)
+    genetique.selection('elitisme')
+    survivors = [ind for ind in genetique.population if ind.exact]
+    kept = [(ind.score, ind.getLastPoint().copy()) for ind in survivors]
+    genetique.croisement_n_point()
+    exact, skipped = surrogate.exact, surrogate.skipped
+    genetique.refresh_score(SEQ, surrogate)
+    # Seuls les enfants passent par le modèle ; les survivants gardent score exact et trajectoire
+    assert surrogate.exact + surrogate.skipped - exact - skipped == 10
+    assert survivors and all(ind.exact for ind in survivors)
+    for ind, (score, point) in zip(survivors, kept):
+        assert ind.score == score and np.array_equal(ind.getLastPoint(), point)
+        assert np.isclose(ind.score, np.linalg.norm(endpoint(ind.data.getVector())))
@@ -0,0 +1,40 @@
+import matplotlib.pyplot as plt
+import numpy as np
+from dna.RotTable import RotTable
+from dna.Traj3D import Traj3D, decimate, simplify
+
+
+def helix(n):
+    t = np.linspace(0, 40 * np.pi, n)
+    return np.column_stack((np.cos(t), np.sin(t), 0.05 * t))
+
+
+def test_decimate():
+    idx = decimate(1000, 100)
+    assert len(idx) <= 100 and idx[0] == 0 and idx[-1] == 999
+    assert np.array_equal(decimate(50, 100), np.arange(50))
+
+
+def test_simplify_error_bound():
+    xyz = helix(5000)
+    kept = simplify(xyz, 0.05)
+    assert kept[0] == 0 and kept[-1] == len(xyz) - 1 and len(kept) < len(xyz) // 4
+    # Chaque point retiré est proche du segment qui le remplace
+    for a, b in zip(kept[:-1], kept[1:]):
+        chord = xyz[b] - xyz[a]
+        points = xyz[a+1:b] - xyz[a]
+        t = np.clip(points @ chord / (chord @ chord), 0, 1)
+        assert np.all(np.linalg.norm(points - t[:, None] * chord, axis=1) <= 0.05)
+
+
+def test_draw_headless(tmp_path):
+    traj = Traj3D()
+    traj.compute("AGCTTAGGCAATCGGACCTAGT" * 200, RotTable())
+    figures = plt.get_fignums()
+    filename = str(tmp_path / "traj.png")
+    traj.draw(filename, max_points=500, show=False)
+    assert (tmp_path / "traj.png").stat().st_size > 0
+    assert len(traj.ax.lines[0].get_xdata()) <= 500
+    assert plt.get_fignums() == figures  # Rendu hors écran : aucune figure pyplot ouverte
+    traj.draw(str(tmp_path / "rdp.png"), tolerance=1.0, show=False)
+    assert (tmp_path / "rdp.png").exists()
@@ -0,0 +1,28 @@
+import math
+from dna.Tuner import run_config, sample_configs, successive_halving, RECUIT_SPACE
+
+
+def test_sample_configs():
+    configs = sample_configs(RECUIT_SPACE, 10, seed=0)
+    assert len(configs) == 10
+    assert len({tuple(c.values()) for c in configs}) == 10
+    assert configs == sample_configs(RECUIT_SPACE, 10, seed=0)
+
+
+def test_successive_halving():
+    seqs = ["ATCGGATTACAGGCTTAACGGATCCATGCA" * 3]
+    leaderboard = successive_halving("recuit", seqs, n_configs=4, min_budget=10, workers=1)
+    assert len(leaderboard) == 4
+    assert [row["round"] for row in leaderboard] == [2, 1, 0, 0]
+    assert leaderboard[0]["budget"] == 40
+    assert leaderboard[2]["score"] <= leaderboard[3]["score"]
+
+
+def test_run_config_genetic():
+    seqs = ["ATCGGATTACAGGCTTAACGGATCCATGCA" * 3]
+    config = {"taille": 10, "rate": 0.5, "n": 2, "algorithme_selection": 'roulette', "seuil": 0.5,
+              "seuil_step": 0.3}
+    score = run_config("genetic", config, 50, seqs, seed=3)
+    assert math.isfinite(score) and score > 0
+    # random et np.random sont fixés : même configuration, même graine, même résultat
+    assert run_config("genetic", config, 50, seqs, seed=3) == score
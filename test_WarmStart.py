@@ -0,0 +1,40 @@
+import json
+import shutil
+import numpy as np
+from dna.Genetic import Genetique, isInBounds
+from dna.RotTable import RotTable
+from dna.Sequence import DINUCLEOTIDES
+from dna.WarmStart import best_table, load_tables, rank_tables, seed_vectors
+
+SEQ = "AGCTTAGGCAATCGGACCTAGT"
+
+
+def test_load_tables(tmp_path):
+    shutil.copy("results/recuit_result_best_8k.json", tmp_path / "a.json")
+    with open(tmp_path / "tune_genetic.json", "w") as file:
+        json.dump({"best": {}, "leaderboard": []}, file)
+    tables = load_tables([str(tmp_path)])
+    assert [name for name, _ in tables] == [str(tmp_path / "a.json")]
+
+
+def test_best_table():
+    ranked = rank_tables(load_tables() + [(None, RotTable())], [SEQ])
+    assert [r[0] for r in ranked] == sorted(r[0] for r in ranked)
+    filename, table = best_table([SEQ], initial_state=RotTable())
+    assert filename == ranked[0][1]
+    assert np.array_equal(table.getVector(), ranked[0][2].getVector())
+
+
+def test_seeded_population():
+    seeds = seed_vectors(SEQ, 2)
+    pop = Genetique(10, seeds)
+    assert np.array_equal(pop.population[0].data.getVector(), seeds[0])
+    assert np.array_equal(pop.population[1].data.getVector(), seeds[1 % len(seeds)])
+    low, high = RotTable().getBounds()
+    for ind in pop.population:
+        vector = ind.data.getVector()
+        assert np.all(vector >= low) and np.all(vector <= high)
+        assert isInBounds(ind.data.getTable())
+        # Les plages de bruit restent relatives aux bornes de la table par défaut
+        bruit = np.array([ind.bruit[di] for di in DINUCLEOTIDES]).reshape(48, 2)
+        assert np.allclose(vector + bruit[:, 0], low) and np.allclose(vector + bruit[:, 1], high)